@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+
+"""
+Benchmark of the 'show flows' parser.
+
+Generates synthetic 'show flows all' output with the given numbers of flows
+and reports how many flows per second FlowsParser parses, next to the
+per-line parser FlowsModel used before.  The legacy parser is skipped above
+--legacy-max flows, as it takes minutes on a million flows.  With --workers,
+the parallel parse with that many worker processes is measured as well.
+
+This script should be executed as follows:
+flows_parser.py [-n FLOWS [-n FLOWS ...]] [--legacy-max FLOWS] [--workers N]
+"""
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+import re
+import time
+import random
+import argparse
+import ipaddress
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from steelscript.steelhead.features.flows.v8_5.parser import FlowsParser
+
+
+SUMMARY = """\
+--------------------------------------------------------------------------------
+                                           All    V4     V6
+---------------------------------------------------------------
+Established Optimized:                     1      2      3
+
+  RiOS Only (O):                           1      3      3
+  SCPS Only (SO):                          11     22     33
+  RiOS+SCPS (RS):                          1      2      3
+  TCP Proxy (TP):                          1      2      3
+  Packet-mode optimized (N):               11     22     33
+
+Half-opened optimized (H):                 1      2      3
+Half-closed optimized (C):                 11     22     33
+
+Establishing (E):                          1      2      3
+Passthrough :                              11     22     33
+
+  Passthrough intentional (PI):            1      2      3
+  Passthrough unintentional (PU):          11     22     33
+
+    Terminated:                            1      2      3
+    Packet-mode:                           11     22     33
+
+Forwarded (F):                             1      2      3
+Discarded (terminated):                    1
+Denied (terminated):                       1
+---------------------------------------------------------------
+
+Total:                                     11     40      70
+"""
+
+APPS = ['UDPv4', 'TCPv4', 'CIFS', 'MAPI', 'HTTP', 'SSL', 'FTP-DAT', 'SRDF_V2']
+TYPES = ['O', 'N', 'PI', 'PU', 'F']
+
+
+def make_output(count, seed=0):
+    """
+    Return 'show flows all' output with `count` flows.
+    """
+    rnd = random.Random(seed)
+    hosts = ['10.%d.%d.%d' % (rnd.randrange(256), rnd.randrange(256),
+                              rnd.randrange(1, 255)) for _ in range(2000)]
+    hosts += ['[2001:db8::%x]' % rnd.randrange(1, 0xffff)
+              for _ in range(100)]
+    lines = ['T  Source                Destination           App     Rdn '
+             'Since',
+             '-' * 80]
+    for _ in range(count):
+        type = rnd.choice(TYPES)
+        reduction = ('%2d%%' % rnd.randrange(100)) if len(type) == 1 \
+            else '   '
+        if rnd.random() < 0.02:
+            since = 'pre_existing'
+        else:
+            since = '2014/02/%02d %02d:%02d:%02d' % (
+                rnd.randrange(1, 29), rnd.randrange(24), rnd.randrange(60),
+                rnd.randrange(60))
+        lines.append('%-2s %-21s %-21s %-7s %s %s' % (
+            type,
+            '%s:%d' % (rnd.choice(hosts), rnd.randrange(1024, 65536)),
+            '%s:%d' % (rnd.choice(hosts), rnd.choice([80, 443, 445, 135])),
+            rnd.choice(APPS), reduction, since))
+    return '\n'.join(lines) + '\n' + SUMMARY
+
+
+def legacy_parse(output):
+    # The per-line implementation of FlowsModel.show_flows before the
+    # FlowsParser, kept for comparison.
+    def parse_ip_addr(ip):
+        ParsedIP = namedtuple('ParsedIP', ['address', 'port'])
+        ip_regex = re.compile(r"\[*([\w\.:]+)\]*:(\d+)")
+        ip_match = ip_regex.search(ip)
+        if ip_match:
+            return ParsedIP(address=ipaddress.ip_address(ip_match.group(1)),
+                            port=int(ip_match.group(2)))
+
+    def parse_flow_summary(output):
+        flow_pattern = r"%s\s+%s\s+%s\s+%s\s+%s\s+%s\s*$" % (
+            r"([a-zA-Z]+)", r"([\w\.\[\]:]+)", r"([\w\.\[\]:]+)", r"(.+?)",
+            r"(\d*)%*", r"(pre_existing|\d+\/\d+\/\d+\s+\d+:\d+:\d+)")
+        match = re.compile(flow_pattern).search(output)
+        if match:
+            src = parse_ip_addr(match.group(2))
+            dst = parse_ip_addr(match.group(3))
+            flow = {'type': match.group(1),
+                    'source ip': src.address,
+                    'source port': src.port,
+                    'destination ip': dst.address,
+                    'destination port': dst.port,
+                    'app': match.group(4)}
+            if match.group(5):
+                flow['reduction'] = int(match.group(5))
+            if match.group(6) == 'pre_existing':
+                flow['since'] = {'pre_existing': True}
+            else:
+                date_time = match.group(6).split(' ')
+                d = date_time[0].split('/')
+                t = date_time[1].split(':')
+                flow['since'] = {'year': d[0], 'month': d[1], 'day': d[2],
+                                 'hour': t[0], 'min': t[1], 'secs': t[2]}
+            return flow
+
+    title_regex = re.compile(r"T\s+Source\s+Destination\s+App\s+Rdn\s+Since")
+    title_parsed = False
+    flows_list = []
+    summary = {}
+    categories = {'Established Optimized': 'established optimized',
+                  'RiOS Only (O)': 'rios only',
+                  'SCPS Only (SO)': 'scps only',
+                  'RiOS+SCPS (RS)': 'rios scps',
+                  'TCP Proxy (TP)': 'tcp proxy',
+                  'Packet-mode optimized (N)': 'packet_mode optimized',
+                  'Half-opened optimized (H)': 'half_opened optimized',
+                  'Half-closed optimized (C)': 'half_closed optimized',
+                  'Establishing (E)': 'establishing',
+                  'Passthrough': 'passthrough',
+                  'Passthrough intentional (PI)': 'passthrough intentional',
+                  'Passthrough unintentional (PU)':
+                      'passthrough unintentional',
+                  'Terminated': 'passthrough unintentional terminated',
+                  'Packet-mode': 'passthrough unintentional packet_mode',
+                  'Forwarded (F)': 'forwarded',
+                  'Discarded (terminated)': 'discarded',
+                  'Denied (terminated)': 'denied',
+                  'Total': 'total'}
+    for line in output.splitlines():
+        if not len(line):
+            continue
+        if title_parsed is not True:
+            if title_regex.search(line):
+                title_parsed = True
+                continue
+        if re.match(r'^-+$', line):
+            continue
+        flow = parse_flow_summary(line)
+        if flow:
+            flows_list.append(flow)
+            continue
+        items = line.split(':')
+        for category in categories:
+            if items[0].strip() == category.strip():
+                match = re.match(r'\s+(\d+)\s+(\d+)\s+(\d+)\s*$', items[1])
+                if match:
+                    summary[categories[category]] = {
+                        'all': int(match.group(1)),
+                        'v4': int(match.group(2)),
+                        'v6': int(match.group(3))}
+                    break
+                match = re.match(r'\s+(\d+)$', items[1])
+                if match:
+                    summary[categories[category]] = {
+                        'all': int(match.group(1))}
+                    break
+    return {'flows_list': flows_list, 'flows_summary': summary}
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('-n', '--flows', type=int, action='append',
+                        help='number of flows (default: 10k, 100k and 1M)')
+    parser.add_argument('--legacy-max', type=int, default=100000,
+                        help='largest table to run the legacy parser on')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='worker processes of the parallel parse')
+    args = parser.parse_args()
+
+    print('%10s %16s %16s %8s %16s' % ('flows', 'FlowsParser/s', 'legacy/s',
+                                       'speedup', 'parallel/s'))
+    for count in args.flows or [10000, 100000, 1000000]:
+        output = make_output(count)
+        result, elapsed = timed(FlowsParser().parse, output)
+        assert len(result['flows_list']) == count
+        rate = count / elapsed
+
+        legacy = speedup = ''
+        if count <= args.legacy_max:
+            expected, legacy_elapsed = timed(legacy_parse, output)
+            assert result == expected, 'parsers disagree'
+            legacy = '%16d' % (count / legacy_elapsed)
+            speedup = '%7.1fx' % (legacy_elapsed / elapsed)
+
+        parallel = ''
+        if args.workers:
+            with ProcessPoolExecutor(args.workers) as executor:
+                parallel_result, parallel_elapsed = timed(
+                    FlowsParser().parse_parallel, output, args.workers,
+                    executor, 0)
+            assert parallel_result == result, 'parallel parse disagrees'
+            parallel = '%16d' % (count / parallel_elapsed)
+        print('%10d %16d %16s %8s %16s' % (count, rate, legacy, speedup,
+                                           parallel))
+
+
+if __name__ == '__main__':
+    main()
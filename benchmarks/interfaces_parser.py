@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+
+"""
+Benchmark of the 'show interfaces' parser.
+
+Generates synthetic 'show interfaces' output with the given numbers of
+interfaces and reports how many interfaces per second parse_interfaces
+parses, eagerly and lazily, next to the per-interface parser NetworkingModel
+used before.  Lazy records are parsed without looking up any typed field.
+
+This script should be executed as follows:
+interfaces_parser.py [-n INTERFACES [-n INTERFACES ...]] [-r REPEAT]
+"""
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+import re
+import time
+import random
+import argparse
+import datetime
+import ipaddress
+
+import netaddr
+from steelscript.cmdline.parsers import cli_parse_basic
+from steelscript.steelhead.features.networking.v8_5.parser import \
+    parse_interfaces
+
+
+INTERFACE = """\
+Interface %(name)s state
+   Up:                 yes
+   Interface type:     ethernet
+   IP address:         %(ip)s
+   Netmask:            255.255.255.0
+   IPv6 link-local address: fe80::5054:ff:fe10:%(suffix)x/64
+   Speed:              1000Mb/s (auto)
+   Duplex:             full (auto)
+   MTU:                1500
+   HW address:         %(mac)s
+   Traffic status:     Normal
+   HW blockable:       no
+   Link:               yes
+   Counters cleared date:  2014/%(month)02d/19 16:31:12
+
+   RX bytes:           %(rx)d
+   RX packets:         %(rx_packets)d
+   RX mcast packets:   0
+   RX discards:        0
+   RX errors:          0
+   RX overruns:        0
+   RX frame:           0
+
+   TX bytes:           %(tx)d
+   TX packets:         %(tx_packets)d
+   TX discards:        0
+   TX errors:          0
+   TX overruns:        0
+   TX carrier:         0
+   TX collisions:      0
+"""
+
+NAMES = ['aux', 'primary', 'lan0_%d', 'wan0_%d', 'inpath0_%d', 'vlan%d']
+
+
+def make_output(count, seed=0):
+    """
+    Return 'show interfaces' output with `count` interfaces.
+    """
+    rnd = random.Random(seed)
+    parts = []
+    for i in range(count):
+        name = rnd.choice(NAMES)
+        parts.append(INTERFACE % {
+            'name': name % i if '%' in name else '%s%d' % (name, i),
+            'ip': '10.%d.%d.%d' % (rnd.randrange(256), rnd.randrange(256),
+                                   rnd.randrange(1, 255)),
+            'suffix': rnd.randrange(1, 0xffff),
+            'mac': ':'.join('%02X' % rnd.randrange(256) for _ in range(6)),
+            'month': rnd.randrange(1, 13),
+            'rx': rnd.randrange(2 ** 40),
+            'rx_packets': rnd.randrange(2 ** 32),
+            'tx': rnd.randrange(2 ** 40),
+            'tx_packets': rnd.randrange(2 ** 32)})
+    return '\n'.join(parts)
+
+
+def legacy_parse(output):
+    # NetworkingModel._parse_show_interfaces_dict before parse_interfaces,
+    # kept for comparison.
+    def parse_interface(output):
+        parsed = cli_parse_basic(output)
+        if 'ip address' in parsed and parsed['ip address'] and \
+                'netmask' in parsed and parsed['netmask']:
+            parsed['ip address'] = ipaddress.ip_interface(
+                "%s/%s" % (parsed['ip address'], parsed['netmask']))
+            del parsed['netmask']
+        for key in ['ipv6 address', 'ipv6 link-local address']:
+            if key in parsed and parsed[key]:
+                parsed[key] = ipaddress.ip_interface(parsed[key])
+        for key in ['hw address']:
+            if key in parsed:
+                parsed[key] = netaddr.EUI(parsed[key])
+        for key in ['counters cleared date']:
+            if key in parsed:
+                parsed[key] = datetime.datetime.strptime(parsed[key],
+                                                         '%Y/%m/%d %H:%M:%S')
+        parsed['name'] = re.match(r'Interface (\S+) ', output).group(1)
+        return parsed
+
+    output = output.strip()
+    parts = re.split('\n\n(?=Interface)', output)
+    return [parse_interface(x) for x in parts]
+
+
+def timed(repeat, func, *args):
+    # Best of `repeat` runs.
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('-n', '--interfaces', type=int, action='append',
+                        help='number of interfaces (default: 10, 100 and '
+                             '1000)')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='runs per parser, the best one is reported')
+    args = parser.parse_args()
+
+    print('%10s %12s %12s %12s %8s %8s' % ('interfaces', 'eager/s', 'lazy/s',
+                                           'legacy/s', 'eager', 'lazy'))
+    for count in args.interfaces or [10, 100, 1000]:
+        output = make_output(count)
+        expected, legacy = timed(args.repeat, legacy_parse, output)
+        result, eager = timed(args.repeat, parse_interfaces, output)
+        assert result == expected, 'parsers disagree'
+        result, lazy = timed(args.repeat, parse_interfaces, output, True)
+        assert result == expected, 'lazy records disagree'
+        print('%10d %12d %12d %12d %7.1fx %7.1fx' % (
+            count, count / eager, count / lazy, count / legacy,
+            legacy / eager, legacy / lazy))
+
+
+if __name__ == '__main__':
+    main()
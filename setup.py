@@ -34,6 +34,7 @@ class PyTest(TestCommand):
 
 test = ['pytest', 'testfixtures']
 doc = ['sphinx']
+frame = ['numpy', 'pandas']
 
 setup(
     name='steelscript.steelhead',
@@ -84,7 +85,8 @@ http://pythonhosted.org/steelscript/
     extras_require={'test': test,
                     'doc': doc,
                     'dev': [p for p in itertools.chain(test, doc)],
-                    'all': []
+                    'frame': frame,
+                    'all': frame
                     },
     tests_require=test,
     cmdclass={'test': PyTest},
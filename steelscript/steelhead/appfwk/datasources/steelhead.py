@@ -13,6 +13,8 @@ from django.core.exceptions import ObjectDoesNotExist
 from tagging.models import Tag
 
 from steelscript.common.interaction.model import Model
+from steelscript.steelhead.core.cache import ResultCache
+from steelscript.steelhead.core.cli import PrefetchedCLI
 from steelscript.common.interaction.action import Action
 from steelscript.appfwk.apps.jobs import QueryComplete, QueryContinue, \
     QueryError
@@ -30,6 +32,20 @@ from steelscript.appfwk.apps.jobs.models import Job
 
 logger = logging.getLogger(__name__)
 
+# Commands run by the tables of the Single SteelHead Report, collected in
+# one round-trip by the first of its jobs and read by the others.
+REPORT_COMMANDS = ['show version',
+                   'show interfaces brief',
+                   'show flows all',
+                   'show stats bandwidth all lan-to-wan %(duration)s',
+                   'show stats bandwidth all wan-to-lan %(duration)s',
+                   'show stats bandwidth all bi-directional %(duration)s']
+
+# Seconds the collected outputs are shared between jobs
+REPORT_OUTPUTS_TTL = 60
+
+_report_outputs = ResultCache(default_ttl=REPORT_OUTPUTS_TTL)
+
 
 def tag_selection_preprocess(form, field, field_kwargs, params):
 
@@ -59,6 +75,40 @@ def fields_add_command(obj):
     obj.fields.add(field)
 
 
+class PrefetchedSteelHead(object):
+    """
+    A SteelHead whose models read the outputs of :py:data:`REPORT_COMMANDS`
+    from a :py:class:`PrefetchedCLI
+    <steelscript.steelhead.core.cli.PrefetchedCLI>`.
+    """
+
+    def __init__(self, steelhead, outputs):
+        self._steelhead = steelhead
+        self.cli = PrefetchedCLI(steelhead.cli, outputs)
+
+    def __getattr__(self, name):
+        return getattr(self._steelhead, name)
+
+
+def get_report_device(job):
+    """
+    Return the SteelHead selected for `job`, with the outputs of all report
+    commands collected by one :py:meth:`SteelHead.exec_batch
+    <steelscript.steelhead.core.steelhead.SteelHead.exec_batch>` shared by
+    the jobs of the report.
+    """
+    sh = DeviceManager.get_device(job.criteria.steelhead_device)
+    duration = getattr(job.criteria, 'duration', None) or '5min'
+    commands = [cmd % {'duration': duration} for cmd in REPORT_COMMANDS]
+
+    def collect():
+        outputs = sh.exec_batch(commands, output_expected=True)
+        return dict(zip(commands, outputs))
+
+    outputs = _report_outputs.lookup(sh, '\n'.join(commands), collect)
+    return PrefetchedSteelHead(sh, outputs)
+
+
 class SteelHeadTable(DatasourceTable):
     class Meta:
         proxy = True
@@ -81,7 +131,7 @@ class SteelHeadQuery(TableQueryBase):
         method = self.table.options.method
         args = self.table.options.args
 
-        sh = DeviceManager.get_device(self.job.criteria.steelhead_device)
+        sh = get_report_device(self.job)
         obj = obj_class.get(sh, feature=feature)
         res = getattr(obj, method)(*args)
 
@@ -130,15 +180,15 @@ class FlowsTable(SteelHeadTable):
 class FlowsQuery(TableQueryBase):
 
     def run(self):
-        sh = DeviceManager.get_device(self.job.criteria.steelhead_device)
+        sh = get_report_device(self.job)
 
         flows = Model.get(sh, feature='flows')
-        res = flows.show_flows('all')
+        summary = flows.show_flows_summary('all')
 
-        for k, v in res['flows_summary'].iteritems():
+        for k, v in summary.items():
             v['category'] = k
 
-        return QueryComplete(res['flows_summary'].values())
+        return QueryComplete(list(summary.values()))
 
 
 class BandwidthTable(SteelHeadTable):
@@ -169,15 +219,15 @@ class BandwidthQuery(TableQueryBase):
 
     def run(self):
 
-        sh = DeviceManager.get_device(self.job.criteria.steelhead_device)
+        sh = get_report_device(self.job)
 
         stats = Model.get(sh, feature='stats')
         duration = self.job.criteria.duration
-        directions = ['lan-to-wan', 'wan-to-lan', 'bi-directional']
+        directions = stats.show_stats_bandwidth_all_directions('all',
+                                                               duration)
 
         total = []
-        for d in directions:
-            res = stats.show_stats_bandwidth('all', d, duration)
+        for d, res in directions.items():
             res['direction'] = d
             total.append(res)
 
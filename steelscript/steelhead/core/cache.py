@@ -0,0 +1,396 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+"""
+This module contains the ResultCache class - an opt-in cache of parsed model
+results shared by SteelHead objects - and the VersionCache class, which
+keeps the 'show version' results of SteelHeads until they reboot.
+"""
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+import os
+import copy
+import json
+import time
+import atexit
+import weakref
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache(object):
+    """
+    A thread-safe LRU cache of parsed model results.
+
+    Entries are keyed by the device (host and port) and the CLI command the
+    model built, and expire after a time-to-live chosen per command.  A
+    SteelHead uses the cache for its models once it is assigned to the
+    ``result_cache`` attribute; one cache may be shared by many SteelHeads.
+
+    .. code-block:: python
+
+        cache = ResultCache(ttls={'show version': 3600,
+                                  'show interfaces': 60})
+        sh = SteelHead(host, auth=auth, result_cache=cache)
+
+    Results are copied in and out of the cache, so callers may modify
+    them freely.
+
+    :param dict ttls: Seconds to keep results for, keyed by command prefix.
+        The longest prefix matching a command wins, so ``'show interfaces'``
+        applies to ``'show interfaces aux brief'`` unless a more specific
+        prefix is given.
+    :param int default_ttl: Seconds to keep results of commands that match
+        no prefix in `ttls`.  0 does not cache them.
+    :param int maxsize: Maximum number of entries; the least recently used
+        entry is evicted beyond it.
+    """
+
+    def __init__(self, ttls=None, default_ttl=0, maxsize=1024):
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.maxsize = maxsize
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        # (host, port, command) -> (expires, value), least recent first
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return ('<ResultCache entries: %d hits: %d misses: %d>'
+                % (len(self._entries), self.hits, self.misses))
+
+    def ttl_for(self, command):
+        """
+        Return the time-to-live in seconds for results of `command`.
+        """
+        prefixes = [p for p in self.ttls
+                    if command == p or command.startswith(p + ' ')]
+        if not prefixes:
+            return self.default_ttl
+        return self.ttls[max(prefixes, key=len)]
+
+    def get(self, device, command, default=None):
+        """
+        Return a copy of the cached result of `command` on `device`, or
+        `default` if there is no live entry.
+        """
+        key = self._key(device, command)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[1]
+        return copy.deepcopy(value)
+
+    def put(self, device, command, value):
+        """
+        Store the result of `command` on `device`, unless its time-to-live
+        is 0.
+        """
+        ttl = self.ttl_for(command)
+        if not ttl:
+            return
+        key = self._key(device, command)
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def lookup(self, device, command, func):
+        """
+        Return the cached result of `command` on `device`, calling `func`
+        to produce and cache it on a miss.
+        """
+        if not self.ttl_for(command):
+            return func()
+        value = self.get(device, command, default=_MISSING)
+        if value is _MISSING:
+            value = func()
+            self.put(device, command, value)
+        return value
+
+    def invalidate(self, device=None, command=None):
+        """
+        Drop cached results.
+
+        :param device: Only drop results of this device.
+        :param str command: Only drop results of commands starting with
+            this prefix.
+        """
+        host = None if device is None else self._key(device, '')[:2]
+        with self._lock:
+            for key in list(self._entries):
+                if host is not None and key[:2] != host:
+                    continue
+                if command is not None and not (
+                        key[2] == command or
+                        key[2].startswith(command + ' ')):
+                    continue
+                del self._entries[key]
+
+    def clear(self):
+        """
+        Drop all cached results.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _key(device, command):
+        return (device.host, device.port, command)
+
+
+_MISSING = object()
+
+
+def exec_cached(model, command, parse):
+    """
+    Run `command` on the CLI of `model` and return ``parse(output)``.
+
+    If the model's SteelHead has a :class:`ResultCache` assigned, the parsed
+    result is served from and stored in that cache.
+    """
+    def run():
+        return parse(model.cli.exec_command(command, output_expected=True))
+
+    cache = getattr(model._resource, 'result_cache', None)
+    if not isinstance(cache, ResultCache):
+        return run()
+    return cache.lookup(model._resource, command, run)
+
+
+class VersionCache(object):
+    """
+    A thread-safe cache of the parsed 'show version' of SteelHeads.
+
+    The version of a device only changes when it is upgraded, which
+    reboots it, so results are kept for a long `ttl`.  The ``uptime`` of
+    a cached result is advanced by the time spent in the cache.  Whenever
+    a device reports an uptime lower than that, it has rebooted since it
+    was cached, and its entry is replaced.  A lookup within the `ttl` runs
+    no command, unless a `check_interval` is given: the uptime of a device
+    is then read again, with a cheaper command, once its last check is
+    that old.  A SteelHead uses the cache for
+    :py:meth:`.CommonModel.show_version` once it is assigned to the
+    ``version_cache`` attribute.
+
+    .. code-block:: python
+
+        cache = VersionCache(path='/var/cache/steelhead/versions.json')
+        for sh in fleet.devices:
+            sh.version_cache = cache
+
+    :param int ttl: Seconds after which a result is fetched again.
+    :param str path: Optional JSON file the cache is loaded from, and
+        written to by :py:meth:`flush`, when the cache is collected and at
+        exit, so that it survives restarts.
+    :param int slack: Seconds an uptime may lag behind the cached one, to
+        allow for clock drift, before the device is taken to have rebooted.
+    :param int check_interval: Seconds between uptime checks of a cached
+        device, 0 to check on every lookup, or None to only fetch the
+        version again once the `ttl` has expired.
+    """
+
+    def __init__(self, ttl=86400, path=None, slack=60, check_interval=None):
+        self.path = path
+        self.ttl = ttl
+        self.slack = slack
+        self.check_interval = check_interval
+
+        self.hits = 0
+        self.misses = 0
+        self.reboots = 0
+
+        self._lock = threading.Lock()
+        # 'host:port' -> (stored at, value)
+        self._entries = {}
+        # 'host:port' -> time the uptime was last checked
+        self._checked = {}
+        self._dirty = False
+        if path is not None:
+            if os.path.exists(path):
+                self._load()
+            _persistent_caches.add(self)
+
+    def __del__(self):
+        self.flush()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return ('<VersionCache entries: %d hits: %d misses: %d reboots: %d>'
+                % (len(self._entries), self.hits, self.misses, self.reboots))
+
+    def get(self, device, default=None):
+        """
+        Return a copy of the cached version of `device`, with its uptime
+        brought up to date, or `default` if there is no live entry.
+        """
+        key = self._key(device)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] + self.ttl <= now:
+                self.misses += 1
+                return default
+            self.hits += 1
+        return self._current(entry, now)
+
+    def put(self, device, value):
+        """
+        Store the version of `device`.
+
+        :return: True if the uptime of `value` shows that the device
+            rebooted since its previous entry was stored.
+        """
+        rebooted = self.observe(device, value.get('uptime'))
+        key = self._key(device)
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (now, copy.deepcopy(value))
+            self._checked[key] = now
+            self._dirty = True
+        return rebooted
+
+    def observe(self, device, uptime):
+        """
+        Check an uptime of `device` read by other means, and drop its entry
+        if the device rebooted since the entry was stored.
+
+        :param int uptime: Uptime of the device in seconds, or None.
+
+        :return: True if the device rebooted.
+        """
+        key = self._key(device)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            expected = self._current(entry, now).get('uptime') \
+                if entry is not None else None
+            if uptime is None or expected is None or \
+                    uptime >= expected - self.slack:
+                if uptime is not None:
+                    self._checked[key] = now
+                return False
+            del self._entries[key]
+            self._checked.pop(key, None)
+            self._dirty = True
+            self.reboots += 1
+        logger.info('%s rebooted, uptime %ss instead of %ss'
+                    % (key, uptime, expected))
+        return True
+
+    def lookup(self, device, func, uptime=None):
+        """
+        Return the cached version of `device`, calling `func` to produce
+        and cache it on a miss.
+
+        :param uptime: Optional callable returning the current uptime of
+            `device` in seconds, called when :py:meth:`check_due` to find
+            out whether the device rebooted since its entry was stored.
+        """
+        value = self.get(device, default=_MISSING)
+        if value is not _MISSING and uptime is not None and \
+                self.check_due(device) and self.observe(device, uptime()):
+            value = _MISSING
+        if value is _MISSING:
+            value = func()
+            self.put(device, value)
+        return value
+
+    def invalidate(self, device=None):
+        """
+        Drop the cached version of `device`, or of all devices.
+        """
+        with self._lock:
+            if device is None:
+                self._entries.clear()
+                self._checked.clear()
+            else:
+                self._entries.pop(self._key(device), None)
+                self._checked.pop(self._key(device), None)
+            self._dirty = True
+
+    def flush(self):
+        """
+        Write the cache to `path` if it changed since it was last written.
+        Called at exit, and safe to call at any time.
+        """
+        if getattr(self, 'path', None) is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            # Written aside and renamed, readers never see a partial file.
+            tmp = '%s.%d.tmp' % (self.path, os.getpid())
+            with open(tmp, 'w') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+    @staticmethod
+    def _key(device):
+        return '%s:%s' % (device.host, device.port)
+
+    def check_due(self, device):
+        """
+        Return True if the uptime of `device` should be read again to look
+        for a reboot, which is never the case without a `check_interval`.
+        """
+        if self.check_interval is None:
+            return False
+        with self._lock:
+            checked = self._checked.get(self._key(device))
+        return checked is None or \
+            checked + self.check_interval <= time.time()
+
+    @staticmethod
+    def _current(entry, now):
+        stored, value = entry
+        value = copy.deepcopy(value)
+        if isinstance(value.get('uptime'), int):
+            value['uptime'] += int(now - stored)
+        return value
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+            self._entries = dict((key, (stored, value))
+                                 for key, (stored, value) in entries.items())
+        except (IOError, ValueError, TypeError) as e:
+            logger.warning('Ignoring unreadable version cache %s: %s'
+                           % (self.path, e))
+
+
+# Version caches with a path, written at exit.  Weak references, so that
+# caches are still collected, which writes them as well.
+_persistent_caches = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_version_caches():
+    for cache in list(_persistent_caches):
+        cache.flush()
@@ -0,0 +1,319 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+"""
+This module contains the SteelHeadCLI class - the CLI session used by
+SteelHead objects - helpers that run its batched and streamed commands
+on any CLI session, and the PrefetchedCLI class, which answers commands
+from outputs collected in one batch.
+"""
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+import re
+import time
+import codecs
+import select
+
+from steelscript.cmdline import exceptions, sshchannel
+from steelscript.cmdline.cli import CLIMode, rvbd_cli
+
+# Command terminator
+ENTER_LINE = '\r'
+
+
+class SteelHeadCLI(rvbd_cli.RVBD_CLI):
+    """
+    Riverbed appliance CLI with support for running several commands in a
+    single exchange.
+    """
+
+    def exec_batch(self, commands, timeout=60, mode=CLIMode.UNDEF,
+                   output_expected=None, error_expected=False):
+        """
+        Executes several commands in one round-trip.
+
+        All commands are written to the session at once and the appliance
+        runs them back to back.  The prompt printed after each command
+        delimits its output, which is split back per command and returned
+        the same way :py:meth:`exec_command` would have returned it.
+
+        :param commands: list of commands to execute.
+        :param timeout: maximum time, in seconds, to wait for all commands
+            to finish. 0 to wait forever.
+        :param mode: mode to enter before running the commands, as for
+            :py:meth:`exec_command`.
+        :param output_expected: If not None, indicates whether output is
+            expected (True) or no output is expected (False) from each
+            command.
+        :param error_expected: If true, cli error output is returned as
+            regular output instead of raising a CLIError.
+
+        :return: list of command outputs, in the order of `commands`.
+
+        :raises CmdlineTimeout: on timeout
+        :raises CLIError: if the output of a command matches the cli's error
+            format, and error output was not expected.
+        :raises UnexpectedOutput: if output occurs when no output was
+            expected, or no output occurs when output was expected
+        """
+        commands = list(commands)
+        if not commands:
+            return []
+        if not isinstance(self.channel, sshchannel.SSHChannel):
+            # Only SSH sessions can be read without losing the data that
+            # follows a prompt, run the commands one by one elsewhere.
+            return [self.exec_command(cmd, timeout=timeout, mode=mode,
+                                      output_expected=output_expected,
+                                      error_expected=error_expected)
+                    for cmd in commands]
+
+        if mode is CLIMode.UNDEF:
+            mode = self.default_mode
+        if mode is not None:
+            self.enter_mode(mode)
+
+        self._log.debug('Executing batch of %d cmds "%s"'
+                        % (len(commands), '", "'.join(commands)))
+
+        self.channel.send(''.join(cmd + ENTER_LINE for cmd in commands))
+        received = self._receive_prompts(len(commands), timeout)
+
+        outputs = []
+        start = 0
+        for cmd, match in zip(commands, self._prompt_re.finditer(received)):
+            output = received[start:match.start()]
+            start = match.end()
+            # As in exec_command, the first line is the echoed command.
+            output = '\n'.join(output.splitlines()[1:])
+            self._check_output(cmd, output, output_expected, error_expected)
+            outputs.append(output)
+        return outputs
+
+    def iter_command(self, command, timeout=60, mode=CLIMode.UNDEF,
+                     error_expected=False):
+        """
+        Executes the given command and generates its output line by line
+        as it is received, so that long outputs never have to be held in
+        memory at once.
+
+        If the generator is closed early, the rest of the output is read
+        and discarded so the session stays usable.
+
+        :param command: command to execute, newline appended automatically
+        :param timeout: maximum time, in seconds, to wait for the command to
+            finish. 0 to wait forever.
+        :param mode: mode to enter before running the command, as for
+            :py:meth:`exec_command`.
+        :param error_expected: If true, cli error output is returned as
+            regular output instead of raising a CLIError.
+
+        :return: generator of output lines, without line terminators.
+
+        :raises CmdlineTimeout: on timeout
+        :raises CLIError: if the output matches the cli's error format, and
+            error output was not expected.
+        """
+        if not isinstance(self.channel, sshchannel.SSHChannel):
+            output = self.exec_command(command, timeout=timeout, mode=mode,
+                                       error_expected=error_expected)
+            for line in output.splitlines():
+                yield line
+            return
+
+        if mode is CLIMode.UNDEF:
+            mode = self.default_mode
+        if mode is not None:
+            self.enter_mode(mode)
+
+        self._log.debug('Executing cmd "%s"' % command)
+
+        self.channel.send(command + ENTER_LINE)
+        lines = self._iter_lines(timeout)
+        try:
+            # As in exec_command, the first line is the echoed command.
+            next(lines, None)
+            line = next(lines, None)
+            if line is None:
+                return
+            if not error_expected and re.match(self.CLI_ERROR_PROMPT, line):
+                output = '\n'.join([line] + list(lines))
+                raise exceptions.CLIError(command, output=output,
+                                          mode=self.default_mode)
+            yield line
+            for line in lines:
+                yield line
+        finally:
+            # Read up to the prompt if the caller stopped early.
+            for line in lines:
+                pass
+
+    @property
+    def _prompt_re(self):
+        return re.compile(self._prompt)
+
+    def _iter_lines(self, timeout):
+        # Generates complete lines received on the SSH channel up to the
+        # next prompt.
+        prompt_re = self._prompt_re
+        pending = ''
+        for data in self._iter_received(timeout):
+            pending = self.channel.fixup_carriage_returns(pending + data)
+            lines = pending.split('\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line
+            match = prompt_re.search('\n' + pending)
+            if match:
+                if match.start():
+                    yield pending[:match.start() - 1]
+                return
+
+    def _receive_prompts(self, count, timeout):
+        # Reads from the SSH channel until `count` prompts have been seen,
+        # keeping everything received.  SSHChannel.expect() would discard
+        # data that arrived after the first prompt.
+        prompt_re = self._prompt_re
+
+        received = ''
+        # Start of the first line that may still change, and the number of
+        # prompts found before it.
+        line_start = 0
+        found = 0
+
+        for data in self._iter_received(timeout):
+            received = received[:line_start] + \
+                self.channel.fixup_carriage_returns(received[line_start:] +
+                                                    data)
+
+            # Prompts match from the newline that precedes them.
+            last_line = received.rfind('\n') + 1
+            found += sum(1 for _ in prompt_re.finditer(
+                received[:last_line], max(line_start - 1, 0)))
+            line_start = last_line
+            partial = prompt_re.search(received, max(line_start - 1, 0))
+            if found + bool(partial) >= count:
+                return received
+
+    def _iter_received(self, timeout):
+        # Generates decoded chunks of data as they arrive on the SSH channel.
+        ssh = self.channel
+        ssh._verify_connected()
+        decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        starttime = time.time()
+
+        while True:
+            (readers, w, x) = select.select([ssh.channel], [], [], 10)
+
+            if timeout and ((time.time() - starttime) > timeout):
+                raise exceptions.CmdlineTimeout(command=None,
+                                                timeout=timeout,
+                                                failed_match=self._prompt)
+
+            if not readers:
+                if ssh.channel.exit_status_ready():
+                    raise exceptions.ConnectionError(
+                        failed_match=self._prompt,
+                        context='Channel unexpectedly closed')
+                continue
+
+            data = ssh.channel.recv(65536)
+            if not data:
+                raise exceptions.ConnectionError(
+                    failed_match=self._prompt,
+                    context='Channel unexpectedly closed')
+            yield decoder.decode(data)
+
+    def _check_output(self, command, output, output_expected,
+                      error_expected):
+        if output and re.match(self.CLI_ERROR_PROMPT, output):
+            if error_expected:
+                return
+            raise exceptions.CLIError(command, output=output,
+                                      mode=self.default_mode)
+
+        if ((output_expected is not None) and (bool(output) !=
+                                               bool(output_expected))):
+            raise exceptions.UnexpectedOutput(command=command,
+                                              output=output,
+                                              expected_output=output_expected)
+
+
+def exec_batch(cli, commands, **kwargs):
+    """
+    Executes several commands with :py:meth:`SteelHeadCLI.exec_batch` if
+    `cli` supports it, and one by one with ``exec_command`` otherwise, for
+    instance on a plain :py:class:`RVBD_CLI
+    <steelscript.cmdline.cli.rvbd_cli.RVBD_CLI>`.
+
+    :return: list of command outputs, in the order of `commands`.
+    """
+    if hasattr(cli, 'exec_batch'):
+        return cli.exec_batch(commands, **kwargs)
+    return [cli.exec_command(cmd, **kwargs) for cmd in commands]
+
+
+def iter_command(cli, command, **kwargs):
+    """
+    Generates the output lines of a command with
+    :py:meth:`SteelHeadCLI.iter_command` if `cli` supports it, and from the
+    whole output of ``exec_command`` otherwise.
+
+    :return: iterator of output lines, without line terminators.
+    """
+    if hasattr(cli, 'iter_command'):
+        return cli.iter_command(command, **kwargs)
+    return iter(cli.exec_command(command, **kwargs).splitlines())
+
+
+class PrefetchedCLI(object):
+    """
+    A CLI session that answers commands from outputs collected earlier,
+    typically with one :py:meth:`SteelHeadCLI.exec_batch`, and runs any
+    other command on `cli`.
+
+    Models given this session parse the collected outputs as usual, so
+    several model calls cost the single round-trip of the batch.  The
+    arguments of prefetched commands, such as ``output_expected``, are
+    those the outputs were collected with.
+
+    :param cli: The CLI session to run other commands on.
+    :param dict outputs: Command outputs, keyed by command.
+    """
+
+    def __init__(self, cli, outputs):
+        self._cli = cli
+        self._outputs = dict(outputs)
+
+    def __repr__(self):
+        return '<PrefetchedCLI commands: %d>' % len(self._outputs)
+
+    def __getattr__(self, name):
+        return getattr(self._cli, name)
+
+    def exec_command(self, command, **kwargs):
+        """
+        Returns the prefetched output of `command`, or executes it on the
+        wrapped session.
+        """
+        if command in self._outputs:
+            return self._outputs[command]
+        return self._cli.exec_command(command, **kwargs)
+
+    def exec_batch(self, commands, **kwargs):
+        """
+        Returns the prefetched outputs of `commands`, executing the others
+        in one batch on the wrapped session.
+
+        :return: list of command outputs, in the order of `commands`.
+        """
+        missing = [cmd for cmd in commands if cmd not in self._outputs]
+        outputs = dict(self._outputs)
+        if missing:
+            outputs.update(zip(missing,
+                               exec_batch(self._cli, missing, **kwargs)))
+        return [outputs[cmd] for cmd in commands]
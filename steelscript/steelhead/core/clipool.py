@@ -0,0 +1,317 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+"""
+This module contains the CLIPool class - a process-wide pool of CLI sessions
+shared by all SteelHead objects.
+"""
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+import time
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+
+from steelscript.cmdline import exceptions
+from steelscript.steelhead.core.cli import SteelHeadCLI
+
+logger = logging.getLogger(__name__)
+
+
+class CLIPool(object):
+    """
+    A thread-safe pool of started CLI sessions.
+
+    Sessions are keyed by the host, port and credentials they were opened
+    with, so a session is only reused for the same password or key, and
+    handed out exclusively: a session is owned by one caller between
+    :meth:`checkout` and :meth:`release`.  Released sessions are kept open
+    and reused by the next checkout for the same key, which saves the SSH
+    handshake, login and paging setup of a new session.
+
+    Idle sessions are checked on checkout and replaced transparently if
+    their connection has dropped.  Sessions left idle for longer than
+    `idle_timeout` seconds are closed on the next :meth:`checkout` or
+    :meth:`release`.  Nothing runs in the background, so a pool that is no
+    longer used keeps its idle sessions open until :meth:`evict_idle` or
+    :meth:`clear` is called.
+
+    :param int max_per_host: Maximum number of open sessions per host,
+        across all ports and usernames, or None for no limit.  Checkouts
+        beyond this limit wait for a session to be released.  SteelHead
+        objects hold their session until they are closed, so a limit also
+        bounds the number of live SteelHead objects per host.
+    :param int idle_timeout: Seconds after which an unused session is
+        closed.  0 keeps idle sessions open forever.
+    :param int wait_timeout: Seconds a checkout waits for a free slot
+        before giving up.  0 waits forever.
+    :param cli_class: Class used to open new sessions.
+    """
+
+    def __init__(self, max_per_host=None, idle_timeout=300, wait_timeout=60,
+                 cli_class=SteelHeadCLI):
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.wait_timeout = wait_timeout
+        self.cli_class = cli_class
+
+        self.hits = 0
+        self.misses = 0
+        self.reconnects = 0
+        self.evictions = 0
+
+        self._cond = threading.Condition(threading.RLock())
+        # key -> list of (cli, released_at), most recently released last
+        self._idle = defaultdict(list)
+        # host -> number of open sessions, idle or checked out
+        self._open = defaultdict(int)
+        # id(cli) -> key, for every session checked out of this pool
+        self._owners = {}
+
+    def __repr__(self):
+        return ('<CLIPool hosts: %d hits: %d misses: %d>'
+                % (len(self._open), self.hits, self.misses))
+
+    def checkout(self, host, port, auth, timeout=None):
+        """
+        Get an exclusive, started CLI session for the given device.
+
+        :param str host: Name or IP address of the device.
+        :param int port: SSH port of the device.
+        :param auth: Credentials, with at least a ``username`` attribute.
+        :param int timeout: Seconds to wait for a free slot when the host
+            is at `max_per_host`.  Defaults to `wait_timeout`.
+
+        :return: a started instance of `cli_class`.
+
+        :raises ConnectionError: if no session could be obtained in time.
+        """
+        key = (host, port, auth.username, self._credentials(auth))
+        if timeout is None:
+            timeout = self.wait_timeout
+        deadline = time.time() + timeout if timeout else None
+
+        stale = []
+        with self._cond:
+            while True:
+                stale.extend(self._expire_idle())
+                cli = self._take_idle(key, stale)
+                if cli is not None:
+                    self.hits += 1
+                    break
+                if self.max_per_host is None or \
+                        self._open[host] < self.max_per_host or \
+                        self._reclaim_slot(host, stale):
+                    # Reserve the slot now, open the session outside the
+                    # lock so a slow handshake does not stall other hosts.
+                    self._open[host] += 1
+                    self.misses += 1
+                    break
+                remaining = deadline - time.time() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    self._close_all(stale)
+                    raise exceptions.ConnectionError(
+                        context='No CLI session available for %s:%s after '
+                                '%s seconds' % (host, port, timeout))
+                self._cond.wait(remaining)
+
+        self._close_all(stale)
+        if cli is None:
+            try:
+                cli = self._start(host, port, auth)
+            except Exception:
+                with self._cond:
+                    self._open[host] -= 1
+                    self._cond.notify_all()
+                raise
+        with self._cond:
+            self._owners[id(cli)] = key
+        return cli
+
+    def release(self, cli):
+        """
+        Return a session obtained from :meth:`checkout` to the pool.
+
+        Sessions that are no longer connected are closed instead, as are
+        sessions that have been idle longer than `idle_timeout`.
+        """
+        with self._cond:
+            key = self._owners.pop(id(cli), None)
+            if key is None:
+                return
+            stale = self._expire_idle()
+            if self._is_healthy(cli):
+                self._idle[key].append((cli, time.time()))
+            else:
+                self._open[key[0]] -= 1
+                stale.append(cli)
+            self._cond.notify_all()
+        self._close_all(stale)
+
+    def discard(self, cli):
+        """
+        Close a session obtained from :meth:`checkout` instead of returning
+        it to the pool.
+        """
+        with self._cond:
+            key = self._owners.pop(id(cli), None)
+            if key is not None:
+                self._open[key[0]] -= 1
+                self._cond.notify_all()
+        self._close(cli)
+
+    def evict_idle(self):
+        """
+        Close all sessions that have been idle longer than `idle_timeout`.
+        """
+        with self._cond:
+            stale = self._expire_idle()
+            self._cond.notify_all()
+        self._close_all(stale)
+
+    def clear(self):
+        """
+        Close all idle sessions.  Checked out sessions are not affected.
+        """
+        with self._cond:
+            stale = [cli for idle in self._idle.values() for cli, _ in idle]
+            for key, idle in self._idle.items():
+                self._open[key[0]] -= len(idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        self._close_all(stale)
+
+    def stats(self):
+        """
+        Return pool counters.
+
+        :return: Dictionary of values:
+
+        .. code-block:: python
+
+            {'hits': 120,
+             'misses': 4,
+             'reconnects': 1,
+             'evictions': 2,
+             'open': 4,
+             'idle': 3}
+        """
+        with self._cond:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'reconnects': self.reconnects,
+                    'evictions': self.evictions,
+                    'open': sum(self._open.values()),
+                    'idle': sum(len(v) for v in self._idle.values())}
+
+    def _start(self, host, port, auth):
+        cli = self.cli_class(
+            hostname=host,
+            username=auth.username,
+            password=auth.password,
+            private_key_path=getattr(auth, 'private_key_path', None),
+            port=port
+        )
+        cli.start()
+        logger.debug('Opened CLI session to %s:%s as %s'
+                     % (host, port, auth.username))
+        return cli
+
+    def _take_idle(self, key, stale):
+        # Most recently used first, its connection is the least likely to
+        # have been dropped by the appliance.
+        idle = self._idle.get(key)
+        while idle:
+            cli, _ = idle.pop()
+            if self._is_healthy(cli):
+                return cli
+            logger.debug('Dropping disconnected CLI session to %s:%s'
+                         % key[:2])
+            self.reconnects += 1
+            self._open[key[0]] -= 1
+            stale.append(cli)
+        return None
+
+    def _reclaim_slot(self, host, stale):
+        # At the host limit; make room by closing the oldest idle session
+        # that was opened for another port or credentials on the same host.
+        oldest = None
+        for key, idle in self._idle.items():
+            if key[0] == host and idle and \
+                    (oldest is None or idle[0][1] < oldest[1][0][1]):
+                oldest = (key, idle)
+        if oldest is None:
+            return False
+        cli, _ = oldest[1].pop(0)
+        self.evictions += 1
+        self._open[host] -= 1
+        stale.append(cli)
+        return True
+
+    def _expire_idle(self):
+        if not self.idle_timeout:
+            return []
+        cutoff = time.time() - self.idle_timeout
+        stale = []
+        for key, idle in self._idle.items():
+            keep = [(cli, t) for cli, t in idle if t >= cutoff]
+            expired = len(idle) - len(keep)
+            if expired:
+                stale.extend(cli for cli, t in idle if t < cutoff)
+                self.evictions += expired
+                self._open[key[0]] -= expired
+                idle[:] = keep
+        return stale
+
+    @staticmethod
+    def _credentials(auth):
+        # Digest of the secrets a session was opened with, so that sessions
+        # are never handed to callers with other credentials, without
+        # keeping the password itself in the key.
+        secrets = '\0'.join(
+            str(getattr(auth, name, None) or '')
+            for name in ('password', 'private_key_path'))
+        return hashlib.sha256(secrets.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _is_healthy(cli):
+        if cli.channel is None:
+            return False
+        try:
+            cli.channel._verify_connected()
+        except exceptions.ConnectionError:
+            return False
+        return True
+
+    def _close_all(self, clis):
+        for cli in clis:
+            self._close(cli)
+
+    @staticmethod
+    def _close(cli):
+        try:
+            cli._cleanup_helper()
+        except Exception as e:
+            logger.debug('Error closing CLI session: %s' % e)
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool():
+    """
+    Return the process-wide :class:`CLIPool` used by SteelHead objects that
+    were not given a pool of their own.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = CLIPool()
+        return _default_pool
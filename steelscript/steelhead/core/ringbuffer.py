@@ -0,0 +1,107 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+"""
+This module contains the RingBuffer class - a fixed-size history of records
+held in one numpy array.
+
+This module requires numpy, which is not installed with
+steelscript.steelhead.  Install it with the ``frame`` extra.
+"""
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+import numpy
+
+
+class RingBuffer(object):
+    """
+    A fixed-size buffer of records of one numpy dtype.
+
+    Once `capacity` records have been appended, each new record overwrites
+    the oldest one.  Nothing is allocated after construction.
+
+    .. code-block:: python
+
+        samples = RingBuffer(60, [('time', 'f8'), ('value', 'f8')])
+        samples.append((time.time(), 42))
+        history = samples.view()
+
+    :param int capacity: Maximum number of records kept.
+    :param dtype: numpy dtype of the records, usually structured.
+    """
+
+    def __init__(self, capacity, dtype):
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1, got %s'
+                             % capacity)
+        self._data = numpy.zeros(capacity, dtype=dtype)
+        # Index of the next record written, and number of records held.
+        self._next = 0
+        self._count = 0
+
+    def __repr__(self):
+        return '<RingBuffer %d/%d>' % (self._count, self.capacity)
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def capacity(self):
+        return len(self._data)
+
+    @property
+    def dtype(self):
+        return self._data.dtype
+
+    @property
+    def full(self):
+        return self._count == len(self._data)
+
+    def append(self, record):
+        """
+        Append one record, overwriting the oldest one if the buffer is full.
+
+        :param record: tuple of field values, or numpy record of the
+            buffer's dtype.
+        """
+        self._data[self._next] = record
+        self._next = (self._next + 1) % len(self._data)
+        self._count = min(self._count + 1, len(self._data))
+
+    def last(self):
+        """
+        Return a copy of the most recent record, or None if the buffer is
+        empty.
+        """
+        if not self._count:
+            return None
+        return self._data[self._next - 1].copy()
+
+    def view(self, last=None):
+        """
+        Return the records from oldest to newest.
+
+        :param int last: Return only the `last` most recent records.
+
+        :return: numpy array.  It is a view into the buffer when the records
+            are stored contiguously, so it should not be kept across
+            appends; copy it to keep it.
+        """
+        count = self._count if last is None else min(last, self._count)
+        start = (self._next - count) % len(self._data)
+        if start + count <= len(self._data):
+            return self._data[start:start + count]
+        return numpy.concatenate((self._data[start:],
+                                  self._data[:self._next]))
+
+    def clear(self):
+        """
+        Remove all records.
+        """
+        self._next = 0
+        self._count = 0
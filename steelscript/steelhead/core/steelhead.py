@@ -12,7 +12,12 @@ appliance.
 from __future__ import (absolute_import, unicode_literals, print_function,
                         division)
 
-from steelscript.cmdline.cli import rvbd_cli
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from steelscript.steelhead.core.cli import exec_batch as cli_exec_batch
+from steelscript.steelhead.core.clipool import get_default_pool
 
 
 class CLIAuth(object):
@@ -36,13 +41,35 @@ class CLIAuth(object):
             return '<CLIAuth username: %s pkey_path: *****>' % self.username
 
 
+class PooledCLI(object):
+    """
+    Handle on the CLI session of a SteelHead, as held by its models.
+
+    Every attribute is looked up on the session the SteelHead holds at the
+    time of the call, checking one out of the pool if the SteelHead was
+    closed in the meantime.  A model built before :py:meth:`SteelHead.close`
+    thus never keeps using a session that went back to the pool and may
+    now be owned by another caller.
+    """
+
+    def __init__(self, steelhead):
+        self._steelhead = steelhead
+
+    def __repr__(self):
+        return '<PooledCLI %s>' % self._steelhead.host
+
+    def __getattr__(self, name):
+        return getattr(self._steelhead.session, name)
+
+
 class SteelHead(object):
     """
     The SteelHead class if the main interface to interact with a SteelHead
     appliance.
     """
 
-    def __init__(self, host, port=22, auth=None):
+    def __init__(self, host, port=22, auth=None, pool=None,
+                 result_cache=None, version_cache=None):
         """
         Establishes a connection to a SteelHead appliance.
 
@@ -50,29 +77,301 @@ class SteelHead(object):
         :param auth:  Defines the credentials to use to access the SteelHead.
             It should be an instance of
             :py:class:`UserAuth<steelscript.core.service.UserAuth>`
+        :param pool:  The :py:class:`CLIPool` to take CLI sessions from.
+            Defaults to the process-wide pool shared by all SteelHead
+            objects.
+        :param result_cache:  Optional :py:class:`ResultCache
+            <steelscript.steelhead.core.cache.ResultCache>` that models of
+            this SteelHead serve parsed results from.
+        :param version_cache:  Optional :py:class:`VersionCache
+            <steelscript.steelhead.core.cache.VersionCache>` that
+            'show version' results of this SteelHead are kept in.
         """
         self.host = host
         self.port = port
         self.auth = auth
+        self.pool = pool if pool is not None else get_default_pool()
+        self.result_cache = result_cache
+        self.version_cache = version_cache
 
         self._cli = None
+        self._pooled_cli = PooledCLI(self)
+
+    def __del__(self):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
 
     @property
     def cli(self):
         """
-        Grabs a cached CLI object, opening a new one if none exists.
+        The :py:class:`PooledCLI` of this object, which models use to run
+        commands on the session held by this object.
+        """
+        return self._pooled_cli
+
+    @property
+    def session(self):
+        """
+        Grabs the CLI session held by this object, checking one out of the
+        session pool if none is held yet.
         """
         if self._cli is None:
-            # TODO: Use CLICache
-            self._cli = rvbd_cli.RVBD_CLI(
-                hostname=self.host,
-                username=self.auth.username,
-                password=self.auth.password,
-                port=self.port
-            )
-            self._cli.start()
+            self._cli = self.pool.checkout(self.host, self.port, self.auth)
         return self._cli
 
+    def exec_batch(self, commands, **kwargs):
+        """
+        Executes several CLI commands in one round-trip, see
+        :py:meth:`SteelHeadCLI.exec_batch
+        <steelscript.steelhead.core.cli.SteelHeadCLI.exec_batch>`.
+
+        :return: list of command outputs, in the order of `commands`.
+        """
+        return cli_exec_batch(self.session, commands, **kwargs)
+
+    def close(self):
+        """
+        Returns the CLI session held by this object to the session pool.
+        """
+        cli, self._cli = getattr(self, '_cli', None), None
+        if cli is not None:
+            self.pool.release(cli)
+
     @property
     def version(self):
         raise NotImplementedError()
+
+
+class SteelHeadFleet(object):
+    """
+    The SteelHeadFleet class runs the same operation against many SteelHead
+    appliances in parallel.
+
+    Results are yielded as ``(host, result)`` pairs in the order the devices
+    finish, so a slow or unreachable device does not hold back the others.
+    If the operation raised on a device, the exception object is yielded as
+    that device's result.
+
+    .. code-block:: python
+
+        fleet = SteelHeadFleet(['sh1', 'sh2'], auth=auth)
+        for host, result in fleet.run(Model, 'flows', 'show_flows', 'all'):
+            if isinstance(result, Exception):
+                ...
+    """
+
+    def __init__(self, hosts, auth=None, port=22, max_workers=16, pool=None):
+        """
+        :param hosts:  Names or IP addresses of the SteelHeads, or a
+            dictionary mapping each name to its own credentials.
+        :param auth:  Credentials shared by all hosts not given their own.
+        :param int max_workers:  Maximum number of devices worked on at once.
+        :param pool:  The :py:class:`CLIPool` to take CLI sessions from.
+        """
+        if not isinstance(hosts, dict):
+            hosts = dict((host, auth) for host in hosts)
+        self.devices = [SteelHead(host, port=port, auth=host_auth or auth,
+                                  pool=pool)
+                        for host, host_auth in hosts.items()]
+        self.max_workers = max_workers
+
+    def __len__(self):
+        return len(self.devices)
+
+    def map(self, func, *args, **kwargs):
+        """
+        Calls ``func(steelhead, *args, **kwargs)`` for every device.
+
+        :return: generator of ``(host, result or exception)`` tuples,
+            in completion order.
+        """
+        if not self.devices:
+            return
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(self.devices)))
+        futures = dict((executor.submit(self._call, sh, func, args, kwargs),
+                        sh.host) for sh in self.devices)
+        try:
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = e
+                yield futures[future], result
+        finally:
+            # Drop work that has not started if the caller stopped early.
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def run(self, obj_class, feature, method, *args, **kwargs):
+        """
+        Calls a Model or Action method on every device.
+
+        :param obj_class:  :py:class:`Model
+            <steelscript.common.interaction.model.Model>` or
+            :py:class:`Action <steelscript.common.interaction.action.Action>`.
+        :param str feature:  Feature to look the object up for, such as
+            ``'flows'``.
+        :param str method:  Name of the method to call, such as
+            ``'show_flows'``.
+
+        :return: generator of ``(host, result or exception)`` tuples,
+            in completion order.
+        """
+        def call(sh):
+            obj = obj_class.get(sh, feature=feature)
+            return getattr(obj, method)(*args, **kwargs)
+        return self.map(call)
+
+    @staticmethod
+    def _call(sh, func, args, kwargs):
+        try:
+            return func(sh, *args, **kwargs)
+        finally:
+            # Hand the session back so the pool can bound open sessions.
+            sh.close()
+
+
+class AsyncCLI(object):
+    """
+    Awaitable wrapper around the CLI session of a SteelHead.
+
+    CLI sessions are blocking, so each command runs on `executor` (the event
+    loop's default executor if None).  Commands for the same device are
+    serialized, commands for different devices run concurrently.
+    """
+
+    def __init__(self, steelhead, executor=None):
+        self._steelhead = steelhead
+        self._executor = executor
+        self._lock = None
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Runs ``func(cli, *args, **kwargs)`` against the CLI session on the
+        executor and returns its result.
+        """
+        return await self._submit(
+            functools.partial(self._call, func, *args, **kwargs))
+
+    async def exec_command(self, command, **kwargs):
+        """
+        Executes the given command, see
+        :py:meth:`RVBD_CLI.exec_command
+        <steelscript.cmdline.cli.rvbd_cli.RVBD_CLI.exec_command>`.
+        """
+        return await self.run(lambda cli: cli.exec_command(command, **kwargs))
+
+    async def exec_batch(self, commands, **kwargs):
+        """
+        Executes several commands in one round-trip, see
+        :py:meth:`SteelHeadCLI.exec_batch
+        <steelscript.steelhead.core.cli.SteelHeadCLI.exec_batch>`.
+        """
+        return await self.run(
+            lambda cli: cli_exec_batch(cli, commands, **kwargs))
+
+    async def close(self):
+        """
+        Returns the CLI session to the session pool once pending commands
+        have finished.
+        """
+        await self._submit(self._steelhead.close)
+
+    async def _submit(self, call):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, call)
+
+    def _call(self, func, *args, **kwargs):
+        # Runs on the executor; opening the session happens here as well.
+        return func(self._steelhead.session, *args, **kwargs)
+
+
+class AsyncSteelHead(object):
+    """
+    The AsyncSteelHead class is an asyncio interface to a SteelHead
+    appliance.
+
+    Models obtained with ``Model.get(async_steelhead, feature=...)`` provide
+    awaitable ``*_async`` versions of their methods, which parse the output
+    the same way as their blocking counterparts.  Size `executor` to the
+    number of devices that should have a command in flight at once.
+    """
+
+    def __init__(self, host, port=22, auth=None, pool=None, executor=None,
+                 version_cache=None):
+        """
+        :param str host:  Name or IP address of the SteelHead.
+        :param auth:  Defines the credentials to use to access the SteelHead.
+        :param pool:  The :py:class:`CLIPool` to take CLI sessions from.
+        :param executor:  The :py:class:`concurrent.futures.Executor` that
+            runs the blocking CLI calls.  Defaults to the event loop's
+            default executor.
+        :param version_cache:  Optional :py:class:`VersionCache
+            <steelscript.steelhead.core.cache.VersionCache>` that
+            'show version' results of this SteelHead are kept in.
+        """
+        self.steelhead = SteelHead(host, port=port, auth=auth, pool=pool,
+                                   version_cache=version_cache)
+        self._cli = AsyncCLI(self.steelhead, executor=executor)
+
+    @property
+    def host(self):
+        return self.steelhead.host
+
+    @property
+    def port(self):
+        return self.steelhead.port
+
+    @property
+    def auth(self):
+        return self.steelhead.auth
+
+    @property
+    def version_cache(self):
+        return self.steelhead.version_cache
+
+    @version_cache.setter
+    def version_cache(self, cache):
+        self.steelhead.version_cache = cache
+
+    @property
+    def cli(self):
+        """
+        The :py:class:`AsyncCLI` used by models of this SteelHead.
+        """
+        return self._cli
+
+    async def exec_command(self, command, **kwargs):
+        """
+        Executes the given CLI command and returns its output.
+        """
+        return await self._cli.exec_command(command, **kwargs)
+
+    async def exec_batch(self, commands, **kwargs):
+        """
+        Executes several CLI commands in one round-trip and returns their
+        outputs.
+        """
+        return await self._cli.exec_batch(commands, **kwargs)
+
+    async def close(self):
+        """
+        Returns the CLI session held by this object to the session pool.
+        """
+        await self._cli.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, type, value, traceback):
+        await self.close()
@@ -0,0 +1,39 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+"""
+This module contains helpers for the times shown by SteelHeads, such as the
+Since column of flows or the counters cleared date of interfaces.
+
+Appliances show their clock without a time zone.  It is read as UTC
+throughout steelscript.steelhead.
+"""
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+import datetime
+
+# Format of times in the output of the appliance CLI
+APPLIANCE_TIME_FORMAT = '%Y/%m/%d %H:%M:%S'
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def epoch_seconds(value):
+    """
+    Convert a :py:class:`datetime.datetime`, taken as UTC if naive, into
+    seconds since the epoch.  Numbers are taken as seconds since the epoch
+    already and returned unchanged.
+
+    :return: float, or `value` if it is not a datetime.
+    """
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(
+                datetime.timezone.utc).replace(tzinfo=None)
+        return (value - _EPOCH).total_seconds()
+    return value
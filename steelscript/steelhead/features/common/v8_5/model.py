@@ -7,8 +7,28 @@
 from __future__ import (absolute_import, unicode_literals, print_function,
                         division)
 
+import re
+
 from steelscript.common.interaction.model import model, Model
 from steelscript.cmdline.parsers import cli_parse_basic
+from steelscript.steelhead.core.cache import VersionCache, exec_cached
+
+
+# Parts of an uptime such as '15d 23h 22m 33s'
+UPTIME_RE = re.compile(r"(\d+)([dhms])")
+UPTIME_UNITS = {'d': 86400, 'h': 3600, 'm': 60, 's': 1}
+
+
+def parse_uptime(value):
+    """
+    Convert an uptime such as ``'15d 23h 22m 33s'`` into seconds.
+
+    :return: int, or None if `value` is not an uptime.
+    """
+    parts = UPTIME_RE.findall(value)
+    if not parts or UPTIME_RE.sub('', value).strip():
+        return None
+    return sum(int(number) * UPTIME_UNITS[unit] for number, unit in parts)
 
 
 @model
@@ -17,10 +37,16 @@ class CommonModel(Model):
     Kauai model for the 'common' REST Service on the SteelHead product.
     """
 
-    def show_version(self):
+    def show_version(self, refresh=False):
         """
         Returns parsed output of 'show version'.
 
+        If the SteelHead has a :py:class:`VersionCache
+        <steelscript.steelhead.core.cache.VersionCache>` assigned, the
+        result is served from it until its time-to-live expires or the
+        device reboots.  With a ``check_interval``, reboots are looked for
+        in the uptime of 'show info'.
+
         .. code-block:: none
 
             Product name:      rbt_sh
@@ -37,7 +63,12 @@ class CommonModel(Model):
             Number of CPUs:    4
             CPU load averages: 0.08 / 0.17 / 0.10
 
-        :return: Dictionaries of values returned
+        :param refresh:  Run the command even if the result is cached, and
+            cache the new result.
+        :type refresh:  boolean
+
+        :return: Dictionaries of values returned, with the uptime in
+            seconds
 
         .. code-block:: python
 
@@ -45,10 +76,73 @@ class CommonModel(Model):
              'product release': '9.0.1',
              'build id': '#19',
              'build arch': 'x86_64',
+             'uptime': 1380153,
              ...
 
         """
-        output = self.cli.exec_command("show version", output_expected=True)
+        cache = self._version_cache()
+        if cache is None and not refresh:
+            return exec_cached(self, "show version", self._parse_show_version)
+
+        def run():
+            # Not from the ResultCache, which may predate a reboot.
+            output = self.cli.exec_command("show version",
+                                           output_expected=True)
+            return self._parse_show_version(output)
+
+        if cache is None:
+            return run()
+        if refresh:
+            value = run()
+            cache.put(self._resource, value)
+            return value
+        return cache.lookup(self._resource, run, uptime=self._show_uptime)
+
+    async def show_version_async(self, refresh=False):
+        """
+        Awaitable version of :meth:`show_version` for models obtained from an
+        :py:class:`AsyncSteelHead
+        <steelscript.steelhead.core.steelhead.AsyncSteelHead>`, served from
+        its :py:class:`VersionCache
+        <steelscript.steelhead.core.cache.VersionCache>` the same way.
+        """
+        async def run():
+            output = await self.cli.exec_command("show version",
+                                                 output_expected=True)
+            return self._parse_show_version(output)
+
+        cache = self._version_cache()
+        if cache is None:
+            return await run()
+
+        device = self._resource
+        value = None if refresh else cache.get(device)
+        if value is not None and cache.check_due(device):
+            output = await self.cli.exec_command("show info",
+                                                 output_expected=True)
+            if cache.observe(device, self._parse_show_info_uptime(output)):
+                value = None
+        if value is None:
+            value = await run()
+            cache.put(device, value)
+        return value
+
+    def _version_cache(self):
+        cache = getattr(self._resource, 'version_cache', None)
+        return cache if isinstance(cache, VersionCache) else None
+
+    def _show_uptime(self):
+        # 'show info' is cheaper than 'show version'.
+        output = self.cli.exec_command("show info", output_expected=True)
+        return self._parse_show_info_uptime(output)
+
+    def _parse_show_info_uptime(self, output):
+        uptime = cli_parse_basic(output).get('appliance up time')
+        if isinstance(uptime, str):
+            return parse_uptime(uptime)
+        return None
+
+    def _parse_show_version(self, output):
         parsed = cli_parse_basic(output)
 
         # Force 'product model' to be a string.
@@ -56,10 +150,11 @@ class CommonModel(Model):
             if key in parsed:
                 parsed[key] = str(parsed[key])
 
-        # Remove 'uptime' because we don't know what object to parse it into,
-        # along with some others we don't want to format right now.
-        for key in ['uptime', 'cpu load averages', 'system memory',
-                    'build date']:
+        if isinstance(parsed.get('uptime'), str):
+            parsed['uptime'] = parse_uptime(parsed['uptime'])
+
+        # Remove some values we don't want to format right now.
+        for key in ['cpu load averages', 'system memory', 'build date']:
             if key in parsed:
                 del parsed[key]
 
@@ -0,0 +1,288 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+"""
+Top-N aggregation of flows, for one SteelHead or merged across many.
+
+:py:class:`FlowAggregator` counts flows exactly by default.  Given a
+capacity, it keeps at most that many counters with the SpaceSaving
+algorithm, optionally backed by a count-min sketch to tighten the
+estimates, so arbitrarily long flow streams are aggregated in bounded
+memory.
+"""
+
+from __future__ import (unicode_literals, print_function, division,
+                        absolute_import)
+
+import heapq
+import array
+from collections import Counter
+from operator import itemgetter
+
+
+class SpaceSaving(object):
+    """
+    Approximate counts of the most frequent items of a stream, using at
+    most `capacity` counters (Metwally et al., "Efficient Computation of
+    Frequent and Top-k Elements in Data Streams").
+
+    Every item occurring more than ``total / capacity`` times is
+    guaranteed to be kept.  The count of a kept item overestimates its
+    true count by at most its error.
+
+    :param int capacity: Maximum number of counters.
+    """
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+        self.capacity = capacity
+        self.total = 0
+        # item -> [count, error]
+        self._counters = {}
+        # (count, item) entries, outdated ones are skipped when popped
+        self._heap = []
+
+    def __len__(self):
+        return len(self._counters)
+
+    def add(self, item, count=1):
+        """
+        Count `count` more occurrences of `item`.
+        """
+        self.total += count
+        counter = self._counters.get(item)
+        if counter is None:
+            error = 0
+            if len(self._counters) >= self.capacity:
+                # Replace the item with the smallest count.
+                error = self._pop_min()
+            counter = self._counters[item] = [error, error]
+        counter[0] += count
+        self._push(counter[0], item)
+
+    def count(self, item):
+        """
+        Return ``(count, error)`` for `item`, or ``(0, 0)`` if not kept.
+        """
+        return tuple(self._counters.get(item, (0, 0)))
+
+    def top(self, n=None):
+        """
+        Return the `n` items with the highest counts, all if None.
+
+        :return: list of ``(item, count, error)`` tuples, highest first.
+        """
+        items = ((item, count, error)
+                 for item, (count, error) in self._counters.items())
+        if n is None:
+            return sorted(items, key=itemgetter(1), reverse=True)
+        return heapq.nlargest(n, items, key=itemgetter(1))
+
+    def _push(self, count, item):
+        heap = self._heap
+        heapq.heappush(heap, (count, _Ordered(item)))
+        if len(heap) > 4 * self.capacity:
+            # Drop the outdated entries.
+            heap[:] = [(c[0], _Ordered(i)) for i, c in self._counters.items()]
+            heapq.heapify(heap)
+
+    def _pop_min(self):
+        heap = self._heap
+        counters = self._counters
+        while True:
+            count, item = heapq.heappop(heap)
+            counter = counters.get(item.value)
+            if counter is not None and counter[0] == count:
+                del counters[item.value]
+                return count
+
+
+class _Ordered(object):
+    # Heap entry payload that never decides the order of equal counts,
+    # since group keys of mixed types cannot always be compared.
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return False
+
+
+class CountMinSketch(object):
+    """
+    Approximate counts of all items of a stream in fixed memory (Cormode
+    and Muthukrishnan, "An Improved Data Stream Summary: The Count-Min
+    Sketch and its Applications").
+
+    Estimates never undercount, and overcount by more than
+    ``2 * total / width`` with probability below ``2 ** -depth``.  Items
+    are hashed with :py:func:`hash`, so sketches are only comparable
+    within one process.
+
+    :param int width: Counters per row.
+    :param int depth: Number of rows.
+    """
+
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self._rows = [array.array('Q', bytes(8 * width))
+                      for _ in range(depth)]
+
+    def add(self, item, count=1):
+        """
+        Count `count` more occurrences of `item`.
+        """
+        self.total += count
+        width = self.width
+        for seed, row in enumerate(self._rows):
+            row[hash((seed, item)) % width] += count
+
+    def estimate(self, item):
+        """
+        Return the estimated count of `item`.
+        """
+        width = self.width
+        return min(row[hash((seed, item)) % width]
+                   for seed, row in enumerate(self._rows))
+
+
+class FlowAggregator(object):
+    """
+    Counts flows grouped by some of their fields.
+
+    .. code-block:: python
+
+        agg = FlowAggregator(['destination ip', 'destination port'])
+        agg.update(model.show_flows()['flows_list'])
+        agg.top(10)
+
+        # Across a fleet, with the device as part of the key
+        agg = FlowAggregator(['device', 'app'], capacity=1000)
+        agg.update_fleet(fleet.run(Model, 'flows', 'show_flows'))
+
+    :param keys: flow key, such as ``'app'``, or list of keys to group by.
+        ``'device'`` stands for the host the flows were read from.  Groups
+        are keyed by the value of a single key, or by the tuple of the
+        values of a list of keys.
+    :param int capacity: If given, count in bounded memory with at most
+        this many counters and report approximate counts.  Exact counts
+        are kept otherwise.
+    :param bool sketch: With a capacity, also count all groups in a
+        :py:class:`CountMinSketch` and report the lower of both estimates.
+    :param int width: Width of the sketch.
+    :param int depth: Depth of the sketch.
+    """
+
+    def __init__(self, keys, capacity=None, sketch=False, width=2048,
+                 depth=4):
+        self.keys = keys
+        self.total = 0
+        self._group = _grouper(keys)
+        if capacity is None:
+            self._counter = Counter()
+            self._summary = self._sketch = None
+        else:
+            self._counter = None
+            self._summary = SpaceSaving(capacity)
+            self._sketch = CountMinSketch(width, depth) if sketch else None
+
+    @property
+    def exact(self):
+        """True if the counts are exact."""
+        return self._counter is not None
+
+    def add(self, flow, device=None):
+        """
+        Count one flow read from `device`.
+        """
+        self.total += 1
+        group = self._group(flow, device)
+        if self._counter is not None:
+            self._counter[group] += 1
+            return
+        self._summary.add(group)
+        if self._sketch is not None:
+            self._sketch.add(group)
+
+    def update(self, flows, device=None):
+        """
+        Count the flows of one device.
+
+        :param flows: ``show_flows`` result, or iterable of flows.
+        """
+        if isinstance(flows, dict):
+            flows = flows['flows_list']
+        add = self.add
+        for flow in flows:
+            add(flow, device)
+
+    def update_fleet(self, results):
+        """
+        Count the flows of many devices.
+
+        :param results: iterable of ``(host, flows)`` tuples, as generated
+            by :py:meth:`SteelHeadFleet.run
+            <steelscript.steelhead.core.steelhead.SteelHeadFleet.run>`.
+            Exceptions in place of flows are skipped.
+        """
+        for host, flows in results:
+            if not isinstance(flows, Exception):
+                self.update(flows, host)
+
+    def top(self, n=10):
+        """
+        Return the `n` groups with the most flows, all if None.
+
+        :return: list of ``(group, count)`` tuples, highest first.
+        """
+        if self._counter is not None:
+            return self._counter.most_common(n)
+        top = self._summary.top()
+        if self._sketch is not None:
+            estimate = self._sketch.estimate
+            top = [(group, min(count, estimate(group)), error)
+                   for group, count, error in top]
+            top.sort(key=itemgetter(1), reverse=True)
+        return [(group, count) for group, count, _ in top[:n]]
+
+
+def group_by(flows, keys):
+    """
+    Return the exact number of flows per group, as a
+    :py:class:`collections.Counter`.
+
+    :param flows: ``show_flows`` result, or iterable of flows.
+    :param keys: key or list of keys, as for :py:class:`FlowAggregator`.
+    """
+    aggregator = FlowAggregator(keys)
+    aggregator.update(flows)
+    return aggregator._counter
+
+
+def top_flows(flows, keys, n=10):
+    """
+    Return the `n` groups with the most flows.
+
+    :param flows: ``show_flows`` result, or iterable of flows.
+    :param keys: key or list of keys, as for :py:class:`FlowAggregator`.
+
+    :return: list of ``(group, count)`` tuples, highest first.
+    """
+    return group_by(flows, keys).most_common(n)
+
+
+def _grouper(keys):
+    if isinstance(keys, str):
+        if keys == 'device':
+            return lambda flow, device: device
+        return lambda flow, device: flow[keys]
+    keys = tuple(keys)
+    return lambda flow, device: tuple(device if key == 'device' else
+                                      flow[key] for key in keys)
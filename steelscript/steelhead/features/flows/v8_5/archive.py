@@ -0,0 +1,223 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+"""
+On-disk archive of flow snapshots.
+
+Each poll of a device is stored as a directory holding one ``.npy`` file
+per field of :py:data:`FLOW_DTYPE
+<steelscript.steelhead.features.flows.v8_5.columns.FLOW_DTYPE>`, 65 bytes
+per flow in all.  Columns are memory-mapped when they are first looked up,
+so filters and aggregates over many snapshots only read the columns they
+use.  App names are stored in 16 bytes, longer names are truncated.
+
+This module requires numpy, which is not installed with
+steelscript.steelhead.  Install it with the ``frame`` extra.
+"""
+
+from __future__ import (unicode_literals, print_function, division,
+                        absolute_import)
+
+import os
+import shutil
+import datetime
+from collections import namedtuple
+from collections.abc import Mapping
+from urllib.parse import quote, unquote
+
+import numpy
+
+from steelscript.steelhead.features.flows.v8_5.columns import (
+    FLOW_DTYPE, flows_to_records)
+
+
+# File names are the UTC time of the poll
+TIMESTAMP_FORMAT = '%Y%m%dT%H%M%SZ'
+
+ArchivedSnapshot = namedtuple('ArchivedSnapshot',
+                              ['device', 'timestamp', 'path'])
+
+
+def _column_file(path, field):
+    return os.path.join(path, field.replace(' ', '_') + '.npy')
+
+
+class ArchivedFlows(Mapping):
+    """
+    The flows of an archived snapshot, as a mapping of the fields of
+    :py:data:`FLOW_DTYPE
+    <steelscript.steelhead.features.flows.v8_5.columns.FLOW_DTYPE>` to
+    read-only columns.  Each column is memory-mapped from its own file on
+    first access.
+
+    :param str path: Directory of the snapshot.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._columns = {}
+
+    def __repr__(self):
+        return '<ArchivedFlows %s>' % self.path
+
+    def __getitem__(self, field):
+        column = self._columns.get(field)
+        if column is None:
+            if field not in FLOW_DTYPE.names:
+                raise KeyError(field)
+            column = numpy.load(_column_file(self.path, field),
+                                mmap_mode='r', allow_pickle=False)
+            self._columns[field] = column
+        return column
+
+    def __iter__(self):
+        return iter(FLOW_DTYPE.names)
+
+    def __len__(self):
+        return len(FLOW_DTYPE.names)
+
+    @property
+    def size(self):
+        """
+        Number of flows in the snapshot.
+        """
+        return len(self['type'])
+
+    def to_records(self):
+        """
+        Read all columns into an array of :py:data:`FLOW_DTYPE
+        <steelscript.steelhead.features.flows.v8_5.columns.FLOW_DTYPE>`
+        records.
+        """
+        records = numpy.empty(self.size, dtype=FLOW_DTYPE)
+        for field in FLOW_DTYPE.names:
+            records[field] = self[field]
+        return records
+
+
+class FlowArchive(object):
+    """
+    A directory of flow snapshots, laid out as
+    ``<root>/<device>/<timestamp>/<field>.npy``.
+
+    .. code-block:: python
+
+        archive = FlowArchive('/var/lib/flows')
+        archive.write(sh.host, model.show_flows_records())
+
+        for snapshot, flows in archive.iter_snapshots(start=last_week):
+            https = flows[flows['destination port'] == 443]
+            ...
+
+    :param str root: Directory of the archive, created if needed.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def __repr__(self):
+        return '<FlowArchive %s>' % self.root
+
+    def write(self, device, flows, timestamp=None):
+        """
+        Store the flows of one poll, one file per column.  App names
+        longer than 16 bytes are truncated.
+
+        :param str device: Host the flows were read from.
+        :param flows: array of :py:data:`FLOW_DTYPE
+            <steelscript.steelhead.features.flows.v8_5.columns.FLOW_DTYPE>`
+            records, as returned by
+            :py:meth:`FlowsModel.show_flows_records`, or iterable of flows
+            as in the ``flows_list`` of :py:meth:`FlowsModel.show_flows`.
+        :param timestamp: :py:class:`datetime.datetime` of the poll, in UTC
+            if naive.  Defaults to now.  Timestamps are stored to the
+            second.
+
+        :return: path of the new snapshot directory.
+        """
+        if not (isinstance(flows, numpy.ndarray) and
+                flows.dtype == FLOW_DTYPE):
+            flows = flows_to_records(flows)
+        if timestamp is None:
+            timestamp = datetime.datetime.now(datetime.timezone.utc)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(datetime.timezone.utc)
+        directory = os.path.join(self.root, quote(device, safe=''))
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, timestamp.strftime(TIMESTAMP_FORMAT))
+        # Written aside and renamed, readers never see a partial snapshot.
+        tmp = path + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.mkdir(tmp)
+        for field in FLOW_DTYPE.names:
+            numpy.save(_column_file(tmp, field),
+                       numpy.ascontiguousarray(flows[field]),
+                       allow_pickle=False)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.replace(tmp, path)
+        return path
+
+    def devices(self):
+        """
+        Return the sorted list of devices with snapshots.
+        """
+        return sorted(unquote(name) for name in os.listdir(self.root)
+                      if os.path.isdir(os.path.join(self.root, name)))
+
+    def snapshots(self, device=None, start=None, end=None):
+        """
+        List the stored snapshots, oldest first.
+
+        :param str device: Only list snapshots of this device.
+        :param start: Only list snapshots taken at or after this naive UTC
+            :py:class:`datetime.datetime`.
+        :param end: Only list snapshots taken before this naive UTC
+            :py:class:`datetime.datetime`.
+
+        :return: list of :py:class:`ArchivedSnapshot` tuples.
+        """
+        devices = self.devices() if device is None else [device]
+        snapshots = []
+        for device in devices:
+            directory = os.path.join(self.root, quote(device, safe=''))
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                try:
+                    timestamp = datetime.datetime.strptime(
+                        name, TIMESTAMP_FORMAT)
+                except ValueError:
+                    continue
+                if (start is not None and timestamp < start) or \
+                        (end is not None and timestamp >= end):
+                    continue
+                snapshots.append(ArchivedSnapshot(
+                    device, timestamp, os.path.join(directory, name)))
+        snapshots.sort(key=lambda s: (s.timestamp, s.device))
+        return snapshots
+
+    @staticmethod
+    def read(snapshot):
+        """
+        Open the flows of a snapshot.  No column is read until it is looked
+        up.
+
+        :param snapshot: :py:class:`ArchivedSnapshot` or path of its
+            directory.
+
+        :return: :py:class:`ArchivedFlows`
+        """
+        return ArchivedFlows(getattr(snapshot, 'path', snapshot))
+
+    def iter_snapshots(self, device=None, start=None, end=None):
+        """
+        Generate ``(snapshot, flows)`` for the snapshots selected as for
+        :py:meth:`snapshots`, with flows opened by :py:meth:`read`.
+        """
+        for snapshot in self.snapshots(device, start, end):
+            yield snapshot, self.read(snapshot)
@@ -0,0 +1,154 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+"""
+Typed columns of the output of 'show flows', as numpy arrays.
+
+This module requires numpy, which is not installed with
+steelscript.steelhead.  Install it with the ``frame`` extra.
+"""
+
+from __future__ import (unicode_literals, print_function, division,
+                        absolute_import)
+
+import array
+
+import numpy
+
+from steelscript.steelhead.features.flows.v8_5.parser import (
+    FlowsParser, _pack_endpoint, flow_since_epoch, pack_ip, since_to_epoch)
+
+
+# Stored for flows without reduction and pre_existing flows respectively;
+# the latter reads as NaT once viewed as datetime64.
+NO_REDUCTION = -1
+NO_SINCE = numpy.iinfo(numpy.int64).min
+
+# Fixed-width record of one flow.  App names longer than 16 bytes are
+# truncated.
+FLOW_DTYPE = numpy.dtype([
+    ('type', 'S4'),
+    ('source ip hi', '<u8'),
+    ('source ip lo', '<u8'),
+    ('source port', '<u2'),
+    ('destination ip hi', '<u8'),
+    ('destination ip lo', '<u8'),
+    ('destination port', '<u2'),
+    ('app', 'S16'),
+    ('reduction', 'i1'),
+    ('since', '<M8[s]'),
+])
+
+
+class FlowColumnsParser(FlowsParser):
+    """
+    Parser for the output of 'show flows' that fills typed columns directly,
+    without building a dictionary per flow.
+
+    Types and apps are stored as codes into the :py:attr:`types` and
+    :py:attr:`apps` lists, which are filled by :py:meth:`parse_columns`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(FlowColumnsParser, self).__init__(*args, **kwargs)
+        self.types = []
+        self.apps = []
+
+    def parse_columns(self, output):
+        """
+        Parse the complete output of 'show flows'.
+
+        :return: dictionary of numpy arrays keyed by the column names of
+            :py:data:`FLOW_DTYPE`.  ``type`` and ``app`` hold int32 codes,
+            ``reduction`` holds :py:data:`NO_REDUCTION` and ``since`` holds
+            :py:data:`NO_SINCE` (NaT) where there is no value.
+        """
+        types = {}
+        apps = {}
+        type_codes = array.array('i')
+        app_codes = array.array('i')
+        src_hi = array.array('Q')
+        src_lo = array.array('Q')
+        src_port = array.array('H')
+        dst_hi = array.array('Q')
+        dst_lo = array.array('Q')
+        dst_port = array.array('H')
+        reduction = array.array('b')
+        since = array.array('q')
+
+        for match in self.iter_matches(output.splitlines()):
+            type, src, dst, app, rdn, when = match.groups()
+            type_codes.append(types.setdefault(type, len(types)))
+            app_codes.append(apps.setdefault(app, len(apps)))
+            (hi, lo), port = _pack_endpoint(src)
+            src_hi.append(hi)
+            src_lo.append(lo)
+            src_port.append(port)
+            (hi, lo), port = _pack_endpoint(dst)
+            dst_hi.append(hi)
+            dst_lo.append(lo)
+            dst_port.append(port)
+            reduction.append(int(rdn) if rdn else NO_REDUCTION)
+            epoch = since_to_epoch(when)
+            since.append(NO_SINCE if epoch is None else epoch)
+
+        self.types = sorted(types, key=types.get)
+        self.apps = sorted(apps, key=apps.get)
+        return {
+            'type': numpy.frombuffer(type_codes, dtype=numpy.int32),
+            'source ip hi': numpy.frombuffer(src_hi, dtype=numpy.uint64),
+            'source ip lo': numpy.frombuffer(src_lo, dtype=numpy.uint64),
+            'source port': numpy.frombuffer(src_port, dtype=numpy.uint16),
+            'destination ip hi': numpy.frombuffer(dst_hi, dtype=numpy.uint64),
+            'destination ip lo': numpy.frombuffer(dst_lo, dtype=numpy.uint64),
+            'destination port': numpy.frombuffer(dst_port,
+                                                 dtype=numpy.uint16),
+            'app': numpy.frombuffer(app_codes, dtype=numpy.int32),
+            'reduction': numpy.frombuffer(reduction, dtype=numpy.int8),
+            'since': numpy.frombuffer(since, dtype=numpy.int64).view(
+                'datetime64[s]'),
+        }
+
+    def parse_records(self, output):
+        """
+        Parse the complete output of 'show flows'.
+
+        :return: numpy array of :py:data:`FLOW_DTYPE` records.
+        """
+        columns = self.parse_columns(output)
+        records = numpy.empty(len(columns['type']), dtype=FLOW_DTYPE)
+        for name, values in columns.items():
+            if name == 'type':
+                values = _encode(self.types, FLOW_DTYPE['type'])[values]
+            elif name == 'app':
+                values = _encode(self.apps, FLOW_DTYPE['app'])[values]
+            records[name] = values
+        return records
+
+
+def flows_to_records(flows):
+    """
+    Convert flow dictionaries or :py:class:`Flow
+    <steelscript.steelhead.features.flows.v8_5.parser.Flow>` records, as
+    returned by :py:meth:`FlowsModel.show_flows` with any ``since`` form,
+    to an array of :py:data:`FLOW_DTYPE` records.
+    """
+    flows = list(flows)
+    records = numpy.empty(len(flows), dtype=FLOW_DTYPE)
+    for i, flow in enumerate(flows):
+        since = flow_since_epoch(flow['since'])
+        if since is None:
+            since = NO_SINCE
+        records[i] = ((flow['type'].encode(),) +
+                      pack_ip(flow['source ip']) + (flow['source port'],) +
+                      pack_ip(flow['destination ip']) +
+                      (flow['destination port'], flow['app'].encode(),
+                       flow.get('reduction', NO_REDUCTION), since))
+    return records
+
+
+def _encode(strings, dtype):
+    return numpy.array([s.encode() for s in strings], dtype=dtype)
@@ -0,0 +1,53 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+"""
+Columnar form of the output of 'show flows', as a pandas DataFrame.
+
+This module requires numpy and pandas, which are not installed with
+steelscript.steelhead.  Install them with the ``frame`` extra.
+"""
+
+from __future__ import (unicode_literals, print_function, division,
+                        absolute_import)
+
+import pandas
+
+from steelscript.steelhead.features.flows.v8_5.columns import (
+    FlowColumnsParser, NO_REDUCTION)
+
+
+COLUMNS = ['type', 'source ip hi', 'source ip lo', 'source port',
+           'destination ip hi', 'destination ip lo', 'destination port',
+           'app', 'reduction', 'since']
+
+
+class FlowsFrameParser(FlowColumnsParser):
+    """
+    Parser for the output of 'show flows' that fills typed columns directly,
+    without building a dictionary per flow.
+    """
+
+    def parse_frame(self, output):
+        """
+        Parse the complete output of 'show flows'.
+
+        :return: DataFrame as returned by
+            :py:meth:`FlowsModel.show_flows_frame`.
+        """
+        columns = self.parse_columns(output)
+        reduction = columns['reduction']
+        columns.update({
+            'type': pandas.Categorical.from_codes(columns['type'],
+                                                  categories=self.types),
+            'app': pandas.Categorical.from_codes(columns['app'],
+                                                 categories=self.apps),
+            'reduction': pandas.arrays.IntegerArray(
+                reduction, reduction == NO_REDUCTION),
+        })
+        frame = pandas.DataFrame(columns, columns=COLUMNS)
+        frame.attrs['flows_summary'] = self.summary
+        return frame
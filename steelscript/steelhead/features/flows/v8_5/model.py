@@ -8,10 +8,11 @@ from __future__ import (unicode_literals, print_function, division,
                         absolute_import)
 
 from steelscript.common.interaction.model import model, Model
-
-import re
-import ipaddress
-from collections import namedtuple
+from steelscript.steelhead.core.cache import exec_cached
+from steelscript.steelhead.core.cli import iter_command
+from steelscript.steelhead.features.flows.v8_5.parser import (
+    FlowsParser, FlowStream, flow_record)
+from steelscript.steelhead.features.flows.v8_5.snapshot import FlowSnapshot
 
 
 @model
@@ -20,66 +21,8 @@ class FlowsModel(Model):
     Kauai Flows model for the SteelHead product
     """
 
-    def _parse_ip_addr(self, ip):
-        ParsedIP = namedtuple('ParsedIP', ['address', 'port'])
-
-        # IPv4 looks like 123.124.125.126:1234
-        # IPv6 looks like [2001:0db8:85a3:0000:0000:8a2e:0370:7334]:1234
-        ip_pattern = "\[*([\w\.:]+)\]*:(\d+)"
-        ip_regex = re.compile(ip_pattern)
-        ip_match = ip_regex.search(ip)
-        if ip_match:
-            return ParsedIP(address=ipaddress.ip_address(ip_match.group(1)),
-                            port=int(ip_match.group(2)))
-
-    def _parse_flow_summary(self, output):
-        # group 1
-        type_pattern = "([a-zA-Z]+)"
-        # group 2-5 (src/dst) in IPv4 or IPv6 format
-        ip_pattern = "([\w\.\[\]:]+)"
-        # group 6
-        app_pattern = "(.+?)"
-        # group 7 - this only shows up for optimized connections
-        reduction_pattern = "(\d*)%*"
-        # group 8-13
-        # The Rdn Since value can be a date+time or the string pre_existing
-        since_pattern = "(pre_existing|\d+\/\d+\/\d+\s+\d+:\d+:\d+)"
-
-        flow_pattern = "%s\s+%s\s+%s\s+%s\s+%s\s+%s\s*$" \
-                       % (type_pattern, ip_pattern, ip_pattern,
-                          app_pattern, reduction_pattern, since_pattern)
-
-        flow_info_dict = None
-        regex = re.compile(flow_pattern)
-        match = regex.search(output)
-        if match:
-            src = self._parse_ip_addr(match.group(2))
-            dst = self._parse_ip_addr(match.group(3))
-            flow_info_dict = dict()
-            flow_info_dict = {
-                'type': match.group(1),
-                'source ip': src.address,
-                'source port': src.port,
-                'destination ip': dst.address,
-                'destination port': dst.port,
-                'app': match.group(4)}
-            if match.group(5):
-                flow_info_dict['reduction'] = int(match.group(5))
-            if match.group(6) == 'pre_existing':
-                flow_info_dict['since'] = {'pre_existing': True}
-            else:
-                date_time = match.group(6).split(' ')
-                datestring = date_time[0].split('/')
-                timestring = date_time[1].split(':')
-                flow_info_dict['since'] = {'year': datestring[0],
-                                           'month': datestring[1],
-                                           'day': datestring[2],
-                                           'hour': timestring[0],
-                                           'min': timestring[1],
-                                           'secs': timestring[2]}
-        return flow_info_dict
-
-    def show_flows(self, type='all'):
+    def show_flows(self, type='all', compact=False, parallel=False,
+                   since_watermark=None, since='dict'):
         """
         Method to show Flows on a SteelHead.  Currently, some flow types are
         not supported and will not be included in the output.  These types are
@@ -89,6 +32,37 @@ class FlowsModel(Model):
                      choices include all, optimized, passthrough, packet-mode,
                      and tcp-term.
         :type type: string
+        :param compact: Optional parameter to return each flow as a
+                        read-only :py:class:`.Flow` mapping instead of a
+                        dictionary.  Flows hold their output line and build
+                        their values on access, which saves most of the
+                        memory of large flow lists.  Compact results are not
+                        cached.
+        :type compact: bool
+        :param parallel: Optional parameter to parse large outputs in worker
+                         processes, one per CPU, as
+                         :py:meth:`.FlowsParser.parse_parallel` does.
+                         Outputs shorter than
+                         :py:data:`.PARALLEL_THRESHOLD` characters are
+                         parsed in-process.  Scripts using this must run
+                         under an ``if __name__ == '__main__':`` guard.
+        :type parallel: bool
+        :param since_watermark: Optional parameter to only return flows that
+                                started after this time, such as the time of
+                                the previous poll.  pre_existing flows are
+                                left out as well.  Older flow lines are
+                                skipped before they are parsed; the summary
+                                still covers all flows.  Results are not
+                                cached.
+        :type since_watermark: datetime.datetime
+        :param since: Optional parameter to select the form of the since
+                      value of flows: ``'dict'`` for the dictionary shown
+                      below, ``'epoch'`` for integer seconds since the epoch
+                      or ``'datetime'`` for :py:class:`datetime.datetime`.
+                      pre_existing flows have :py:data:`.PRE_EXISTING_EPOCH`
+                      and :py:data:`.PRE_EXISTING_DATETIME` respectively.
+                      Only ``'dict'`` results are cached.
+        :type since: string
 
         :return: dictionary
 
@@ -135,83 +109,171 @@ class FlowsModel(Model):
 
         """
 
+        cmd = "show flows %s" % type
+        parser = FlowsParser(flow_record(compact, since), since_watermark)
+        parse = parser.parse_parallel if parallel else parser.parse
+        if compact or since_watermark is not None or since != 'dict':
+            # Only results in the default form are cached.
+            return parse(self.cli.exec_command(cmd, output_expected=True))
+        return exec_cached(self, cmd, parse)
+
+    def show_flows_snapshot(self, type='all', compact=False):
+        """
+        Method to take a snapshot of the Flows on a SteelHead, for
+        comparison with a later one.
+
+        :param type: Optional parameter to select the type of Flows, as for
+                     :py:meth:`show_flows`.
+        :type type: string
+        :param compact: Optional parameter to hold :py:class:`.Flow`
+                        records, as for :py:meth:`show_flows`.
+        :type compact: bool
+
+        :return: :py:class:`FlowSnapshot
+            <steelscript.steelhead.features.flows.v8_5.snapshot.FlowSnapshot>`
+        """
+        return FlowSnapshot.from_result(self.show_flows(type, compact))
+
+    def show_flows_frame(self, type='all'):
+        """
+        Method to show Flows on a SteelHead as a pandas DataFrame with one
+        row per flow.  The output is parsed straight into typed columns,
+        which takes a fraction of the memory of :py:meth:`show_flows` and
+        allows vectorized filtering and grouping.  Results are not cached.
+
+        Requires numpy and pandas.
+
+        :param type: Optional parameter to select the type of Flows, as for
+                     :py:meth:`show_flows`.
+        :type type: string
+
+        :return: DataFrame with the columns:
+
+            - ``type`` and ``app``, categorical
+            - ``source ip hi``, ``source ip lo``, ``destination ip hi`` and
+              ``destination ip lo``, uint64 halves of the addresses packed
+              by :py:func:`pack_ip
+              <steelscript.steelhead.features.flows.v8_5.parser.pack_ip>`
+            - ``source port`` and ``destination port``, uint16
+            - ``reduction``, Int8, <NA> when the flow is not optimized
+            - ``since``, datetime64[s], NaT for pre_existing flows
+
+            The summary, as ``flows_summary`` in :py:meth:`show_flows`, is
+            in the ``attrs['flows_summary']`` of the DataFrame.
+        """
+        from steelscript.steelhead.features.flows.v8_5.frame import \
+            FlowsFrameParser
+
+        cmd = "show flows %s" % type
+        result = self.cli.exec_command(cmd, output_expected=True)
+        return FlowsFrameParser().parse_frame(result)
+
+    def show_flows_records(self, type='all'):
+        """
+        Method to show Flows on a SteelHead as a numpy array of fixed-width
+        records, the fields of which :py:class:`FlowArchive
+        <steelscript.steelhead.features.flows.v8_5.archive.FlowArchive>`
+        stores as columns.
+        Like :py:meth:`show_flows_frame`, the output is parsed straight
+        into typed columns.  Results are not cached.
+
+        Requires numpy.
+
+        :param type: Optional parameter to select the type of Flows, as for
+                     :py:meth:`show_flows`.
+        :type type: string
+
+        :return: array of :py:data:`FLOW_DTYPE
+            <steelscript.steelhead.features.flows.v8_5.columns.FLOW_DTYPE>`
+            records, with the columns of :py:meth:`show_flows_frame`.
+            ``type`` and ``app`` are bytes, ``reduction`` is -1 when the
+            flow is not optimized.
+        """
+        from steelscript.steelhead.features.flows.v8_5.columns import \
+            FlowColumnsParser
+
         cmd = "show flows %s" % type
         result = self.cli.exec_command(cmd, output_expected=True)
+        return FlowColumnsParser().parse_records(result)
+
+    def show_flows_summary(self, type='all'):
+        """
+        Method to show the Flows summary of a SteelHead.  Only the totals
+        block of the output is parsed, which is much cheaper than
+        :py:meth:`show_flows` on appliances with many flows.  Results are
+        not cached.
+
+        :param type: Optional parameter to select the type of Flows, as for
+                     :py:meth:`show_flows`.
+        :type type: string
+
+        :return: dictionary, as the ``flows_summary`` returned by
+                 :py:meth:`show_flows`
+
+        .. code-block:: python
+
+            {
+                'denied': {'all': 1},
+                'discarded': {'all': 1},
+                'establishing': {'all': 1, 'v4': 2, 'v6': 3},
+                ...
+                'total': {'all': 1, 'v4': 2, 'v6': 3}
+            }
+        """
+        cmd = "show flows %s" % type
+        result = self.cli.exec_command(cmd, output_expected=True)
+        return FlowsParser().parse_summary(result)
+
+    def iter_flows(self, type='all', compact=False, since_watermark=None,
+                   since='dict'):
+        """
+        Method to stream Flows from a SteelHead.  Flows are parsed as the
+        output of 'show flows' is received and handed out one at a time, so
+        that tables with millions of flows can be processed without holding
+        them in memory.  Results are never cached.
+
+        The CLI session is busy until the stream is exhausted or closed.
+
+        :param type: Optional parameter to select the type of Flows, as for
+                     :py:meth:`show_flows`.
+        :type type: string
+        :param compact: Optional parameter to generate :py:class:`.Flow`
+                        records, as for :py:meth:`show_flows`.
+        :type compact: bool
+        :param since_watermark: Optional parameter to skip flows that
+                                started at or before this time, as for
+                                :py:meth:`show_flows`.
+        :type since_watermark: datetime.datetime
+        :param since: Optional parameter to select the form of the since
+                      value of flows, as for :py:meth:`show_flows`.
+        :type since: string
+
+        :return: :py:class:`FlowStream
+            <steelscript.steelhead.features.flows.v8_5.parser.FlowStream>`
+            iterator of flow dictionaries, as in the ``flows_list`` of
+            :py:meth:`show_flows`.  Its ``summary`` attribute holds the
+            ``flows_summary`` once all flows have been read.
+
+        .. code-block:: python
+
+            flows = model.iter_flows('optimized')
+            for flow in flows:
+                print(flow['source ip'], flow['app'])
+            print(flows.summary['total'])
+        """
+        cmd = "show flows %s" % type
+        return FlowStream(iter_command(self.cli, cmd),
+                          flow_record(compact, since), since_watermark)
+
+    async def show_flows_async(self, type='all'):
+        """
+        Awaitable version of :meth:`show_flows` for models obtained from an
+        :py:class:`AsyncSteelHead
+        <steelscript.steelhead.core.steelhead.AsyncSteelHead>`.
+        """
+        cmd = "show flows %s" % type
+        result = await self.cli.exec_command(cmd, output_expected=True)
+        return self._parse_show_flows(result)
 
-        # Parse show flows all cmd output
-        lines = result.splitlines()
-
-        title_parsed = False
-        title_pattern = "T\s+Source\s+Destination\s+App\s+Rdn\s+Since"
-        title_regex = re.compile(title_pattern)
-
-        flows_list = []
-        flows_summary_dict = dict()
-
-        summary_list = {'Established Optimized': 'established optimized',
-                        'RiOS Only (O)': 'rios only',
-                        'SCPS Only (SO)': 'scps only',
-                        'RiOS+SCPS (RS)': 'rios scps',
-                        'TCP Proxy (TP)': 'tcp proxy',
-                        'Packet-mode optimized (N)': 'packet_mode optimized',
-                        'Half-opened optimized (H)': 'half_opened optimized',
-                        'Half-closed optimized (C)': 'half_closed optimized',
-                        'Establishing (E)': 'establishing',
-                        'Passthrough': 'passthrough',
-                        'Passthrough intentional (PI)':
-                            'passthrough intentional',
-                        'Passthrough unintentional (PU)':
-                            'passthrough unintentional',
-                        'Terminated': 'passthrough unintentional terminated',
-                        'Packet-mode': 'passthrough unintentional packet_mode',
-                        'Forwarded (F)': 'forwarded',
-                        'Discarded (terminated)': 'discarded',
-                        'Denied (terminated)': 'denied',
-                        'Total': 'total'}
-
-        for line in lines:
-            # Skip empty line
-            if not len(line):
-                continue
-
-            # Parse Title
-            if title_parsed is not True:
-                match = title_regex.search(line)
-                if match:
-                    title_parsed = True
-                    # Done parsing Title
-                    continue
-
-            # Skip "-----------..." lines
-            match = re.match(r'^-+$', line)
-            if match:
-                continue
-
-            # Parse connections/flows
-            flow_info_dict = self._parse_flow_summary(line)
-            if flow_info_dict:
-                flows_list.append(flow_info_dict)
-                continue
-
-            # Parse Summary report
-            items = line.split(':')
-            for category in summary_list:
-                output = items[0].strip()
-                exp_output = category.strip()
-                if output == exp_output:
-                    match = re.match('\s+(\d+)\s+(\d+)\s+(\d+)\s*$', items[1])
-                    if match:
-                        flows_summary_dict[summary_list[category]] = \
-                            {'all': int(match.group(1)),
-                             'v4':  int(match.group(2)),
-                             'v6':  int(match.group(3))}
-                        break
-                    match = re.match('\s+(\d+)$', items[1])
-                    if match:
-                        flows_summary_dict[summary_list[category]] = \
-                            {'all': int(match.group(1))}
-                        break
-
-        output = {'flows_list': flows_list,
-                  'flows_summary': flows_summary_dict}
-        return output
+    def _parse_show_flows(self, result):
+        return FlowsParser().parse(result)
@@ -0,0 +1,751 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+"""
+Parser for the output of 'show flows'.
+
+All patterns are compiled once at import time, every line is visited once,
+and summary lines are dispatched on their label with a dictionary lookup.
+"""
+
+from __future__ import (unicode_literals, print_function, division,
+                        absolute_import)
+
+import re
+import os
+import sys
+import datetime
+import ipaddress
+import threading
+import multiprocessing
+from functools import lru_cache, partial
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import namedtuple
+from collections.abc import Mapping
+
+from steelscript.steelhead.core.timeutils import (APPLIANCE_TIME_FORMAT,
+                                                  epoch_seconds)
+
+
+TITLE_RE = re.compile(r'T\s+Source\s+Destination\s+App\s+Rdn\s+Since')
+
+SEPARATOR_RE = re.compile(r'^-+$')
+
+# group 1: type
+# group 2-3: source/destination in IPv4 or IPv6 format, with port
+# group 4: app
+# group 5: reduction, this only shows up for optimized connections
+# group 6: since, a date+time or the string pre_existing
+FLOW_RE = re.compile(r'([a-zA-Z]+)\s+([\w\.\[\]:]+)\s+([\w\.\[\]:]+)\s+'
+                     r'(.+?)\s+(\d*)%*\s+'
+                     r'(pre_existing|\d+\/\d+\/\d+\s+\d+:\d+:\d+)\s*$')
+
+# IPv4 looks like 123.124.125.126:1234
+# IPv6 looks like [2001:0db8:85a3:0000:0000:8a2e:0370:7334]:1234
+IP_PORT_RE = re.compile(r'\[*([\w\.:]+)\]*:(\d+)')
+
+# The "All V4 V6" column header that opens the summary block
+SUMMARY_HEADER_RE = re.compile(r'[ \t]+All[ \t]+V4[ \t]+V6[ \t]*$',
+                               re.MULTILINE)
+
+SUMMARY_COUNTS_RE = re.compile(r'\s+(\d+)\s+(\d+)\s+(\d+)\s*$')
+SUMMARY_ALL_RE = re.compile(r'\s+(\d+)$')
+
+SUMMARY_CATEGORIES = {
+    'Established Optimized': 'established optimized',
+    'RiOS Only (O)': 'rios only',
+    'SCPS Only (SO)': 'scps only',
+    'RiOS+SCPS (RS)': 'rios scps',
+    'TCP Proxy (TP)': 'tcp proxy',
+    'Packet-mode optimized (N)': 'packet_mode optimized',
+    'Half-opened optimized (H)': 'half_opened optimized',
+    'Half-closed optimized (C)': 'half_closed optimized',
+    'Establishing (E)': 'establishing',
+    'Passthrough': 'passthrough',
+    'Passthrough intentional (PI)': 'passthrough intentional',
+    'Passthrough unintentional (PU)': 'passthrough unintentional',
+    'Terminated': 'passthrough unintentional terminated',
+    'Packet-mode': 'passthrough unintentional packet_mode',
+    'Forwarded (F)': 'forwarded',
+    'Discarded (terminated)': 'discarded',
+    'Denied (terminated)': 'denied',
+    'Total': 'total',
+}
+
+ParsedIP = namedtuple('ParsedIP', ['address', 'port'])
+
+# Outputs shorter than this, in characters, are parsed in-process by
+# FlowsParser.parse_parallel(); starting worker processes and pickling
+# their results only pays off on large flow tables.
+PARALLEL_THRESHOLD = 8 * 1024 * 1024
+
+# IPv4 addresses are packed as IPv4-mapped IPv6 addresses, ::ffff:a.b.c.d
+IPV4_MAPPED = 0xffff00000000
+UINT64_MASK = 0xffffffffffffffff
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+# Since values of pre_existing flows, for the 'epoch' and 'datetime' forms
+PRE_EXISTING_EPOCH = 0
+PRE_EXISTING_DATETIME = datetime.datetime.min
+
+
+@lru_cache(maxsize=65536)
+def ip_address(text):
+    """
+    Cached :py:func:`ipaddress.ip_address`.  Flow tables repeat the same
+    hosts many times, and address objects are immutable.
+    """
+    return ipaddress.ip_address(text)
+
+
+def parse_ip_addr(text):
+    """
+    Split a flow endpoint such as ``10.0.0.1:80`` or ``[10::1]:80``.
+
+    :return: :py:class:`ParsedIP` tuple of address object and port number,
+        or None if `text` is not an endpoint.
+    """
+    match = IP_PORT_RE.search(text)
+    if match:
+        return ParsedIP(address=ip_address(match.group(1)),
+                        port=int(match.group(2)))
+
+
+def _split_endpoint(text):
+    # Fast path of parse_ip_addr() for well-formed endpoints.
+    address, _, port = text.rpartition(':')
+    if address and port.isdigit():
+        return ip_address(address.strip('[]')), int(port)
+    endpoint = parse_ip_addr(text)
+    return endpoint.address, endpoint.port
+
+
+def pack_ip(address):
+    """
+    Pack an IPv4 or IPv6 address into two unsigned 64-bit integers.
+
+    IPv4 addresses are packed as their IPv4-mapped IPv6 address, so both
+    families share one ordering and ``hi`` is 0 for all IPv4 addresses.
+
+    :param address: address object or string.
+    :return: tuple ``(hi, lo)`` of the upper and lower 64 bits.
+    """
+    if not isinstance(address, (ipaddress.IPv4Address,
+                                ipaddress.IPv6Address)):
+        address = ip_address(address)
+    value = int(address)
+    if address.version == 4:
+        return 0, IPV4_MAPPED | value
+    return value >> 64, value & UINT64_MASK
+
+
+def unpack_ip(hi, lo):
+    """
+    Reverse of :py:func:`pack_ip`.  IPv4-mapped addresses are returned as
+    :py:class:`ipaddress.IPv4Address`.
+    """
+    hi, lo = int(hi), int(lo)
+    if not hi and lo >> 32 == 0xffff:
+        return ipaddress.IPv4Address(lo & 0xffffffff)
+    return ipaddress.IPv6Address(hi << 64 | lo)
+
+
+@lru_cache(maxsize=65536)
+def _pack_host(text):
+    return pack_ip(ip_address(text))
+
+
+def _pack_endpoint(text):
+    # pack_ip() of the address of an endpoint, and its port.
+    address, _, port = text.rpartition(':')
+    if address and port.isdigit():
+        return _pack_host(address.strip('[]')), int(port)
+    endpoint = parse_ip_addr(text)
+    return pack_ip(endpoint.address), endpoint.port
+
+
+@lru_cache(maxsize=4096)
+def _epoch_day(date):
+    year, month, day = date.split('/')
+    return (datetime.date(int(year), int(month), int(day)).toordinal() -
+            EPOCH_ORDINAL) * 86400
+
+
+def since_to_epoch(text):
+    """
+    Convert the Since column into seconds since the epoch, taking the
+    appliance's clock as UTC.
+
+    :return: integer, or None for pre_existing flows.
+    """
+    if text == 'pre_existing':
+        return None
+    if text[4::3] == '// ::' and len(text) == 19:
+        # Fixed offsets of 'YYYY/MM/DD HH:MM:SS'
+        return (_epoch_day(text[:10]) + int(text[11:13]) * 3600 +
+                int(text[14:16]) * 60 + int(text[17:]))
+    date, time = text.split()
+    hour, minute, second = time.split(':')
+    return (_epoch_day(date) + int(hour) * 3600 + int(minute) * 60 +
+            int(second))
+
+
+@lru_cache(maxsize=65536)
+def since_epoch(text):
+    """
+    Convert the Since column into seconds since the epoch, as
+    :py:func:`since_to_epoch`, with :py:data:`PRE_EXISTING_EPOCH` for
+    pre_existing flows.
+    """
+    epoch = since_to_epoch(text)
+    return PRE_EXISTING_EPOCH if epoch is None else epoch
+
+
+@lru_cache(maxsize=65536)
+def since_datetime(text):
+    """
+    Convert the Since column into a naive :py:class:`datetime.datetime` in
+    the appliance's time, with :py:data:`PRE_EXISTING_DATETIME` for
+    pre_existing flows.  Flows starting in the same second share one
+    object.
+    """
+    if text == 'pre_existing':
+        return PRE_EXISTING_DATETIME
+    if text[4::3] == '// ::' and len(text) == 19:
+        return datetime.datetime(int(text[:4]), int(text[5:7]),
+                                 int(text[8:10]), int(text[11:13]),
+                                 int(text[14:16]), int(text[17:]))
+    date, time = text.split()
+    return datetime.datetime(*[int(f) for f in
+                               date.split('/') + time.split(':')])
+
+
+def parse_since(text):
+    """
+    Convert the Since column into the dictionary returned by
+    :py:meth:`FlowsModel.show_flows`.
+    """
+    if text == 'pre_existing':
+        return {'pre_existing': True}
+    date_time = text.split(' ')
+    datestring = date_time[0].split('/')
+    timestring = date_time[1].split(':')
+    return {'year': datestring[0],
+            'month': datestring[1],
+            'day': datestring[2],
+            'hour': timestring[0],
+            'min': timestring[1],
+            'secs': timestring[2]}
+
+
+def flow_since_epoch(since):
+    """
+    Convert the ``since`` value of a flow, in any of the forms of
+    :py:data:`SINCE_PARSERS`, into seconds since the epoch, taking the
+    appliance's clock as UTC.
+
+    :return: integer, or None for pre_existing flows.
+    """
+    if isinstance(since, dict):
+        if 'pre_existing' in since:
+            return None
+        return since_to_epoch('%(year)s/%(month)s/%(day)s '
+                              '%(hour)s:%(min)s:%(secs)s' % since)
+    if isinstance(since, datetime.datetime):
+        if since == PRE_EXISTING_DATETIME:
+            return None
+        return int(epoch_seconds(since))
+    return None if since == PRE_EXISTING_EPOCH else since
+
+
+def make_flow(match, parse_since=parse_since):
+    """
+    Build the flow dictionary for a :py:data:`FLOW_RE` match.
+
+    :param parse_since: function converting the Since column, one of the
+        values of :py:data:`SINCE_PARSERS`.
+    """
+    type, src, dst, app, reduction, since = match.groups()
+    src_ip, src_port = _split_endpoint(src)
+    dst_ip, dst_port = _split_endpoint(dst)
+    flow = {'type': type,
+            'source ip': src_ip,
+            'source port': src_port,
+            'destination ip': dst_ip,
+            'destination port': dst_port,
+            'app': app}
+    if reduction:
+        flow['reduction'] = int(reduction)
+    flow['since'] = parse_since(since)
+    return flow
+
+
+class Flow(Mapping):
+    """
+    Compact, read-only flow record.
+
+    A Flow keeps the line it was parsed from and the offsets of its columns,
+    and builds the address objects and the ``since`` dictionary only when
+    they are looked up.  The type and app strings are interned, so all
+    flows share one copy of each.
+
+    Flows behave as the dictionaries returned by
+    :py:meth:`FlowsModel.show_flows`: they have the same keys and compare
+    equal to the matching dictionary.
+
+    :param match: :py:data:`FLOW_RE` match of a flow line.
+    """
+
+    __slots__ = ('type', 'app', '_line', '_offsets')
+
+    #: Function converting the Since column, overridden by subclasses
+    parse_since = staticmethod(parse_since)
+
+    def __init__(self, match):
+        self.type = sys.intern(match.group(1))
+        self.app = sys.intern(match.group(4))
+        self._line = match.string
+        offsets = (match.span(2) + match.span(3) + match.span(5) +
+                   match.span(6))
+        # Flow lines are short; one byte per offset is the common case.
+        self._offsets = bytes(offsets) if offsets[-1] < 256 else offsets
+
+    def __repr__(self):
+        return '<Flow %s>' % self._line.strip()
+
+    def __reduce__(self):
+        # Much cheaper to pickle than the slots of the default protocol,
+        # which matters when flows come back from worker processes.
+        return _restore_flow, (type(self), self.type, self.app, self._line,
+                               self._offsets)
+
+    @property
+    def source(self):
+        """Source endpoint, as :py:class:`ParsedIP`."""
+        return ParsedIP(*_split_endpoint(self._column(0)))
+
+    @property
+    def destination(self):
+        """Destination endpoint, as :py:class:`ParsedIP`."""
+        return ParsedIP(*_split_endpoint(self._column(1)))
+
+    @property
+    def reduction(self):
+        """Reduction percentage, or None if the flow is not optimized."""
+        reduction = self._column(2)
+        return int(reduction) if reduction else None
+
+    @property
+    def since(self):
+        """The Since column, as converted by :py:attr:`parse_since`."""
+        return self.parse_since(self._column(3))
+
+    def __getitem__(self, key):
+        getter = _FLOW_FIELDS.get(key)
+        if getter is None or (key == 'reduction' and not self._column(2)):
+            raise KeyError(key)
+        return getter(self)
+
+    def __iter__(self):
+        for key in _FLOW_FIELDS:
+            if key != 'reduction' or self._column(2):
+                yield key
+
+    def __len__(self):
+        return len(_FLOW_FIELDS) - (not self._column(2))
+
+    def _column(self, index):
+        offsets = self._offsets
+        return self._line[offsets[2 * index]:offsets[2 * index + 1]]
+
+
+def _restore_flow(cls, type, app, line, offsets):
+    flow = cls.__new__(cls)
+    flow.type = sys.intern(type)
+    flow.app = sys.intern(app)
+    flow._line = line
+    flow._offsets = offsets
+    return flow
+
+
+# Keys of a flow dictionary, in the order make_flow() sets them
+_FLOW_FIELDS = {
+    'type': lambda flow: flow.type,
+    'source ip': lambda flow: flow.source.address,
+    'source port': lambda flow: flow.source.port,
+    'destination ip': lambda flow: flow.destination.address,
+    'destination port': lambda flow: flow.destination.port,
+    'app': lambda flow: flow.app,
+    'reduction': lambda flow: flow.reduction,
+    'since': lambda flow: flow.since,
+}
+
+
+class EpochFlow(Flow):
+    """
+    :py:class:`Flow` with ``since`` in seconds since the epoch, as by
+    :py:func:`since_epoch`.
+    """
+    __slots__ = ()
+    parse_since = staticmethod(since_epoch)
+
+
+class DatetimeFlow(Flow):
+    """
+    :py:class:`Flow` with ``since`` as a :py:class:`datetime.datetime`, as
+    by :py:func:`since_datetime`.
+    """
+    __slots__ = ()
+    parse_since = staticmethod(since_datetime)
+
+
+# Forms of the since value of flows, by name
+SINCE_PARSERS = {
+    'dict': parse_since,
+    'epoch': since_epoch,
+    'datetime': since_datetime,
+}
+
+_COMPACT_FLOWS = {
+    'dict': Flow,
+    'epoch': EpochFlow,
+    'datetime': DatetimeFlow,
+}
+
+
+def flow_record(compact=False, since='dict'):
+    """
+    Return the callable building flow records for :py:class:`FlowsParser`.
+
+    :param bool compact: Build :py:class:`Flow` records instead of
+        dictionaries.
+    :param str since: Form of the since value, ``'dict'`` for the
+        dictionary of :py:func:`parse_since`, ``'epoch'`` for
+        :py:func:`since_epoch` or ``'datetime'`` for
+        :py:func:`since_datetime`.
+    """
+    if since not in SINCE_PARSERS:
+        raise ValueError('since must be one of %s, not %r'
+                         % (', '.join(sorted(SINCE_PARSERS)), since))
+    if compact:
+        return _COMPACT_FLOWS[since]
+    if since == 'dict':
+        return make_flow
+    return partial(make_flow, parse_since=SINCE_PARSERS[since])
+
+
+class FlowsParser(object):
+    """
+    Single-pass parser for the output of 'show flows'.
+
+    The flow lines are handed out as they are parsed, while the summary
+    block at the end of the output is collected in :py:attr:`summary`.
+    A parser instance is meant for the output of one command.
+
+    :param record: callable building the record of a flow from its
+        :py:data:`FLOW_RE` match, :py:func:`make_flow` or :py:class:`Flow`.
+    :param since_watermark: :py:class:`datetime.datetime`; if given, flows
+        that started at or before it, and pre_existing flows, are skipped.
+        Most of them are recognized from the Since column alone, without
+        matching the line.  The summary is not affected.
+    """
+
+    def __init__(self, record=make_flow, since_watermark=None):
+        self.summary = {}
+        self.record = record
+        self.since_watermark = since_watermark
+        self._watermark = None
+        if since_watermark is not None:
+            self._watermark = since_watermark.strftime(APPLIANCE_TIME_FORMAT)
+
+    def parse(self, output):
+        """
+        Parse the complete output of 'show flows'.
+
+        :return: dictionary with ``flows_list`` and ``flows_summary`` as
+            returned by :py:meth:`FlowsModel.show_flows`.
+        """
+        flows = list(self.iter_flows(output.splitlines()))
+        return {'flows_list': flows,
+                'flows_summary': self.summary}
+
+    def parse_parallel(self, output, max_workers=None, executor=None,
+                       threshold=PARALLEL_THRESHOLD):
+        """
+        Parse the complete output of 'show flows' in worker processes.
+
+        The flow lines are split into line-aligned chunks that are parsed
+        in a process pool, and the flows are merged back in output order.
+        The summary is parsed once, in this process.  Outputs shorter than
+        `threshold` characters, and outputs without the flows title or the
+        summary header, are parsed with :py:meth:`parse` instead.
+
+        Without `executor`, the pool of :py:func:`get_worker_pool` is
+        used, which is started on first use and kept for later calls.  Its
+        workers are started from a fork server, or spawned where there is
+        none, so they do not inherit the locks and SSH transport threads of
+        this process.  Like any spawned process, they import the main
+        module of the program, so a script that calls this method, directly
+        or through ``show_flows(parallel=True)``, must do so under an
+        ``if __name__ == '__main__':`` guard.
+
+        :param int max_workers: Number of worker processes, or of workers
+            of `executor`.  Defaults to the number of CPUs.
+        :param executor: :py:class:`concurrent.futures.ProcessPoolExecutor`
+            to use instead of the shared pool.
+        :param int threshold: Minimum output length to parse in parallel.
+
+        :return: dictionary as returned by :py:meth:`parse`.
+        """
+        title = TITLE_RE.search(output)
+        summary_start = _summary_start(output)
+        if len(output) < threshold or title is None or summary_start < 0:
+            return self.parse(output)
+
+        max_workers = max_workers or os.cpu_count() or 1
+        if executor is None:
+            try:
+                return self.parse_parallel(output, max_workers,
+                                           get_worker_pool(max_workers),
+                                           threshold)
+            except BrokenProcessPool:
+                # A worker died, start a new pool once.
+                _discard_worker_pool(max_workers)
+                return self.parse_parallel(output, max_workers,
+                                           get_worker_pool(max_workers),
+                                           threshold)
+
+        body_start = output.find('\n', title.end()) + 1
+        # A few chunks per worker even out their parse times.
+        chunks = _split_lines(output, body_start, summary_start,
+                              4 * max_workers)
+        flows = []
+        parse_chunk = partial(_parse_chunk, record=self.record,
+                              since_watermark=self.since_watermark)
+        for chunk in executor.map(parse_chunk, chunks):
+            flows.extend(chunk)
+        self.parse_summary(output[summary_start:])
+        return {'flows_list': flows,
+                'flows_summary': self.summary}
+
+    def parse_summary(self, output):
+        """
+        Parse only the summary block of the output of 'show flows'.
+
+        The block is located by searching backwards for its column header,
+        so the flow lines before it are never looked at.  Should the header
+        be missing, every line is checked as a summary line, which costs
+        one dictionary lookup per flow line.
+
+        :return: dictionary as the ``flows_summary`` returned by
+            :py:meth:`FlowsModel.show_flows`.
+        """
+        start = _summary_start(output)
+        if start >= 0:
+            output = output[start:]
+        for line in output.splitlines():
+            if line:
+                self.parse_summary_line(line)
+        return self.summary
+
+    def iter_flows(self, lines):
+        """
+        Generate a flow record for each flow line in `lines`.
+        """
+        record = self.record
+        for match in self.iter_matches(lines):
+            yield record(match)
+
+    def iter_matches(self, lines):
+        """
+        Generate the :py:data:`FLOW_RE` match of each flow line in `lines`,
+        recording summary lines on the way.
+        """
+        match_line = self._match_line
+        if self._watermark is not None:
+            match_line = self._match_new_line
+        lines = iter(lines)
+        for line in lines:
+            if line and TITLE_RE.search(line):
+                break
+            match = match_line(line)
+            if match is not None:
+                yield match
+        for line in lines:
+            match = match_line(line)
+            if match is not None:
+                yield match
+
+    def _match_line(self, line):
+        # Skip empty and "-----------..." lines
+        if not line or (line[0] == '-' and SEPARATOR_RE.match(line)):
+            return None
+        match = FLOW_RE.search(line)
+        if match is None:
+            self.parse_summary_line(line)
+        return match
+
+    def _match_new_line(self, line):
+        # _match_line() for flows that started after the watermark.  The
+        # Since column ends the line and its zero-padded timestamps sort as
+        # strings, so most old flows are skipped on a slice compare.
+        tail = line[-19:]
+        if tail[4::3] == '// ::':
+            if tail <= self._watermark:
+                return None
+            return self._match_line(line)
+        if tail.endswith('pre_existing'):
+            return None
+        match = self._match_line(line)
+        if match is not None and not self._after_watermark(match.group(6)):
+            return None
+        return match
+
+    def _after_watermark(self, since):
+        if since == 'pre_existing':
+            return False
+        date, time = since.split()
+        fields = [int(f) for f in date.split('/') + time.split(':')]
+        return '%04d/%02d/%02d %02d:%02d:%02d' % tuple(fields) > \
+            self._watermark
+
+    def parse_summary_line(self, line):
+        """
+        Record `line` in :py:attr:`summary` if it is a summary line.
+        """
+        items = line.split(':')
+        category = SUMMARY_CATEGORIES.get(items[0].strip())
+        if category is None or len(items) < 2:
+            return
+        match = SUMMARY_COUNTS_RE.match(items[1])
+        if match:
+            self.summary[category] = {'all': int(match.group(1)),
+                                      'v4': int(match.group(2)),
+                                      'v6': int(match.group(3))}
+            return
+        match = SUMMARY_ALL_RE.match(items[1])
+        if match:
+            self.summary[category] = {'all': int(match.group(1))}
+
+
+def _summary_start(output):
+    # Offset of the summary header line, or -1.  Summary lines only hold
+    # counts, so the last 'V6' of the output is in the header.
+    pos = output.rfind('V6')
+    if pos < 0:
+        return -1
+    start = output.rfind('\n', 0, pos) + 1
+    return start if SUMMARY_HEADER_RE.match(output, start) else -1
+
+
+def _split_lines(output, start, end, count):
+    # Split output[start:end] into about `count` chunks of whole lines.
+    size = max((end - start) // count, 1)
+    chunks = []
+    while start < end:
+        stop = output.find('\n', min(start + size, end - 1), end) + 1 or end
+        chunks.append(output[start:stop])
+        start = stop
+    return chunks
+
+
+_worker_pools = {}
+_worker_pools_lock = threading.Lock()
+
+
+def get_worker_pool(max_workers=None):
+    """
+    Return the process pool :py:meth:`FlowsParser.parse_parallel` uses by
+    default, starting it on first use.  One pool is kept per number of
+    workers, and shut down when the interpreter exits.
+
+    :param int max_workers: Number of worker processes.  Defaults to the
+        number of CPUs.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    with _worker_pools_lock:
+        pool = _worker_pools.get(max_workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers,
+                                       mp_context=_worker_context())
+            _worker_pools[max_workers] = pool
+        return pool
+
+
+def _discard_worker_pool(max_workers):
+    with _worker_pools_lock:
+        pool = _worker_pools.pop(max_workers, None)
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+
+def _worker_context():
+    # Forking a process that runs paramiko transport threads, or holds the
+    # session pool and cache locks, can deadlock the children.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        'forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _parse_chunk(text, record, since_watermark):
+    # Runs in a worker process: parse flow lines, without title or summary.
+    parser = FlowsParser(record, since_watermark)
+    return list(parser.iter_flows(text.splitlines()))
+
+
+class FlowStream(object):
+    """
+    Iterator over the flows of a 'show flows' output that is still being
+    received.
+
+    Flows are parsed and handed out one at a time from an iterable of
+    output lines.  The summary block follows the flows in the output, so
+    :py:attr:`summary` is None until the stream has been exhausted.
+
+    :param lines: iterable of output lines, such as the generator returned
+        by :py:meth:`SteelHeadCLI.iter_command
+        <steelscript.steelhead.core.cli.SteelHeadCLI.iter_command>`.
+    :param record: callable building flow records, as for
+        :py:class:`FlowsParser`.
+    :param since_watermark: skip older flows, as for
+        :py:class:`FlowsParser`.
+    """
+
+    def __init__(self, lines, record=make_flow, since_watermark=None):
+        self.summary = None
+        self._lines = lines
+        self._parser = FlowsParser(record, since_watermark)
+        self._flows = self._parser.iter_flows(lines)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._flows)
+        except StopIteration:
+            self.summary = self._parser.summary
+            raise
+
+    next = __next__
+
+    def close(self):
+        """
+        Stop the stream early.  The rest of the output is discarded and
+        :py:attr:`summary` stays None.
+        """
+        self._flows.close()
+        close = getattr(self._lines, 'close', None)
+        if close is not None:
+            close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,127 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+"""
+Snapshots of the flow table of a SteelHead, and the changes between them.
+"""
+
+from __future__ import (unicode_literals, print_function, division,
+                        absolute_import)
+
+import time
+from collections import namedtuple
+
+from steelscript.steelhead.features.flows.v8_5.parser import \
+    flow_since_epoch
+
+
+FlowDelta = namedtuple('FlowDelta', ['added', 'removed', 'changed'])
+FlowDelta.__doc__ = """
+Changes between two :py:class:`FlowSnapshot` objects.
+
+``added`` and ``removed`` are lists of flows, ``changed`` is a list of
+``(old, new)`` flow pairs.
+"""
+
+
+def flow_key(flow):
+    """
+    Return the key identifying a connection across polls: the source and
+    destination endpoints, the app and the time the flow started.
+
+    The start time is compared in seconds since the epoch, so flows with
+    any form of ``since`` match.
+
+    :param flow: flow dictionary or :py:class:`Flow
+        <steelscript.steelhead.features.flows.v8_5.parser.Flow>`.
+    """
+    return (flow['source ip'], flow['source port'],
+            flow['destination ip'], flow['destination port'],
+            flow['app'], flow_since_epoch(flow['since']))
+
+
+def flow_changed(old, new):
+    """
+    Return True if a flow has changed between two polls, i.e. its type or
+    reduction differ.
+    """
+    return (old['type'] != new['type'] or
+            old.get('reduction') != new.get('reduction'))
+
+
+class FlowSnapshot(object):
+    """
+    The flows of one 'show flows' poll, indexed by :py:func:`flow_key`.
+
+    Comparing two snapshots takes time linear in the number of flows:
+
+    .. code-block:: python
+
+        previous = None
+        while True:
+            snapshot = model.show_flows_snapshot()
+            added, removed, changed = snapshot.diff(previous)
+            ...
+            previous = snapshot
+
+    :param flows: iterable of flow dictionaries or :py:class:`Flow
+        <steelscript.steelhead.features.flows.v8_5.parser.Flow>` records.
+        Should two flows share a key, the last one is kept.
+    :param dict summary: ``flows_summary`` of the same output.
+    :param float timestamp: time of the poll, defaults to now.
+    """
+
+    def __init__(self, flows, summary=None, timestamp=None):
+        self.flows = dict((flow_key(flow), flow) for flow in flows)
+        self.summary = summary
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    @classmethod
+    def from_result(cls, result, timestamp=None):
+        """
+        Create a snapshot from the result of
+        :py:meth:`FlowsModel.show_flows`.
+        """
+        return cls(result['flows_list'], result['flows_summary'], timestamp)
+
+    def __repr__(self):
+        return '<FlowSnapshot flows: %d>' % len(self.flows)
+
+    def __len__(self):
+        return len(self.flows)
+
+    def __iter__(self):
+        return iter(self.flows.values())
+
+    def __contains__(self, flow):
+        return flow_key(flow) in self.flows
+
+    def diff(self, previous):
+        """
+        Compare this snapshot with an earlier one.
+
+        :param previous: earlier :py:class:`FlowSnapshot`, or None to report
+            every flow as added.
+
+        :return: :py:class:`FlowDelta` of the flows opened, closed and
+            changed since `previous`.
+        """
+        if previous is None:
+            return FlowDelta(list(self.flows.values()), [], [])
+
+        old_flows = previous.flows
+        added = []
+        changed = []
+        for key, flow in self.flows.items():
+            old = old_flows.get(key)
+            if old is None:
+                added.append(flow)
+            elif flow_changed(old, flow):
+                changed.append((old, flow))
+        new_flows = self.flows
+        removed = [flow for key, flow in old_flows.items()
+                   if key not in new_flows]
+        return FlowDelta(added, removed, changed)
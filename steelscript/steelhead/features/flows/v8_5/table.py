@@ -0,0 +1,148 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+"""
+Indexed queries over the flow table of a SteelHead.
+"""
+
+from __future__ import (unicode_literals, print_function, division,
+                        absolute_import)
+
+import ipaddress
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+from steelscript.steelhead.features.flows.v8_5.parser import pack_ip
+
+
+def _packed(address):
+    hi, lo = pack_ip(address)
+    return hi << 64 | lo
+
+
+def _packed_range(network):
+    # First and last packed address of a subnet.
+    if not isinstance(network, (ipaddress.IPv4Network,
+                                ipaddress.IPv6Network)):
+        network = ipaddress.ip_network(network, strict=False)
+    return (_packed(network.network_address),
+            _packed(network.broadcast_address))
+
+
+class _AddressIndex(object):
+    # Rows sorted by packed address, searched by bisection.
+
+    def __init__(self, values):
+        self.values = values
+        self.rows = sorted(range(len(values)), key=values.__getitem__)
+        self.keys = [values[row] for row in self.rows]
+
+    def range(self, first, last):
+        return self.rows[bisect_left(self.keys, first):
+                         bisect_right(self.keys, last)]
+
+
+class FlowTable(object):
+    """
+    Flows indexed for queries by subnet, port, app and type.
+
+    Source and destination addresses are kept in sorted indexes, so a
+    subnet is found by bisection, while ports, apps and types are kept in
+    hash indexes.  A query starts from the criterion with the fewest
+    matching flows and checks only those against the other criteria, so
+    its cost follows the size of the smallest match rather than the size
+    of the table.
+
+    .. code-block:: python
+
+        table = FlowTable(model.show_flows_snapshot())
+        flows = table.query(destination='10.190.0.0/16',
+                            destination_port=443, type='O')
+
+    :param flows: :py:class:`FlowSnapshot
+        <steelscript.steelhead.features.flows.v8_5.snapshot.FlowSnapshot>`
+        or iterable of flow dictionaries or :py:class:`Flow
+        <steelscript.steelhead.features.flows.v8_5.parser.Flow>` records.
+    """
+
+    def __init__(self, flows):
+        self.flows = list(flows)
+        self._source = _AddressIndex(
+            [_packed(flow['source ip']) for flow in self.flows])
+        self._destination = _AddressIndex(
+            [_packed(flow['destination ip']) for flow in self.flows])
+        self._hashes = {}
+        for key in ('source port', 'destination port', 'app', 'type'):
+            index = defaultdict(list)
+            for row, flow in enumerate(self.flows):
+                index[flow[key]].append(row)
+            self._hashes[key] = index
+
+    def __repr__(self):
+        return '<FlowTable flows: %d>' % len(self.flows)
+
+    def __len__(self):
+        return len(self.flows)
+
+    def query(self, source=None, destination=None, source_port=None,
+              destination_port=None, app=None, type=None):
+        """
+        Return the flows matching all given criteria, in table order.
+
+        :param source: subnet or address of the source, as a string or
+            :py:mod:`ipaddress` network.
+        :param destination: subnet or address of the destination.
+        :param source_port: source port, or a list of ports.
+        :param destination_port: destination port, or a list of ports.
+        :param app: app name, or a list of names.
+        :param type: flow type, such as ``'O'``, or a list of types.
+
+        :return: list of flows.
+        """
+        # Each check is (candidate rows, row predicate).
+        checks = []
+        for index, network in ((self._source, source),
+                               (self._destination, destination)):
+            if network is not None:
+                first, last = _packed_range(network)
+                checks.append((index.range(first, last),
+                               self._in_range(index.values, first, last)))
+        for key, value in (('source port', source_port),
+                           ('destination port', destination_port),
+                           ('app', app), ('type', type)):
+            if value is not None:
+                checks.append(self._lookup(key, value))
+
+        if not checks:
+            return list(self.flows)
+        checks.sort(key=lambda check: len(check[0]))
+        rows, _ = checks[0]
+        predicates = [predicate for _, predicate in checks[1:]]
+        rows = [row for row in rows
+                if all(predicate(row) for predicate in predicates)]
+        rows.sort()
+        return [self.flows[row] for row in rows]
+
+    def count(self, **criteria):
+        """
+        Return the number of flows matching the criteria of :py:meth:`query`.
+        """
+        return len(self.query(**criteria))
+
+    def _lookup(self, key, value):
+        index = self._hashes[key]
+        if isinstance(value, (list, tuple, set, frozenset)):
+            values = set(value)
+            rows = [row for v in values for row in index.get(v, ())]
+        else:
+            values = (value,)
+            rows = index.get(value, [])
+        flows = self.flows
+        return rows, lambda row: flows[row][key] in values
+
+    @staticmethod
+    def _in_range(values, first, last):
+        return lambda row: first <= values[row] <= last
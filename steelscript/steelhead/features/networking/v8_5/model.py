@@ -7,13 +7,11 @@
 from __future__ import (absolute_import, unicode_literals, print_function,
                         division)
 
-import datetime
-import ipaddress
-import netaddr
-import re
-
 from steelscript.common.interaction.model import model, Model
-from steelscript.cmdline.parsers import cli_parse_basic
+from steelscript.steelhead.core.cache import exec_cached
+from steelscript.steelhead.core.cli import exec_batch
+from steelscript.steelhead.features.networking.v8_5.parser import (
+    merge_interfaces, parse_interfaces)
 
 
 @model
@@ -22,7 +20,7 @@ class NetworkingModel(Model):
     Kauai Networking model for the SteelHead product
     """
 
-    def show_interfaces(self, interface=None, brief=False):
+    def show_interfaces(self, interface=None, brief=False, lazy=False):
         """
         Return parsed output of 'show interfaces <interface> [brief]':
 
@@ -44,6 +42,10 @@ class NetworkingModel(Model):
         :type interface:  string
         :param brief:  Whether to run just brief output.
         :type brief:  boolean
+        :param lazy:  Return :py:class:`.InterfaceRecord` objects, which
+            convert the address and date fields only when they are looked
+            up.  Lazy results are not cached.
+        :type lazy:  boolean
 
         :return: List of dictionaries of values returned:
 
@@ -59,13 +61,20 @@ class NetworkingModel(Model):
             ...}
 
         """
-        cmd = ["show interfaces"]
-        if interface:
-            cmd.append(interface)
-        if brief:
-            cmd.append("brief")
+        cmd = self._show_interfaces_cmd(interface, brief=brief)
+        if lazy:
+            output = self.cli.exec_command(cmd, output_expected=True)
+            return parse_interfaces(output, lazy=True)
+        return exec_cached(self, cmd, self._parse_show_interfaces_dict)
 
-        output = self.cli.exec_command(" ".join(cmd), output_expected=True)
+    async def show_interfaces_async(self, interface=None, brief=False):
+        """
+        Awaitable version of :meth:`show_interfaces` for models obtained from
+        an :py:class:`AsyncSteelHead
+        <steelscript.steelhead.core.steelhead.AsyncSteelHead>`.
+        """
+        cmd = self._show_interfaces_cmd(interface, brief=brief)
+        output = await self.cli.exec_command(cmd, output_expected=True)
         return self._parse_show_interfaces_dict(output)
 
     def show_interfaces_configured(self, interface=None):
@@ -102,52 +111,52 @@ class NetworkingModel(Model):
              'mtu':          1500,
              ...}
         """
+        cmd = self._show_interfaces_cmd(interface, configured=True)
+        return exec_cached(self, cmd, self._parse_show_interfaces_dict)
+
+    def show_interfaces_full(self, interface=None):
+        """
+        Return the running and configured state of interfaces side by
+        side.
+
+        'show interfaces <interface>' and 'show interfaces <interface>
+        configured' are sent in one batch, and each output is parsed once.
+        Results are not cached.
+
+        :param interface:  Optional.  Return just this interface.
+        :type interface:  string
+
+        :return: List of dictionaries of values returned:
+
+        .. code-block:: python
+
+            {'name':        'inpath0_0',
+             'running':     {'name': 'inpath0_0', 'up': True, ...},
+             'configured':  {'name': 'inpath0_0', 'enabled': True, ...},
+             'differs':     True,
+             'differences': ['ip address']}
+
+        See :py:func:`.merge_interfaces` for how the two states are
+        compared.
+        """
+        running, configured = exec_batch(
+            self.cli,
+            [self._show_interfaces_cmd(interface),
+             self._show_interfaces_cmd(interface, configured=True)],
+            output_expected=True)
+        return merge_interfaces(parse_interfaces(running),
+                                parse_interfaces(configured))
+
+    def _show_interfaces_cmd(self, interface=None, brief=False,
+                             configured=False):
         cmd = ["show interfaces"]
         if interface:
             cmd.append(interface)
-        cmd.append("configured")
-
-        output = self.cli.exec_command(" ".join(cmd), output_expected=True)
-        return self._parse_show_interfaces_dict(output)
+        if brief:
+            cmd.append("brief")
+        if configured:
+            cmd.append("configured")
+        return " ".join(cmd)
 
     def _parse_show_interfaces_dict(self, output):
-        # Trim the output
-        output = output.strip()
-
-        # Split the output for each interface.
-        parts = re.split('\n\n(?=Interface)', output)
-
-        return [self._parse_show_interfaces_interface(x) for x in parts]
-
-    def _parse_show_interfaces_interface(self, output):
-        # Parses show interface output for a single interface
-        # Parse output into a dict, replace certain values with types
-        parsed = cli_parse_basic(output)
-
-        # Parse IP address fields
-        if 'ip address' in parsed and parsed['ip address'] and \
-                'netmask' in parsed and parsed['netmask']:
-            parsed['ip address'] = ipaddress.ip_interface(
-                "%s/%s" % (parsed['ip address'], parsed['netmask']))
-            del parsed['netmask']
-        for key in ['ipv6 address', 'ipv6 link-local address']:
-            if key in parsed and parsed[key]:
-                parsed[key] = ipaddress.ip_interface(parsed[key])
-
-        # Parse MAC Addr fields.
-        for key in ['hw address']:
-            if key in parsed:
-                parsed[key] = netaddr.EUI(parsed[key])
-
-        # Parse Datetime fields.
-        for key in ['counters cleared date']:
-            if key in parsed:
-                # Format:  2014/11/19 16:31:12
-                parsed[key] = datetime.datetime.strptime(parsed[key],
-                                                         '%Y/%m/%d %H:%M:%S')
-
-        # Add in 'name'
-        name = re.match('Interface (\S+) ', output).group(1)
-        parsed['name'] = name
-
-        return parsed
+        return parse_interfaces(output)
@@ -0,0 +1,251 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+"""
+Parser for the output of 'show interfaces'.
+
+The output is read line by line in a single pass.  Values are converted as
+:py:func:`cli_parse_basic <steelscript.cmdline.parsers.cli_parse_basic>`
+converts them, and the address and date fields are typed as
+:py:meth:`NetworkingModel.show_interfaces` documents, optionally only when
+they are looked up.
+"""
+
+from __future__ import (unicode_literals, print_function, division,
+                        absolute_import)
+
+import datetime
+import ipaddress
+from functools import lru_cache
+from collections.abc import MutableMapping
+
+import netaddr
+from steelscript.cmdline.parsers import check_numeric
+from steelscript.steelhead.core.timeutils import APPLIANCE_TIME_FORMAT
+
+
+HEADER = 'Interface '
+
+# Running fields that are not configuration, left out of comparisons.
+NOT_COMPARED = frozenset(['name', 'counters cleared date'])
+
+_BOOLEANS = {'yes': True, 'true': True, 'no': False, 'false': False}
+
+
+@lru_cache(maxsize=4096)
+def ip_interface(text):
+    """
+    Cached :py:func:`ipaddress.ip_interface`.  Interface objects are
+    immutable, and the same addresses come back on every poll.
+    """
+    return ipaddress.ip_interface(text)
+
+
+@lru_cache(maxsize=4096)
+def parse_date(text):
+    """
+    Convert a date such as ``2014/11/19 16:31:12`` as
+    ``datetime.strptime(text, APPLIANCE_TIME_FORMAT)`` would, reading the usual
+    zero-padded layout at fixed offsets.
+    """
+    if len(text) == 19 and text[4::3] == '// ::':
+        return datetime.datetime(int(text[:4]), int(text[5:7]),
+                                 int(text[8:10]), int(text[11:13]),
+                                 int(text[14:16]), int(text[17:]))
+    return datetime.datetime.strptime(text, APPLIANCE_TIME_FORMAT)
+
+
+def _typed_fields(values):
+    # Yield (key, function, argument) for each field to convert, and drop
+    # the netmask merged into the ip address.
+    address = values.get('ip address')
+    netmask = values.get('netmask')
+    if address and netmask:
+        del values['netmask']
+        yield 'ip address', ip_interface, '%s/%s' % (address, netmask)
+    for key in ('ipv6 address', 'ipv6 link-local address'):
+        value = values.get(key)
+        if value:
+            yield key, ip_interface, value
+    if 'hw address' in values:
+        yield 'hw address', netaddr.EUI, values['hw address']
+    if 'counters cleared date' in values:
+        yield 'counters cleared date', parse_date, \
+            values['counters cleared date']
+
+
+class _Pending(object):
+    # A field value that is converted when first looked up.
+    __slots__ = ('func', 'arg')
+
+    def __init__(self, func, arg):
+        self.func = func
+        self.arg = arg
+
+
+class InterfaceRecord(MutableMapping):
+    """
+    Dictionary of the values of one interface, whose address and date
+    fields are converted when they are first looked up.
+
+    A record has the same keys and values as the dictionaries returned by
+    :py:meth:`NetworkingModel.show_interfaces`, and compares equal to them.
+    """
+
+    __slots__ = ('_values',)
+
+    def __init__(self, values):
+        self._values = values
+        for key, func, arg in _typed_fields(values):
+            values[key] = _Pending(func, arg)
+
+    def __repr__(self):
+        return '<InterfaceRecord %s>' % self._values.get('name')
+
+    def __getitem__(self, key):
+        value = self._values[key]
+        if type(value) is _Pending:
+            value = self._values[key] = value.func(value.arg)
+        return value
+
+    def __setitem__(self, key, value):
+        self._values[key] = value
+
+    def __delitem__(self, key):
+        del self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+
+def parse_interfaces(output, lazy=False):
+    """
+    Parse the output of 'show interfaces' and its brief and configured
+    variants.
+
+    A new interface starts at each line beginning with ``Interface`` that
+    follows an empty line, or at the first line.
+
+    :param str output: CLI output.
+    :param bool lazy: Return :py:class:`InterfaceRecord` objects, which
+        convert the address and date fields on first access, instead of
+        dictionaries.
+
+    :return: list of dictionaries or records, one per interface.
+
+    :raises KeyError: if a field appears twice for one interface.
+    """
+    interfaces = []
+    values = None
+    blank = True
+    for line in output.strip().splitlines():
+        if not line:
+            blank = True
+            continue
+        if values is None or (blank and line.startswith(HEADER)):
+            values = {}
+            interfaces.append((line, values))
+        blank = False
+
+        key, sep, value = line.partition(':')
+        if not sep:
+            continue
+        key = key.strip().lower()
+        if key in values:
+            raise KeyError('Duplicate key exists')
+        value = value.strip()
+        boolean = _BOOLEANS.get(value.lower())
+        if boolean is not None:
+            values[key] = boolean
+        elif not value:
+            values[key] = None
+        elif value[0].isalpha():
+            # Never numeric, spare check_numeric() the exceptions.
+            values[key] = value
+        else:
+            values[key] = check_numeric(value)
+
+    records = []
+    for header, values in interfaces:
+        if lazy:
+            record = InterfaceRecord(values)
+        else:
+            record = values
+            for key, func, arg in list(_typed_fields(values)):
+                values[key] = func(arg)
+        record['name'] = header[len(HEADER):].split(' ', 1)[0]
+        records.append(record)
+    return records
+
+
+def _normalize(key, value):
+    # The running speed and duplex read '1000Mb/s (auto)' and 'full (auto)'
+    # when configured as 'auto', and speeds are configured without unit.
+    if key in ('speed', 'duplex') and isinstance(value, str):
+        value = value.lower()
+        if value.endswith('(auto)'):
+            return 'auto'
+        if value.endswith('mb/s'):
+            value = value[:-4]
+        return check_numeric(value.strip())
+    return value
+
+
+def merge_interfaces(running, configured):
+    """
+    Join the running and configured state of interfaces by name.
+
+    Fields present in both states are compared, except the counters clear
+    date.  Speed and duplex compare equal when the running value was
+    negotiated from an ``auto`` configuration.
+
+    :param running: interfaces parsed from 'show interfaces'.
+    :param configured: interfaces parsed from
+        'show interfaces configured'.
+
+    :return: list of dictionaries, in the order of `running` followed by
+        interfaces that are only configured:
+
+    .. code-block:: python
+
+        {'name':        'aux',
+         'running':     {'name': 'aux', 'up': True, ...},
+         'configured':  {'name': 'aux', 'enabled': True, ...},
+         'differs':     True,
+         'differences': ['mtu']}
+
+    An interface missing from either state has None in its place and
+    differs, with no differences listed.
+    """
+    configured = dict((c['name'], c) for c in configured)
+    merged = []
+    for state in running:
+        config = configured.pop(state['name'], None)
+        merged.append(_merge_interface(state['name'], state, config))
+    for name, config in configured.items():
+        merged.append(_merge_interface(name, None, config))
+    return merged
+
+
+def _merge_interface(name, running, configured):
+    if running is None or configured is None:
+        return {'name': name,
+                'running': running,
+                'configured': configured,
+                'differs': True,
+                'differences': []}
+    differences = [key for key in running
+                   if key in configured and key not in NOT_COMPARED and
+                   _normalize(key, running[key]) !=
+                   _normalize(key, configured[key])]
+    return {'name': name,
+            'running': running,
+            'configured': configured,
+            'differs': bool(differences),
+            'differences': differences}
@@ -0,0 +1,197 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+"""
+Traffic rates of interfaces, computed from successive polls of their
+counters.
+
+This module requires numpy, which is not installed with
+steelscript.steelhead.  Install it with the ``frame`` extra.
+"""
+
+from __future__ import (unicode_literals, print_function, division,
+                        absolute_import)
+
+import time
+
+import numpy
+
+from steelscript.steelhead.core.ringbuffer import RingBuffer
+from steelscript.steelhead.core.timeutils import epoch_seconds
+
+
+# Counters of 'show interfaces' sampled by the tracker, and the rates
+# computed from them with their multiplier.
+COUNTERS = ['rx bytes', 'rx packets', 'rx errors', 'rx discards',
+            'tx bytes', 'tx packets', 'tx errors', 'tx discards']
+
+RATES = [('rx bps', 'rx bytes', 8),
+         ('rx pps', 'rx packets', 1),
+         ('rx errors/s', 'rx errors', 1),
+         ('rx discards/s', 'rx discards', 1),
+         ('tx bps', 'tx bytes', 8),
+         ('tx pps', 'tx packets', 1),
+         ('tx errors/s', 'tx errors', 1),
+         ('tx discards/s', 'tx discards', 1)]
+
+# Times are seconds since the epoch.  Counters are stored as floats, exact
+# up to 2**53, so that missing values can be NaN.
+SAMPLE_DTYPE = numpy.dtype([('time', '<f8'), ('cleared', '<f8')] +
+                           [(counter, '<f8') for counter in COUNTERS])
+
+
+def _epoch(value):
+    if value is None:
+        return numpy.nan
+    return float(epoch_seconds(value))
+
+
+class InterfaceRateTracker(object):
+    """
+    Rates of the interfaces of one SteelHead, from the last `size` polls of
+    :py:meth:`NetworkingModel.show_interfaces`.
+
+    The samples of each interface are kept in a :py:class:`RingBuffer
+    <steelscript.steelhead.core.ringbuffer.RingBuffer>`, and rates are
+    computed over all of them at once.
+
+    .. code-block:: python
+
+        tracker = InterfaceRateTracker(Model.get(sh, feature='networking'))
+        while True:
+            tracker.poll()
+            print(tracker.latest()['wan0_0']['tx bps'])
+            time.sleep(60)
+
+    When the ``counters cleared date`` of an interface changes between two
+    polls, its counters were reset: the rates of that interval are the
+    counters of the second poll over the time since they were cleared.  A
+    counter that decreases without such a change gives a NaN rate.  The
+    clear date is read as UTC, like every appliance time, and is clamped to
+    the polling interval.
+
+    :param model: :py:class:`NetworkingModel
+        <steelscript.steelhead.features.networking.v8_5.model.NetworkingModel>`
+        of the device.
+    :param int size: Number of samples kept per interface.
+    """
+
+    def __init__(self, model=None, size=60):
+        self.model = model
+        self.size = size
+        self._samples = {}
+
+    def __repr__(self):
+        return '<InterfaceRateTracker interfaces: %d>' % len(self._samples)
+
+    def interfaces(self):
+        """
+        Return the names of the interfaces sampled so far.
+        """
+        return sorted(self._samples)
+
+    def poll(self, timestamp=None):
+        """
+        Sample the counters of all interfaces of the model's device.
+
+        The output is parsed lazily, as only the counters are looked at,
+        and is never read from a result cache.
+
+        :param timestamp: time of the poll, as seconds since the epoch or
+            :py:class:`datetime.datetime`, in UTC if naive.  Defaults to
+            now.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        self.add(self.model.show_interfaces(lazy=True), timestamp)
+
+    def add(self, interfaces, timestamp=None):
+        """
+        Add a sample of each interface.
+
+        :param interfaces: list of interfaces, as returned by
+            :py:meth:`NetworkingModel.show_interfaces`.
+        :param timestamp: time of the poll, as seconds since the epoch or
+            :py:class:`datetime.datetime`, in UTC if naive.  Defaults to
+            now.
+        """
+        timestamp = time.time() if timestamp is None else _epoch(timestamp)
+        for interface in interfaces:
+            samples = self._samples.get(interface['name'])
+            if samples is None:
+                samples = self._samples[interface['name']] = \
+                    RingBuffer(self.size, SAMPLE_DTYPE)
+            samples.append(
+                (timestamp, _epoch(interface.get('counters cleared date'))) +
+                tuple(_epoch(interface.get(counter))
+                      for counter in COUNTERS))
+
+    def samples(self, name):
+        """
+        Return the samples of an interface, oldest first.
+
+        :param str name: Name of the interface.
+
+        :return: numpy array of :py:data:`SAMPLE_DTYPE` records.
+        """
+        return self._samples[name].view().copy()
+
+    def rates(self, name, last=None):
+        """
+        Return the rates of an interface between successive samples.
+
+        :param str name: Name of the interface.
+        :param int last: Return only the `last` most recent rates.
+
+        :return: dictionary of numpy arrays of floats, with the end time of
+            each interval under ``'time'`` and the rates in bits, packets,
+            errors or discards per second:
+
+        .. code-block:: python
+
+            {'time':          array([1415000060., 1415000120.]),
+             'rx bps':        array([8000., 9600.]),
+             'rx pps':        array([10., 12.]),
+             'rx errors/s':   array([0., 0.]),
+             'rx discards/s': array([0., 0.]),
+             'tx bps':        array([...]),
+             ...}
+        """
+        samples = self._samples[name].view(None if last is None
+                                           else last + 1)
+        start, end = samples[:-1], samples[1:]
+        elapsed = end['time'] - start['time']
+
+        cleared = end['cleared']
+        reset = (cleared != start['cleared']) & ~numpy.isnan(cleared)
+        since_reset = end['time'] - numpy.clip(cleared, start['time'],
+                                               end['time'])
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            rates = {'time': end['time'].copy()}
+            for rate, counter, scale in RATES:
+                delta = end[counter] - start[counter]
+                delta[delta < 0] = numpy.nan
+                rates[rate] = numpy.where(
+                    reset, end[counter] / since_reset,
+                    delta / elapsed) * scale
+        for values in rates.values():
+            values[~numpy.isfinite(values)] = numpy.nan
+        return rates
+
+    def latest(self):
+        """
+        Return the most recent rates of every interface with at least two
+        samples.
+
+        :return: dictionary of interface names to dictionaries of floats,
+            with the same keys as :py:meth:`rates`.
+        """
+        latest = {}
+        for name, samples in self._samples.items():
+            if len(samples) > 1:
+                latest[name] = dict((rate, float(values[-1])) for rate, values
+                                    in self.rates(name, last=1).items())
+        return latest
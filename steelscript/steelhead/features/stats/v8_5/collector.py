@@ -0,0 +1,293 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+"""
+Time series of the bandwidth stats of many SteelHeads, kept in memory.
+
+This module requires numpy, which is not installed with
+steelscript.steelhead.  Install it with the ``frame`` extra.
+"""
+
+from __future__ import (unicode_literals, print_function, division,
+                        absolute_import)
+
+import time
+import logging
+import threading
+from collections import namedtuple
+
+import numpy
+
+from steelscript.common.interaction.model import Model
+from steelscript.steelhead.core.ringbuffer import RingBuffer
+from steelscript.steelhead.core.timeutils import epoch_seconds
+from steelscript.steelhead.features.stats.v8_5.model import DIRECTIONS
+
+logger = logging.getLogger(__name__)
+
+
+# Numeric values of typed 'show stats bandwidth' results that are sampled.
+FIELDS = ['wan data', 'lan data', 'data reduction', 'data reduction peak',
+          'capacity increase']
+
+# One sample, or the average of the samples of one downsampling interval.
+# Times are UTC, missing values are NaN.
+SAMPLE_DTYPE = numpy.dtype([('time', '<M8[s]')] +
+                           [(field, '<f8') for field in FIELDS])
+
+# A series at one resolution: `step` seconds per sample, 0 for every sample
+# as collected, and `size` samples kept.
+Tier = namedtuple('Tier', ['name', 'step', 'size'])
+
+# A day of minute polls, a week of 5 minute averages and 90 days of hourly
+# averages.
+TIERS = (Tier('raw', 0, 1440),
+         Tier('5min', 300, 2016),
+         Tier('1h', 3600, 2160))
+
+
+def _seconds(value):
+    return int(epoch_seconds(value))
+
+
+def _number(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return numpy.nan
+
+
+class BandwidthSeries(object):
+    """
+    Samples of one device and direction, at every resolution of `tiers`.
+
+    Each tier is a :py:class:`RingBuffer
+    <steelscript.steelhead.core.ringbuffer.RingBuffer>`.  Downsampled tiers
+    average the samples of each interval as they arrive, and append the
+    average once a sample of a later interval is added, so appending costs
+    the same however much history is kept.
+
+    :param tiers: sequence of :py:class:`Tier`.
+    """
+
+    def __init__(self, tiers=TIERS):
+        self.tiers = tuple(tiers)
+        self._buffers = dict((tier.name, RingBuffer(tier.size, SAMPLE_DTYPE))
+                             for tier in self.tiers)
+        # Tier name -> [interval start, sums, counts] of the interval
+        # being averaged.
+        self._pending = dict(
+            (tier.name, [None, numpy.zeros(len(FIELDS)),
+                         numpy.zeros(len(FIELDS), dtype=numpy.int64)])
+            for tier in self.tiers if tier.step)
+
+    def __len__(self):
+        return len(self._buffers[self.tiers[0].name])
+
+    def add(self, timestamp, stats):
+        """
+        Add one sample.
+
+        :param timestamp: time of the sample, as seconds since the epoch or
+            :py:class:`datetime.datetime`, in UTC if naive.
+        :param dict stats: typed result of
+            :py:meth:`.StatsModel.show_stats_bandwidth`.
+        """
+        seconds = _seconds(timestamp)
+        values = numpy.array([_number(stats.get(field)) for field in FIELDS])
+        for tier in self.tiers:
+            if not tier.step:
+                self._buffers[tier.name].append(
+                    (seconds,) + tuple(values))
+                continue
+            pending = self._pending[tier.name]
+            start = seconds - seconds % tier.step
+            if pending[0] is not None and start > pending[0]:
+                self._flush(tier.name, pending)
+            if pending[0] is None or start > pending[0]:
+                pending[0] = start
+            known = ~numpy.isnan(values)
+            pending[1][known] += values[known]
+            pending[2][known] += 1
+
+    def query(self, tier='raw', start=None, end=None):
+        """
+        Return the samples of one tier from `start` up to, but excluding,
+        `end`.
+
+        Samples are assumed to be added in time order.  An interval of a
+        downsampled tier is returned once a sample of a later interval has
+        been added.
+
+        :param str tier: Name of the tier.
+        :param start: Earliest time, as seconds since the epoch or
+            :py:class:`datetime.datetime`, in UTC if naive.
+        :param end: Time to stop at, likewise.
+
+        :return: numpy array of :py:data:`SAMPLE_DTYPE` records.
+        """
+        samples = self._buffers[tier].view()
+        times = samples['time'].astype(numpy.int64)
+        first = 0 if start is None else \
+            numpy.searchsorted(times, _seconds(start))
+        last = len(samples) if end is None else \
+            numpy.searchsorted(times, _seconds(end))
+        return samples[first:last].copy()
+
+    def _flush(self, name, pending):
+        start, sums, counts = pending
+        with numpy.errstate(invalid='ignore'):
+            means = sums / counts
+        self._buffers[name].append((start,) + tuple(means))
+        sums[:] = 0
+        counts[:] = 0
+
+
+class BandwidthCollector(object):
+    """
+    Collects the bandwidth stats of every device of a
+    :py:class:`SteelHeadFleet
+    <steelscript.steelhead.core.steelhead.SteelHeadFleet>` in all three
+    directions, into a :py:class:`BandwidthSeries` per device and direction.
+
+    .. code-block:: python
+
+        collector = BandwidthCollector(SteelHeadFleet(hosts, auth=auth))
+        thread = threading.Thread(target=collector.run, args=(60,))
+        thread.start()
+        ...
+        hourly = collector.query('sh1', tier='1h', start=yesterday)
+        plot(hourly['time'], hourly['data reduction'])
+
+    Each poll runs
+    :py:meth:`.StatsModel.show_stats_bandwidth_all_directions` on all
+    devices in parallel.  Devices that fail are logged and skipped;
+    the last error of each device is kept in :py:attr:`errors`.
+
+    :param fleet: :py:class:`SteelHeadFleet
+        <steelscript.steelhead.core.steelhead.SteelHeadFleet>` to poll.
+    :param str port: Port to filter the stats on, or ``'all'``.
+    :param str frequency: Period the stats of each poll cover, such as
+        ``'1min'``.  It should match the polling interval.
+    :param tiers: sequence of :py:class:`Tier` of every series.
+    """
+
+    def __init__(self, fleet=None, port='all', frequency='1min',
+                 tiers=TIERS):
+        self.fleet = fleet
+        self.port = port
+        self.frequency = frequency
+        self.tiers = tuple(tiers)
+        self.errors = {}
+        self._series = {}
+        self._stop = threading.Event()
+
+    def __repr__(self):
+        return '<BandwidthCollector series: %d>' % len(self._series)
+
+    def devices(self):
+        """
+        Return the hosts that samples were collected from.
+        """
+        return sorted(set(device for device, _ in self._series))
+
+    def poll(self, timestamp=None):
+        """
+        Collect one sample of every device of the fleet.
+
+        :param timestamp: time of the poll, as seconds since the epoch or
+            :py:class:`datetime.datetime`.  Defaults to now.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        self.update_fleet(self.fleet.run(
+            Model, 'stats', 'show_stats_bandwidth_all_directions',
+            self.port, self.frequency, typed=True), timestamp)
+
+    def update_fleet(self, results, timestamp=None):
+        """
+        Add the samples of many devices.
+
+        :param results: iterable of ``(host, stats)`` tuples, as generated
+            by :py:meth:`SteelHeadFleet.run
+            <steelscript.steelhead.core.steelhead.SteelHeadFleet.run>` with
+            ``show_stats_bandwidth_all_directions`` and ``typed=True``.
+            Exceptions in place of stats are recorded in :py:attr:`errors`.
+        :param timestamp: time of the poll, defaults to now.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        for host, stats in results:
+            if isinstance(stats, Exception):
+                logger.warning('Polling bandwidth of %s failed: %s'
+                               % (host, stats))
+                self.errors[host] = stats
+                continue
+            self.errors.pop(host, None)
+            self.add(host, stats, timestamp)
+
+    def add(self, device, stats, timestamp=None):
+        """
+        Add the sample of one device.
+
+        :param str device: Host the stats were read from.
+        :param dict stats: dictionary of directions to typed stats, as
+            returned by ``show_stats_bandwidth_all_directions``.
+        :param timestamp: time of the poll, defaults to now.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        for direction, values in stats.items():
+            series = self._series.get((device, direction))
+            if series is None:
+                series = self._series[(device, direction)] = \
+                    BandwidthSeries(self.tiers)
+            series.add(timestamp, values)
+
+    def series(self, device, direction='bi-directional'):
+        """
+        Return the :py:class:`BandwidthSeries` of one device and direction.
+        """
+        return self._series[(device, direction)]
+
+    def query(self, device, direction='bi-directional', tier='raw',
+              start=None, end=None):
+        """
+        Return the samples of one device and direction, see
+        :py:meth:`BandwidthSeries.query`.
+
+        :param str direction: One of ``'lan-to-wan'``, ``'wan-to-lan'``
+            and ``'bi-directional'``.
+
+        :return: numpy array of :py:data:`SAMPLE_DTYPE` records.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError('Unknown direction %r, expected one of %s'
+                             % (direction, ', '.join(DIRECTIONS)))
+        return self.series(device, direction).query(tier, start, end)
+
+    def run(self, interval=60, polls=None):
+        """
+        Poll the fleet every `interval` seconds until :py:meth:`stop` is
+        called, or `polls` polls were made.
+        """
+        count = 0
+        next_poll = time.time()
+        try:
+            while True:
+                self.poll()
+                count += 1
+                next_poll += interval
+                if count == polls or \
+                        self._stop.wait(max(next_poll - time.time(), 0)):
+                    break
+        finally:
+            self._stop.clear()
+
+    def stop(self):
+        """
+        Stop :py:meth:`run` after the poll in progress.
+        """
+        self._stop.set()
@@ -7,10 +7,17 @@
 from __future__ import (unicode_literals, print_function, division,
                         absolute_import)
 
-import re
-
 from steelscript.common.interaction.model import model, Model
 from steelscript.cmdline.parsers import cli_parse_basic
+from steelscript.steelhead.core.cache import exec_cached
+from steelscript.steelhead.core.cli import exec_batch
+from steelscript.steelhead.features.stats.v8_5.parser import (
+    PERCENT_RE, BANDWIDTH_PARSER, THROUGHPUT_PARSER, CONNECTIONS_PARSER,
+    DATASTORE_PARSER)
+
+
+# Traffic types of 'show stats bandwidth'
+DIRECTIONS = ['lan-to-wan', 'wan-to-lan', 'bi-directional']
 
 
 @model
@@ -19,7 +26,8 @@ class StatsModel(Model):
     Kauai Stats model for the SteelHead product
     """
 
-    def show_stats_bandwidth(self, port='all', type=None, frequency=None):
+    def show_stats_bandwidth(self, port='all', type=None, frequency=None,
+                             typed=False):
         """
         Method to show Bandwidth Stats on a SteelHead
 
@@ -36,6 +44,11 @@ class StatsModel(Model):
                           collection.  Options include 1min, 5min, hour, day,
                           week, or month.
 
+        :param typed: Return byte counts as ints, the peak time as a
+                      datetime and missing values as None, see below.
+                      Typed results are not cached.
+        :type typed: boolean
+
         :return: dictionary
 
         .. code-block:: python
@@ -49,27 +62,184 @@ class StatsModel(Model):
                  'capacity increase': '1.1'
              }
 
+        With `typed`, sizes are in bytes:
+
+        .. code-block:: python
+
+             {
+                 'wan data': 5798205850,
+                 'lan data': 6442450944,
+                 'data reduction': 10.0,
+                 'data reduction peak': 95.0,
+                 'data reduction peak time':
+                     datetime.datetime(2014, 12, 5, 14, 50),
+                 'capacity increase': 1.1
+             }
+
+        """
+
+        cmd = self._show_stats_bandwidth_cmd(port, type, frequency)
+        if typed:
+            result = self.cli.exec_command(cmd, output_expected=True)
+            return self._parse_show_stats_bandwidth_typed(result)
+        return exec_cached(self, cmd, self._parse_show_stats_bandwidth)
+
+    async def show_stats_bandwidth_async(self, port='all', type=None,
+                                         frequency=None, typed=False):
+        """
+        Awaitable version of :meth:`show_stats_bandwidth` for models obtained
+        from an :py:class:`AsyncSteelHead
+        <steelscript.steelhead.core.steelhead.AsyncSteelHead>`.
+        """
+        cmd = self._show_stats_bandwidth_cmd(port, type, frequency)
+        result = await self.cli.exec_command(cmd, output_expected=True)
+        if typed:
+            return self._parse_show_stats_bandwidth_typed(result)
+        return self._parse_show_stats_bandwidth(result)
+
+    def show_stats_bandwidth_all_directions(self, port='all', frequency=None,
+                                            typed=False):
+        """
+        Method to show Bandwidth Stats of every traffic type on a SteelHead
+
+        The three 'show stats bandwidth' commands are sent in one batch.
+        Results are not cached.
+
+        :param port: Optional parameter to filter the bandwidth summary to
+                     traffic on a specific port, as for
+                     :meth:`show_stats_bandwidth`.
+        :type port: string
+
+        :param frequency: Last period of time to lookback during stats
+                          collection, as for :meth:`show_stats_bandwidth`.
+
+        :param typed: Return typed values, as for
+                      :meth:`show_stats_bandwidth`.
+        :type typed: boolean
+
+        :return: dictionary of traffic types to the dictionaries
+                 :meth:`show_stats_bandwidth` returns
+
+        .. code-block:: python
+
+             {
+                 'lan-to-wan': {'wan data': '5.4 GB', ...},
+                 'wan-to-lan': {'wan data': '1.2 GB', ...},
+                 'bi-directional': {'wan data': '6.6 GB', ...}
+             }
+
         """
+        parse = self._parse_show_stats_bandwidth_typed if typed \
+            else self._parse_show_stats_bandwidth
+        cmds = [self._show_stats_bandwidth_cmd(port, direction, frequency)
+                for direction in DIRECTIONS]
+        outputs = exec_batch(self.cli, cmds, output_expected=True)
+        return dict((direction, parse(output))
+                    for direction, output in zip(DIRECTIONS, outputs))
+
+    def show_stats_throughput(self, port='all', type=None, frequency=None):
+        """
+        Method to show Throughput Stats on a SteelHead
 
-        cmd = "show stats bandwidth %s" % port
-        if type is not None:
-            cmd = cmd + " " + type
-        if frequency is not None:
-            cmd = cmd + " " + frequency
+        :param port: Optional parameter to filter the throughput summary to
+                     traffic on a specific port, as for
+                     :meth:`show_stats_bandwidth`.
+        :type port: string
+
+        :param type: The type of traffic to summarize, as for
+                     :meth:`show_stats_bandwidth`.
+        :type type: string
+
+        :param frequency: Last period of time to lookback during stats
+                          collection, as for :meth:`show_stats_bandwidth`.
 
-        result = self.cli.exec_command(cmd, output_expected=True)
+        :return: dictionary, with rates in bits per second
+
+        .. code-block:: python
+
+             {
+                 'lan average': 1500000,
+                 'lan peak': 12000000,
+                 'lan peak time': datetime.datetime(2014, 12, 5, 14, 50),
+                 'lan 95th percentile': 9800000,
+                 'wan average': 400000,
+                 ...
+             }
+
+        """
+        cmd = self._show_stats_cmd('throughput', port, type, frequency)
+        return exec_cached(self, cmd, THROUGHPUT_PARSER.parse)
+
+    def show_stats_connections(self, frequency=None):
+        """
+        Method to show Connection Stats on a SteelHead
+
+        :param frequency: Last period of time to lookback during stats
+                          collection, as for :meth:`show_stats_bandwidth`.
+
+        :return: dictionary
+
+        .. code-block:: python
+
+             {
+                 'total connections': 1200,
+                 'optimized': 800,
+                 'established': 780,
+                 'half opened': 12,
+                 'half closed': 8,
+                 'active': 790,
+                 'passthrough': 400,
+                 'forwarded': 0,
+                 'peak connections': 1500,
+                 'peak time': datetime.datetime(2014, 12, 5, 14, 50)
+             }
+
+        """
+        cmd = self._show_stats_cmd('connections', frequency)
+        return exec_cached(self, cmd, CONNECTIONS_PARSER.parse)
+
+    def show_stats_datastore(self):
+        """
+        Method to show Data Store Stats on a SteelHead
+
+        :return: dictionary, with sizes in bytes
+
+        .. code-block:: python
+
+             {
+                 'hits': 120000,
+                 'misses': 3000,
+                 'hit rate': 97.6,
+                 'used': 53687091200,
+                 'total': 107374182400,
+                 'used percent': 50.0
+             }
+
+        """
+        cmd = self._show_stats_cmd('datastore')
+        return exec_cached(self, cmd, DATASTORE_PARSER.parse)
+
+    def _show_stats_cmd(self, stat, *args):
+        return " ".join(["show stats", stat] +
+                        [arg for arg in args if arg is not None])
+
+    def _show_stats_bandwidth_cmd(self, port='all', type=None,
+                                  frequency=None):
+        return self._show_stats_cmd('bandwidth', port, type, frequency)
+
+    def _parse_show_stats_bandwidth(self, result):
         result.strip()
         parsed = cli_parse_basic(result)
 
-        pct_pattern = "(\d+\.*\d*) [%X]"
-        regex = re.compile(pct_pattern)
-
         for stat in parsed:
             if not parsed[stat]:
                 parsed[stat] = 'None'
                 continue
-            match = regex.search(parsed[stat])
+            match = PERCENT_RE.search(parsed[stat])
             if match:
                 parsed[stat] = float(match.group(1))
 
         return parsed
+
+    def _parse_show_stats_bandwidth_typed(self, result):
+        return BANDWIDTH_PARSER.parse(result)
@@ -0,0 +1,251 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+"""
+Table-driven parser for the output of 'show stats' commands.
+
+Each command is described by a list of :py:class:`FieldSpec`, one per
+``Label: value`` line, which :py:class:`StatsParser` compiles once into a
+lookup table of converters.
+"""
+
+from __future__ import (unicode_literals, print_function, division,
+                        absolute_import)
+
+import re
+import datetime
+from collections import namedtuple
+
+from steelscript.cmdline.parsers import check_numeric
+from steelscript.steelhead.core.timeutils import APPLIANCE_TIME_FORMAT
+
+
+# Percentages such as '93 %' and capacity increases such as '15.4 X'
+PERCENT_RE = re.compile(r"(\d+\.*\d*) [%X]")
+
+# Byte counts such as '4.2 MB', in powers of 1024
+BYTES_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*([KMGTPE]?)B(?:ytes)?$",
+                      re.IGNORECASE)
+BYTE_UNITS = dict((unit, 1024 ** i) for i, unit in enumerate('KMGTPE', 1))
+BYTE_UNITS[''] = 1
+
+# Bit rates such as '1.5 Mbps', in powers of 1000
+RATE_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*([kKMGT]?)bps$")
+RATE_UNITS = {'': 1, 'k': 10 ** 3, 'K': 10 ** 3, 'M': 10 ** 6,
+              'G': 10 ** 9, 'T': 10 ** 12}
+
+
+def parse_bytes(value):
+    """
+    Convert a byte count such as ``'4.2 MB'`` into a number of bytes, with
+    1 KB = 1024 bytes.
+
+    :return: int, or None if `value` is not a byte count.
+    """
+    match = BYTES_RE.match(value)
+    if match is None:
+        return None
+    number, unit = match.groups()
+    return int(round(float(number) * BYTE_UNITS[unit.upper()]))
+
+
+def parse_rate(value):
+    """
+    Convert a bit rate such as ``'1.5 Mbps'`` into bits per second, with
+    1 kbps = 1000 bps.
+
+    :return: int, or None if `value` is not a bit rate.
+    """
+    match = RATE_RE.match(value)
+    if match is None:
+        return None
+    number, unit = match.groups()
+    return int(round(float(number) * RATE_UNITS[unit]))
+
+
+def parse_percent(value):
+    """
+    Convert a percentage such as ``'93 %'`` or a factor such as
+    ``'15.4 X'`` into a float.
+
+    :return: float, or None if `value` is neither.
+    """
+    match = PERCENT_RE.search(value)
+    if match is None:
+        return None
+    return float(match.group(1))
+
+
+def parse_count(value):
+    """
+    Convert a count such as ``'1,024'`` into an int.
+
+    :return: int, or None if `value` is not a count.
+    """
+    try:
+        return int(value.replace(',', ''))
+    except ValueError:
+        return None
+
+
+def parse_time(value):
+    """
+    Convert a time such as ``'2014/12/09 08:39:35'`` into a
+    :py:class:`datetime.datetime`.
+
+    :return: datetime, or None if `value` is not a time.
+    """
+    try:
+        return datetime.datetime.strptime(value, APPLIANCE_TIME_FORMAT)
+    except ValueError:
+        return None
+
+
+# Converters of each unit type
+UNITS = {
+    'bytes': parse_bytes,
+    'rate': parse_rate,
+    'percent': parse_percent,
+    'ratio': parse_percent,
+    'count': parse_count,
+    'time': parse_time,
+    'text': str,
+}
+
+_FieldSpec = namedtuple('FieldSpec', ['label', 'unit', 'name', 'converter'])
+
+
+class FieldSpec(_FieldSpec):
+    """
+    Description of one ``Label: value`` line of a 'show stats' command.
+
+    :param str label: Label as printed by the CLI, matched regardless of
+        case.
+    :param str unit: Unit type of the value, a key of :py:data:`UNITS`.
+    :param str name: Key of the value in parsed records.  Defaults to the
+        label in lower case.
+    :param converter: Function converting the value text, returning None if
+        it cannot.  Defaults to the converter of `unit`.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, label, unit='text', name=None, converter=None):
+        if converter is None:
+            if unit not in UNITS:
+                raise ValueError('Unknown unit %r, expected one of %s'
+                                 % (unit, ', '.join(sorted(UNITS))))
+            converter = UNITS[unit]
+        return super(FieldSpec, cls).__new__(
+            cls, label, unit, name or label.lower(), converter)
+
+
+class StatsParser(object):
+    """
+    Parser of the output of one 'show stats' command.
+
+    Every line is split on its first ``:`` and its label looked up in a
+    table compiled from `specs`.  Empty values parse as None.  Values a
+    converter cannot read, and lines without a spec, fall back to
+    :py:func:`check_numeric <steelscript.cmdline.parsers.check_numeric>`,
+    as :py:func:`cli_parse_basic
+    <steelscript.cmdline.parsers.cli_parse_basic>` would read them, so
+    bare numbers are still ints and floats.
+
+    .. code-block:: python
+
+        parser = StatsParser([FieldSpec('WAN Data', 'bytes'),
+                              FieldSpec('Data Reduction', 'percent')])
+        parser.parse('WAN Data: 4.2 MB\\nData Reduction: 93 %')
+        # {'wan data': 4404019, 'data reduction': 93.0}
+
+    :param specs: sequence of :py:class:`FieldSpec`.
+    """
+
+    def __init__(self, specs):
+        self.specs = tuple(specs)
+        self._fields = dict((spec.label.lower(), (spec.name, spec.converter))
+                            for spec in self.specs)
+
+    def __repr__(self):
+        return '<StatsParser fields: %d>' % len(self.specs)
+
+    def parse(self, output):
+        """
+        Parse the output of the command.
+
+        :param str output: CLI output.
+
+        :return: dictionary of field names to values.
+        """
+        fields = self._fields
+        parsed = {}
+        for line in output.splitlines():
+            label, sep, value = line.partition(':')
+            if not sep:
+                continue
+            label = label.strip().lower()
+            value = value.strip()
+            field = fields.get(label)
+            if field is None:
+                parsed[label] = check_numeric(value) if value else None
+                continue
+            name, converter = field
+            if not value:
+                parsed[name] = None
+                continue
+            converted = converter(value)
+            parsed[name] = check_numeric(value) if converted is None \
+                else converted
+        return parsed
+
+
+BANDWIDTH_FIELDS = [
+    FieldSpec('WAN Data', 'bytes'),
+    FieldSpec('LAN Data', 'bytes'),
+    FieldSpec('Data Reduction', 'percent'),
+    FieldSpec('Data Reduction Peak', 'percent'),
+    FieldSpec('Data Reduction Peak Time', 'time'),
+    FieldSpec('Capacity Increase', 'ratio'),
+]
+
+THROUGHPUT_FIELDS = [
+    FieldSpec('LAN Average', 'rate'),
+    FieldSpec('LAN Peak', 'rate'),
+    FieldSpec('LAN Peak Time', 'time'),
+    FieldSpec('LAN 95th Percentile', 'rate'),
+    FieldSpec('WAN Average', 'rate'),
+    FieldSpec('WAN Peak', 'rate'),
+    FieldSpec('WAN Peak Time', 'time'),
+    FieldSpec('WAN 95th Percentile', 'rate'),
+]
+
+CONNECTIONS_FIELDS = [
+    FieldSpec('Total Connections', 'count'),
+    FieldSpec('Optimized', 'count'),
+    FieldSpec('Established', 'count'),
+    FieldSpec('Half Opened', 'count'),
+    FieldSpec('Half Closed', 'count'),
+    FieldSpec('Active', 'count'),
+    FieldSpec('Passthrough', 'count'),
+    FieldSpec('Forwarded', 'count'),
+    FieldSpec('Peak Connections', 'count'),
+    FieldSpec('Peak Time', 'time'),
+]
+
+DATASTORE_FIELDS = [
+    FieldSpec('Hits', 'count'),
+    FieldSpec('Misses', 'count'),
+    FieldSpec('Hit Rate', 'percent'),
+    FieldSpec('Used', 'bytes'),
+    FieldSpec('Total', 'bytes'),
+    FieldSpec('Used Percent', 'percent'),
+]
+
+BANDWIDTH_PARSER = StatsParser(BANDWIDTH_FIELDS)
+THROUGHPUT_PARSER = StatsParser(THROUGHPUT_FIELDS)
+CONNECTIONS_PARSER = StatsParser(CONNECTIONS_FIELDS)
+DATASTORE_PARSER = StatsParser(DATASTORE_FIELDS)
@@ -0,0 +1,83 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+import datetime
+from unittest import mock
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+from steelscript.steelhead.features.stats.v8_5.collector import \
+    BandwidthCollector, BandwidthSeries, Tier  # noqa: E402
+
+
+START = datetime.datetime(2014, 12, 9, 8, 0)
+
+
+def stats(reduction, wan=1024):
+    return {'wan data': wan, 'lan data': None,
+            'data reduction': float(reduction),
+            'data reduction peak time': START,
+            'capacity increase': 2.0}
+
+
+def minutes(n):
+    return START + datetime.timedelta(minutes=n)
+
+
+def test_series_tiers():
+    series = BandwidthSeries([Tier('raw', 0, 4), Tier('5min', 300, 10)])
+    for i in range(12):
+        series.add(minutes(i), stats(i))
+
+    raw = series.query('raw')
+    assert len(raw) == 4
+    assert raw['data reduction'].tolist() == [8, 9, 10, 11]
+    assert raw['time'][-1] == numpy.datetime64(minutes(11))
+    assert numpy.isnan(raw['lan data']).all()
+
+    # The interval starting at minute 10 is still being averaged.
+    averaged = series.query('5min')
+    assert averaged['time'].tolist() == [START, minutes(5)]
+    assert averaged['data reduction'].tolist() == [2, 7]
+    assert averaged['wan data'].tolist() == [1024, 1024]
+
+
+def test_series_query_range():
+    series = BandwidthSeries()
+    for i in range(10):
+        series.add(minutes(i), stats(i))
+    result = series.query(start=minutes(3), end=minutes(6))
+    assert result['data reduction'].tolist() == [3, 4, 5]
+    assert series.query(start=minutes(20)).size == 0
+
+
+def test_collector_update_fleet():
+    collector = BandwidthCollector()
+    results = [('sh1', {'lan-to-wan': stats(10),
+                        'bi-directional': stats(20)}),
+               ('sh2', ValueError('unreachable'))]
+    collector.update_fleet(results, START)
+    assert collector.devices() == ['sh1']
+    assert isinstance(collector.errors['sh2'], ValueError)
+    assert collector.query('sh1')['data reduction'].tolist() == [20]
+    with pytest.raises(ValueError):
+        collector.query('sh1', 'upstream')
+
+
+def test_collector_run():
+    fleet = mock.Mock()
+    fleet.run.return_value = [('sh1', {'bi-directional': stats(10)})]
+    collector = BandwidthCollector(fleet, frequency='5min')
+    collector.run(interval=0, polls=3)
+    assert fleet.run.call_count == 3
+    fleet.run.assert_called_with(
+        mock.ANY, 'stats', 'show_stats_bandwidth_all_directions', 'all',
+        '5min', typed=True)
+    assert len(collector.series('sh1')) == 3
@@ -0,0 +1,93 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+from unittest import mock
+import pytest
+
+from steelscript.steelhead.core.cache import ResultCache
+from steelscript.steelhead.features.common.v8_5.model import CommonModel
+
+
+SHOW_VERSION_OUTPUT = """
+Product name:      rbt_sh
+Product release:   9.0.0-rc
+Product model:     2050
+"""
+
+
+@pytest.fixture
+def cache():
+    return ResultCache(ttls={'show version': 3600,
+                             'show interfaces': 60,
+                             'show interfaces aux': 0},
+                       maxsize=2)
+
+
+def device(host):
+    return mock.Mock(host=host, port=22)
+
+
+def test_ttl_for_longest_prefix(cache):
+    assert cache.ttl_for('show version') == 3600
+    assert cache.ttl_for('show interfaces inpath0_0 brief') == 60
+    assert cache.ttl_for('show interfaces aux configured') == 0
+    assert cache.ttl_for('show interfacesfoo') == 0
+    assert cache.ttl_for('show flows all') == 0
+
+
+def test_get_put_expire(cache):
+    sh = device('sh1')
+    cache.put(sh, 'show version', {'a': 1})
+    assert cache.get(sh, 'show version') == {'a': 1}
+    assert cache.get(device('sh2'), 'show version') is None
+    with mock.patch('steelscript.steelhead.core.cache.time.time',
+                    return_value=cache._entries[('sh1', 22, 'show version')]
+                    [0]):
+        assert cache.get(sh, 'show version') is None
+    assert len(cache) == 0
+
+
+def test_results_are_copied(cache):
+    sh = device('sh1')
+    value = {'a': [1]}
+    cache.put(sh, 'show version', value)
+    value['a'].append(2)
+    cache.get(sh, 'show version')['a'].append(3)
+    assert cache.get(sh, 'show version') == {'a': [1]}
+
+
+def test_lru_eviction(cache):
+    for host in ('sh1', 'sh2'):
+        cache.put(device(host), 'show version', host)
+    cache.get(device('sh1'), 'show version')
+    cache.put(device('sh3'), 'show version', 'sh3')
+    assert cache.get(device('sh2'), 'show version') is None
+    assert cache.get(device('sh1'), 'show version') == 'sh1'
+
+
+def test_invalidate(cache):
+    for host in ('sh1', 'sh2'):
+        cache.put(device(host), 'show version', host)
+    cache.invalidate(device('sh1'))
+    assert cache.get(device('sh1'), 'show version') is None
+    assert cache.get(device('sh2'), 'show version') == 'sh2'
+    cache.invalidate(command='show')
+    assert len(cache) == 0
+
+
+def test_model_uses_steelhead_cache(cache):
+    sh = device('sh1')
+    sh.result_cache = cache
+    cli = mock.Mock()
+    cli.exec_command.return_value = SHOW_VERSION_OUTPUT
+    model = CommonModel(sh, cli=cli)
+    first = model.show_version()
+    assert model.show_version() == first
+    assert cli.exec_command.call_count == 1
+    assert (cache.hits, cache.misses) == (1, 1)
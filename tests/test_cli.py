@@ -0,0 +1,172 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+import socket
+from unittest import mock
+import pytest
+
+from steelscript.cmdline import exceptions, sshchannel
+from steelscript.steelhead.core.cli import PrefetchedCLI, SteelHeadCLI, \
+    exec_batch, iter_command
+
+
+# What the appliance sends back for three commands typed ahead at once:
+# the echo of each command, its output and the next prompt.
+BATCH_RESPONSE = (
+    'show version\r\r\n'
+    'Product name:      rbt_sh\r\n'
+    'Product release:   9.0.0-rc\r\n'
+    'sh1 # show interfaces aux brief\r\r\n'
+    'Interface aux state\r\n'
+    '   Up:                 yes\r\n'
+    'sh1 # show flows passthrough\r\n'
+    '\r\n'
+    'sh1 # '
+)
+
+
+class FakeParamikoChannel(object):
+    # Reads from one end of a socket pair, so select() works on it.
+
+    def __init__(self, chunks):
+        self._sock, self._peer = socket.socketpair()
+        self._chunks = list(chunks)
+
+    def fileno(self):
+        return self._sock.fileno()
+
+    def send_next(self):
+        self._peer.sendall(self._chunks.pop(0))
+
+    def recv(self, size):
+        data = self._sock.recv(size)
+        if self._chunks:
+            self.send_next()
+        return data
+
+    def exit_status_ready(self):
+        return False
+
+
+@pytest.fixture
+def cli():
+    cli = SteelHeadCLI(hostname='sh1', username='admin', password='password')
+    cli.channel = mock.Mock(spec=sshchannel.SSHChannel)
+    cli.channel.safe_line_feeds.side_effect = lambda s: s
+    cli.channel.fixup_carriage_returns.side_effect = \
+        lambda s: sshchannel.SSHChannel.fixup_carriage_returns(None, s)
+    cli.default_mode = None
+    return cli
+
+
+def respond(cli, response, chunk_size):
+    data = response.encode()
+    chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+    cli.channel.channel = FakeParamikoChannel(chunks)
+    cli.channel.channel.send_next()
+
+
+@pytest.mark.parametrize('chunk_size', [4096, 7, 1])
+def test_exec_batch(cli, chunk_size):
+    respond(cli, BATCH_RESPONSE, chunk_size)
+    outputs = cli.exec_batch(['show version',
+                              'show interfaces aux brief',
+                              'show flows passthrough'])
+    cli.channel.send.assert_called_once_with(
+        'show version\rshow interfaces aux brief\rshow flows passthrough\r')
+    assert outputs == [
+        'Product name:      rbt_sh\nProduct release:   9.0.0-rc',
+        'Interface aux state\n   Up:                 yes',
+        '',
+    ]
+
+
+def test_exec_batch_output_expected(cli):
+    respond(cli, BATCH_RESPONSE, 4096)
+    with pytest.raises(exceptions.UnexpectedOutput):
+        cli.exec_batch(['show version',
+                        'show interfaces aux brief',
+                        'show flows passthrough'], output_expected=True)
+
+
+def test_exec_batch_cli_error(cli):
+    respond(cli, 'show foo\r\n% Unrecognized command "foo".\r\nsh1 # ', 4096)
+    with pytest.raises(exceptions.CLIError):
+        cli.exec_batch(['show foo'])
+    respond(cli, 'show foo\r\n% Unrecognized command "foo".\r\nsh1 # ', 4096)
+    assert cli.exec_batch(['show foo'], error_expected=True) == \
+        ['% Unrecognized command "foo".']
+
+
+FLOWS_RESPONSE = (
+    'show flows\r\r\n'
+    'T  Source  Destination\r\n'
+    'O  10.0.0.1:80  10.0.0.2:80\r\n'
+    'O  10.0.0.3:80  10.0.0.4:80\r\n'
+    'sh1 # '
+)
+
+
+@pytest.mark.parametrize('chunk_size', [4096, 7, 1])
+def test_iter_command(cli, chunk_size):
+    respond(cli, FLOWS_RESPONSE, chunk_size)
+    lines = cli.iter_command('show flows')
+    assert next(lines) == 'T  Source  Destination'
+    cli.channel.send.assert_called_once_with('show flows\r')
+    assert list(lines) == ['O  10.0.0.1:80  10.0.0.2:80',
+                           'O  10.0.0.3:80  10.0.0.4:80']
+
+
+def test_iter_command_close(cli):
+    respond(cli, FLOWS_RESPONSE, 7)
+    lines = cli.iter_command('show flows')
+    next(lines)
+    lines.close()
+    # The rest of the output was read up to the prompt.
+    assert not cli.channel.channel._chunks
+
+
+def test_iter_command_cli_error(cli):
+    respond(cli, 'show foo\r\n% Unrecognized command "foo".\r\nsh1 # ', 4096)
+    with pytest.raises(exceptions.CLIError):
+        list(cli.iter_command('show foo'))
+
+
+def test_exec_batch_without_batch_support():
+    cli = mock.Mock(spec=['exec_command'])
+    cli.exec_command.side_effect = lambda cmd, **kwargs: 'out of ' + cmd
+    assert exec_batch(cli, ['show version', 'show info'],
+                      output_expected=True) == \
+        ['out of show version', 'out of show info']
+    cli.exec_command.assert_called_with('show info', output_expected=True)
+
+
+def test_iter_command_without_stream_support():
+    cli = mock.Mock(spec=['exec_command'])
+    cli.exec_command.return_value = 'line 1\nline 2'
+    assert list(iter_command(cli, 'show flows')) == ['line 1', 'line 2']
+
+
+def test_prefetched_cli():
+    cli = mock.Mock(spec=['exec_command', 'exec_batch'])
+    cli.exec_command.return_value = 'fetched'
+    cli.exec_batch.side_effect = lambda cmds, **kwargs: \
+        ['batched %s' % cmd for cmd in cmds]
+    prefetched = PrefetchedCLI(cli, {'show version': 'version',
+                                     'show info': 'info'})
+    assert prefetched.exec_command('show version') == 'version'
+    assert not cli.exec_command.called
+    assert prefetched.exec_command('show flows') == 'fetched'
+
+    assert exec_batch(prefetched, ['show info', 'show flows',
+                                   'show version'],
+                      output_expected=True) == \
+        ['info', 'batched show flows', 'version']
+    cli.exec_batch.assert_called_once_with(['show flows'],
+                                           output_expected=True)
@@ -0,0 +1,155 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+from unittest import mock
+import pytest
+
+from steelscript.cmdline import exceptions
+from steelscript.common.interaction.model import Model
+from steelscript.steelhead.core.clipool import CLIPool
+from steelscript.steelhead.core.steelhead import SteelHead, CLIAuth
+
+
+class FakeCLI(object):
+    started = 0
+
+    def __init__(self, hostname, username, password, private_key_path, port):
+        self.hostname = hostname
+        self.port = port
+        self.channel = None
+        self.exec_command = mock.Mock()
+
+    def start(self):
+        FakeCLI.started += 1
+        self.channel = mock.Mock()
+
+    def _cleanup_helper(self):
+        self.channel = None
+
+
+@pytest.fixture
+def pool():
+    FakeCLI.started = 0
+    return CLIPool(max_per_host=2, wait_timeout=0.1, cli_class=FakeCLI)
+
+
+@pytest.fixture
+def auth():
+    return CLIAuth('admin', 'password')
+
+
+def test_checkout_reuses_released_session(pool, auth):
+    cli = pool.checkout('sh1', 22, auth)
+    pool.release(cli)
+    assert pool.checkout('sh1', 22, auth) is cli
+    assert FakeCLI.started == 1
+    assert (pool.hits, pool.misses) == (1, 1)
+
+
+def test_checkout_requires_same_credentials(pool, auth):
+    cli = pool.checkout('sh1', 22, auth)
+    pool.release(cli)
+    other = pool.checkout('sh1', 22, CLIAuth('admin', 'wrong'))
+    assert other is not cli
+    assert FakeCLI.started == 2
+
+
+def test_checkout_unbounded_by_default(auth):
+    pool = CLIPool(cli_class=FakeCLI)
+    clis = [pool.checkout('sh1', 22, auth) for _ in range(8)]
+    assert len(set(map(id, clis))) == 8
+
+
+def test_checkout_is_exclusive(pool, auth):
+    cli1 = pool.checkout('sh1', 22, auth)
+    cli2 = pool.checkout('sh1', 22, auth)
+    assert cli1 is not cli2
+    assert pool.stats()['open'] == 2
+
+
+def test_checkout_waits_at_host_limit(pool, auth):
+    pool.checkout('sh1', 22, auth)
+    pool.checkout('sh1', 22, auth)
+    with pytest.raises(exceptions.ConnectionError):
+        pool.checkout('sh1', 22, auth)
+    # Other hosts are not affected by the limit.
+    pool.checkout('sh2', 22, auth)
+
+
+def test_checkout_reclaims_idle_slot_of_other_user(pool, auth):
+    pool.release(pool.checkout('sh1', 22, CLIAuth('monitor', 'password')))
+    pool.release(pool.checkout('sh1', 22, CLIAuth('other', 'password')))
+    cli = pool.checkout('sh1', 22, auth)
+    assert cli.channel is not None
+    assert pool.evictions == 1
+    assert pool.stats()['open'] == 2
+
+
+def test_checkout_replaces_disconnected_session(pool, auth):
+    cli = pool.checkout('sh1', 22, auth)
+    pool.release(cli)
+    cli.channel._verify_connected.side_effect = \
+        exceptions.ConnectionError(context='gone')
+    new_cli = pool.checkout('sh1', 22, auth)
+    assert new_cli is not cli
+    assert cli.channel is None
+    assert pool.reconnects == 1
+    assert pool.stats()['open'] == 1
+
+
+def test_idle_sessions_expire(pool, auth):
+    pool.idle_timeout = 60
+    cli = pool.checkout('sh1', 22, auth)
+    pool.release(cli)
+    (idle,) = pool._idle.values()
+    with mock.patch('steelscript.steelhead.core.clipool.time.time',
+                    return_value=idle[0][1] + 61):
+        pool.evict_idle()
+    assert cli.channel is None
+    assert pool.stats() == {'hits': 0, 'misses': 1, 'reconnects': 0,
+                            'evictions': 1, 'open': 0, 'idle': 0}
+
+
+def test_steelhead_returns_session_on_close(pool, auth):
+    sh = SteelHead('sh1', auth=auth, pool=pool)
+    cli = sh.session
+    assert sh.session is cli
+    sh.close()
+    with SteelHead('sh1', auth=auth, pool=pool) as sh2:
+        assert sh2.session is cli
+    assert pool.stats()['idle'] == 1
+
+
+def test_model_does_not_keep_released_session(pool, auth):
+    sh = SteelHead('sh1', auth=auth, pool=pool)
+    model = Model(sh)
+    model.cli.exec_command('show version')
+    cli = sh.session
+    sh.close()
+
+    # The session is now owned by another SteelHead.
+    sh2 = SteelHead('sh1', auth=auth, pool=pool)
+    assert sh2.session is cli
+    model.cli.exec_command('show info')
+    assert sh.session is not cli
+    assert sh.session.exec_command.call_args_list == [mock.call('show info')]
+    assert cli.exec_command.call_args_list == [mock.call('show version')]
+
+
+def test_release_expires_idle_sessions(pool, auth):
+    pool.idle_timeout = 60
+    old = pool.checkout('sh1', 22, auth)
+    cli = pool.checkout('sh1', 22, auth)
+    pool.release(old)
+    (idle,) = pool._idle.values()
+    with mock.patch('steelscript.steelhead.core.clipool.time.time',
+                    return_value=idle[0][1] + 61):
+        pool.release(cli)
+    assert old.channel is None
+    assert pool.stats()['idle'] == 1
@@ -7,10 +7,15 @@
 from __future__ import (unicode_literals, print_function, division,
                         absolute_import)
 
+import gc
+import weakref
 from unittest import mock
 import pytest
 
-from steelscript.steelhead.features.common.v8_5.model import CommonModel
+from steelscript.steelhead.core.cache import (ResultCache, VersionCache,
+                                              exec_cached)
+from steelscript.steelhead.features.common.v8_5.model import CommonModel, \
+    parse_uptime
 
 
 SHOW_VERSION_OUTPUT = """
@@ -36,6 +41,7 @@ SHOW_VERSION_PARSED = {
     'built by': 'mockbuild@bannow-worker1',
     'product model': '2050',
     'number of cpus': 4,
+    'uptime': 1271328,
 }
 
 
@@ -50,3 +56,129 @@ def test_show_interfaces_configured(mock_cli):
     mock_cli.exec_command.return_value = SHOW_VERSION_OUTPUT
     return_dict = model.show_version()
     assert return_dict == SHOW_VERSION_PARSED
+
+
+@pytest.mark.parametrize(('value', 'seconds'), [
+    ('14d 17h 8m 48s', 1271328),
+    ('2h 0m 5s', 7205),
+    ('33s', 33),
+    ('unknown', None),
+])
+def test_parse_uptime(value, seconds):
+    assert parse_uptime(value) == seconds
+
+
+def test_show_version_cached_until_reboot(mock_cli, tmpdir):
+    sh = mock.Mock(host='sh1', port=22)
+    sh.version_cache = VersionCache(path=str(tmpdir.join('versions.json')))
+    model = CommonModel(sh, cli=mock_cli)
+    mock_cli.exec_command.return_value = SHOW_VERSION_OUTPUT
+
+    with mock.patch('time.time', return_value=1000.0):
+        assert model.show_version() == SHOW_VERSION_PARSED
+    with mock.patch('time.time', return_value=1100.0):
+        # Served from memory, with the uptime advanced.
+        assert model.show_version()['uptime'] == 1271428
+    assert mock_cli.exec_command.call_count == 1
+
+    # Loaded back from disk once flushed.
+    sh.version_cache.flush()
+    cache = VersionCache(path=sh.version_cache.path)
+    with mock.patch('time.time', return_value=1100.0):
+        assert cache.get(sh)['product release'] == '9.0.0-rc'
+
+    # Upgraded and rebooted.
+    mock_cli.exec_command.return_value = SHOW_VERSION_OUTPUT.replace(
+        '14d 17h 8m 48s', '5m 0s').replace('9.0.0-rc', '9.1.0')
+    with mock.patch('time.time', return_value=1200.0):
+        assert model.show_version(refresh=True)['uptime'] == 300
+    assert sh.version_cache.reboots == 1
+    with mock.patch('time.time', return_value=1200.0):
+        assert model.show_version()['product release'] == '9.1.0'
+
+
+def test_version_cache_ttl_and_observe():
+    sh = mock.Mock(host='sh1', port=22)
+    cache = VersionCache(ttl=3600)
+    with mock.patch('time.time', return_value=0.0):
+        cache.put(sh, {'product release': '9.0.1', 'uptime': 1000})
+    with mock.patch('time.time', return_value=3600.0):
+        assert cache.get(sh) is None
+    with mock.patch('time.time', return_value=60.0):
+        assert not cache.observe(sh, 1030)
+        assert cache.get(sh)['uptime'] == 1060
+        assert cache.observe(sh, 10)
+        assert cache.get(sh) is None
+
+
+SHOW_INFO_OUTPUT = """
+Current User:      admin
+Status:            Healthy
+Config:            working
+Appliance Up Time: %s
+Service Up Time:   5m 0s
+Managed by CMC:    no
+"""
+
+
+def test_show_version_detects_reboot(mock_cli):
+    sh = mock.Mock(host='sh1', port=22)
+    sh.version_cache = VersionCache(check_interval=300)
+    sh.result_cache = ResultCache()
+    model = CommonModel(sh, cli=mock_cli)
+    mock_cli.exec_command.return_value = SHOW_VERSION_OUTPUT
+    with mock.patch('time.time', return_value=1000.0):
+        model.show_version()
+    # Also in the ResultCache, which must not be served after the reboot.
+    exec_cached(model, 'show version', model._parse_show_version)
+
+    # Still up when checked.
+    mock_cli.exec_command.return_value = SHOW_INFO_OUTPUT % '14d 17h 15m 0s'
+    with mock.patch('time.time', return_value=1400.0):
+        assert model.show_version()['uptime'] == 1271728
+    mock_cli.exec_command.assert_called_with('show info',
+                                             output_expected=True)
+
+    # Rebooted.
+    mock_cli.exec_command.side_effect = [
+        SHOW_INFO_OUTPUT % '5m 0s',
+        SHOW_VERSION_OUTPUT.replace('14d 17h 8m 48s', '5m 1s')]
+    with mock.patch('time.time', return_value=1800.0):
+        assert model.show_version()['uptime'] == 301
+    assert sh.version_cache.reboots == 1
+
+
+def test_show_version_cached_without_checks(mock_cli):
+    sh = mock.Mock(host='sh1', port=22)
+    sh.version_cache = VersionCache()
+    model = CommonModel(sh, cli=mock_cli)
+    mock_cli.exec_command.return_value = SHOW_VERSION_OUTPUT
+    for _ in range(3):
+        assert model.show_version()['product release'] == '9.0.0-rc'
+    # Served from memory, without a 'show info' round-trip.
+    mock_cli.exec_command.assert_called_once_with('show version',
+                                                  output_expected=True)
+
+
+def test_version_cache_flush(tmpdir):
+    sh = mock.Mock(host='sh1', port=22)
+    path = tmpdir.join('versions.json')
+    cache = VersionCache(path=str(path))
+    for port in range(100):
+        cache.put(mock.Mock(host='sh1', port=port), {'uptime': port})
+    assert not path.exists()
+    cache.flush()
+    assert len(VersionCache(path=str(path))) == 100
+    assert tmpdir.listdir() == [path]
+
+    cache.invalidate(sh)
+    cache.flush()
+    assert len(VersionCache(path=str(path))) == 99
+
+    # Written when collected, not kept alive for the flush at exit.
+    cache.invalidate(mock.Mock(host='sh1', port=1))
+    ref = weakref.ref(cache)
+    del cache
+    gc.collect()
+    assert ref() is None
+    assert len(VersionCache(path=str(path))) == 98
@@ -0,0 +1,98 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+import random
+from collections import Counter
+
+from steelscript.cmdline import exceptions
+from steelscript.steelhead.features.flows.v8_5 import aggregate
+from steelscript.steelhead.features.flows.v8_5.parser import FlowsParser
+
+
+SHOW_FLOWS_OUTPUT = """\
+T  Source                Destination           App     Rdn Since
+--------------------------------------------------------------------------------
+O  10.0.0.1:1001         10.190.1.1:443        SSL     50% 2014/02/10 23:58:01
+O  10.0.0.2:1002         10.190.1.1:443        SSL     60% 2014/02/10 23:58:02
+O  10.0.0.3:1003         10.190.1.2:445        CIFS    60% 2014/02/10 23:58:02
+PI 10.0.0.3:1004         10.190.1.1:80         HTTP        2014/02/10 23:58:03
+"""
+
+
+def flows():
+    return FlowsParser().parse(SHOW_FLOWS_OUTPUT)
+
+
+def test_group_by():
+    assert aggregate.group_by(flows(), 'app') == \
+        Counter({'SSL': 2, 'CIFS': 1, 'HTTP': 1})
+    top = aggregate.top_flows(flows()['flows_list'],
+                              ['destination port', 'type'], n=1)
+    assert top == [((443, 'O'), 2)]
+
+
+def test_update_fleet():
+    agg = aggregate.FlowAggregator(['device', 'app'])
+    agg.update_fleet([('sh1', flows()),
+                      ('sh2', exceptions.ConnectionError(context='down')),
+                      ('sh3', flows()['flows_list'][:1])])
+    assert agg.exact
+    assert agg.total == 5
+    assert agg.top(1) == [(('sh1', 'SSL'), 2)]
+    assert dict(agg.top(None)) == {('sh1', 'SSL'): 2, ('sh1', 'CIFS'): 1,
+                                   ('sh1', 'HTTP'): 1, ('sh3', 'SSL'): 1}
+
+
+HEAVY = list(range(5))
+
+
+def skewed_stream(count, seed=0):
+    # A few heavy items over a long tail of rare ones.  Integers hash the
+    # same in every process, which keeps the sketch test deterministic.
+    rnd = random.Random(seed)
+    for _ in range(count):
+        if rnd.random() < 0.5:
+            yield rnd.choice(HEAVY)
+        else:
+            yield rnd.randrange(100, 5100)
+
+
+def test_space_saving():
+    items = list(skewed_stream(20000))
+    exact = Counter(items)
+    summary = aggregate.SpaceSaving(50)
+    for item in items:
+        summary.add(item)
+    assert len(summary) == 50
+    assert summary.total == len(items)
+    top = summary.top(5)
+    assert set(item for item, _, _ in top) == set(HEAVY)
+    for item, count, error in top:
+        assert count - error <= exact[item] <= count
+
+
+def test_count_min_sketch():
+    items = list(skewed_stream(20000))
+    exact = Counter(items)
+    sketch = aggregate.CountMinSketch(width=512, depth=4)
+    for item in items:
+        sketch.add(item)
+    assert all(sketch.estimate(item) >= count
+               for item, count in exact.items())
+    for item in HEAVY:
+        assert sketch.estimate(item) <= exact[item] + 2 * len(items) // 512
+
+
+def test_bounded_aggregator():
+    parsed = flows()
+    for sketch in (False, True):
+        agg = aggregate.FlowAggregator('app', capacity=2, sketch=sketch)
+        agg.update(parsed)
+        assert not agg.exact
+        assert agg.top(1) == [('SSL', 2)]
@@ -0,0 +1,97 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+import os
+import datetime
+from unittest import mock
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+from steelscript.steelhead.features.flows.v8_5 import parser  # noqa: E402
+from steelscript.steelhead.features.flows.v8_5.archive import \
+    FlowArchive  # noqa: E402
+from steelscript.steelhead.features.flows.v8_5.columns import \
+    FlowColumnsParser, flows_to_records  # noqa: E402
+from steelscript.steelhead.features.flows.v8_5.model import \
+    FlowsModel  # noqa: E402
+
+
+SHOW_FLOWS_OUTPUT = """\
+T  Source                Destination           App     Rdn Since
+--------------------------------------------------------------------------------
+O  10.0.0.1:1001         10.190.1.1:443        SSL     50% 2014/02/10 23:58:01
+PI 10.0.0.3:1004         10.190.1.1:80         HTTP        2014/02/10 23:58:03
+N  [2001:db8::1]:1006    [2001:db8:1::1]:443   SSL     20% pre_existing
+"""
+
+
+@pytest.fixture
+def mock_cli():
+    with mock.patch('steelscript.common.interaction.model.Model.cli') as cli:
+        yield cli
+
+
+def test_parse_records(mock_cli):
+    mock_cli.exec_command.return_value = SHOW_FLOWS_OUTPUT
+    records = FlowsModel(mock.Mock(), cli=mock_cli).show_flows_records()
+    assert list(records['type']) == [b'O', b'PI', b'N']
+    assert list(records['app']) == [b'SSL', b'HTTP', b'SSL']
+    assert list(records['reduction']) == [50, -1, 20]
+    assert list(records['destination port']) == [443, 80, 443]
+    assert parser.unpack_ip(records['source ip hi'][2],
+                            records['source ip lo'][2]) == \
+        parser.ip_address('2001:db8::1')
+    assert records['since'][0] == numpy.datetime64('2014-02-10T23:58:01')
+    assert numpy.isnat(records['since'][2])
+
+    # Records built from flow dictionaries are the same.
+    flows = parser.FlowsParser().parse(SHOW_FLOWS_OUTPUT)['flows_list']
+    assert flows_to_records(flows).tobytes() == records.tobytes()
+
+
+def test_archive(tmpdir):
+    archive = FlowArchive(str(tmpdir))
+    records = FlowColumnsParser().parse_records(SHOW_FLOWS_OUTPUT)
+    first = datetime.datetime(2014, 2, 11, 0, 0, 0)
+    second = first + datetime.timedelta(seconds=30)
+    archive.write('sh1', records, first)
+    archive.write('sh1', records[:1], second)
+    archive.write('fe80::1', parser.FlowsParser().parse(
+        SHOW_FLOWS_OUTPUT)['flows_list'], first)
+
+    assert archive.devices() == ['fe80::1', 'sh1']
+    snapshots = archive.snapshots(device='sh1')
+    assert [s.timestamp for s in snapshots] == [first, second]
+    assert [s.device for s in archive.snapshots(end=second)] == \
+        ['fe80::1', 'sh1']
+
+    counts = {}
+    for snapshot, flows in archive.iter_snapshots(start=first):
+        ports = flows['destination port']
+        assert isinstance(ports, numpy.memmap)
+        counts[snapshot] = int((ports == 443).sum())
+        # Only the column looked up was mapped.
+        assert list(flows._columns) == ['destination port']
+    assert sorted(counts.values()) == [1, 2, 2]
+    flows = archive.read(snapshots[0])
+    assert flows.size == 3
+    assert flows.to_records().tobytes() == records.tobytes()
+    assert sorted(os.listdir(snapshots[0].path)) == \
+        sorted(name.replace(' ', '_') + '.npy' for name in flows)
+
+
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('since', ['epoch', 'datetime'])
+def test_flows_to_records_since_forms(compact, since):
+    expected = flows_to_records(
+        parser.FlowsParser().parse(SHOW_FLOWS_OUTPUT)['flows_list'])
+    flows = parser.FlowsParser(parser.flow_record(
+        compact=compact, since=since)).parse(SHOW_FLOWS_OUTPUT)['flows_list']
+    assert flows_to_records(flows).tobytes() == expected.tobytes()
@@ -7,10 +7,13 @@
 from __future__ import (absolute_import, unicode_literals, print_function,
                         division)
 
+import calendar
+import datetime
 from unittest import mock
 import pytest
-from ipaddress import IPv4Address, IPv6Address
+from ipaddress import IPv4Address, IPv6Address, ip_address
 
+from steelscript.steelhead.features.flows.v8_5 import parser
 from steelscript.steelhead.features.flows.v8_5.model import FlowsModel\
     as CommonFlows
 
@@ -197,3 +200,190 @@ def test_show_flows(mock_cli):
     assert result['flows_list'] == SHOW_FLOWS_ALL_PARSED_DICT['flows_list']
     assert result['flows_summary'] == \
         SHOW_FLOWS_ALL_PARSED_DICT['flows_summary']
+
+
+def test_show_flows_compact(mock_cli):
+    model = CommonFlows(mock.Mock(), cli=mock_cli)
+    mock_cli.exec_command.return_value = SHOW_FLOWS_ALL_OUTPUT
+    result = model.show_flows(compact=True)
+    flows = result['flows_list']
+    assert all(isinstance(flow, parser.Flow) for flow in flows)
+    assert flows == SHOW_FLOWS_ALL_PARSED_DICT['flows_list']
+    assert [dict(flow) for flow in flows] == \
+        SHOW_FLOWS_ALL_PARSED_DICT['flows_list']
+    assert result['flows_summary'] == \
+        SHOW_FLOWS_ALL_PARSED_DICT['flows_summary']
+    assert flows[5].app is flows[6].app
+    assert flows[2].type is flows[3].type
+
+
+@pytest.mark.parametrize('record', [parser.make_flow, parser.Flow])
+def test_parse_parallel(record):
+    expected = parser.FlowsParser(record).parse(SHOW_FLOWS_ALL_OUTPUT)
+    # Below the threshold, no worker process is started.
+    with mock.patch.object(parser, 'ProcessPoolExecutor') as pool:
+        result = parser.FlowsParser(record).parse_parallel(
+            SHOW_FLOWS_ALL_OUTPUT)
+        assert not pool.called
+    assert result == expected
+    result = parser.FlowsParser(record).parse_parallel(
+        SHOW_FLOWS_ALL_OUTPUT, max_workers=2, threshold=0)
+    assert result == expected
+    assert [type(flow) for flow in result['flows_list']] == \
+        [type(flow) for flow in expected['flows_list']]
+
+
+def test_parse_parallel_does_not_fork():
+    with mock.patch.object(parser, 'ProcessPoolExecutor') as pool, \
+            mock.patch.dict(parser._worker_pools, clear=True):
+        pool.return_value.map.return_value = []
+        parser.FlowsParser().parse_parallel(SHOW_FLOWS_ALL_OUTPUT,
+                                            max_workers=2, threshold=0)
+        # The pool is kept for later calls.
+        parser.FlowsParser().parse_parallel(SHOW_FLOWS_ALL_OUTPUT,
+                                            max_workers=2, threshold=0)
+    assert pool.call_count == 1
+    context = pool.call_args[1]['mp_context']
+    assert context.get_start_method() in ('forkserver', 'spawn')
+
+
+def test_split_lines():
+    output = 'title\none\ntwo\nthree\nsummary\n'
+    chunks = parser._split_lines(output, 6, 20, 2)
+    assert chunks == ['one\ntwo\n', 'three\n']
+    assert parser._split_lines(output, 6, 20, 100) == \
+        ['one\n', 'two\n', 'three\n']
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_show_flows_since_watermark(mock_cli, compact):
+    model = CommonFlows(mock.Mock(), cli=mock_cli)
+    # The last flow has a timestamp the fast path does not recognize.
+    mock_cli.exec_command.return_value = SHOW_FLOWS_ALL_OUTPUT.replace(
+        '2014/02/01 10:10:11', '2014/2/1 10:10:11 ')
+    result = model.show_flows(since_watermark=datetime.datetime(
+        2014, 2, 1, 0, 20, 1), compact=compact)
+    assert [flow['source port'] for flow in result['flows_list']] == \
+        [406, 443, 1443, 146]
+    assert result['flows_summary'] == \
+        SHOW_FLOWS_ALL_PARSED_DICT['flows_summary']
+
+    mock_cli.iter_command.return_value = \
+        iter(SHOW_FLOWS_ALL_OUTPUT.splitlines())
+    stream = model.iter_flows(since_watermark=datetime.datetime(2014, 2, 10))
+    assert [flow['source port'] for flow in stream] == [406, 1443]
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_show_flows_since(mock_cli, compact):
+    model = CommonFlows(mock.Mock(), cli=mock_cli)
+    mock_cli.exec_command.return_value = SHOW_FLOWS_ALL_OUTPUT
+    flows = model.show_flows(since='epoch', compact=compact)['flows_list']
+    assert flows[0]['since'] == 1392076681
+    assert flows[-1]['since'] == parser.PRE_EXISTING_EPOCH
+    flows = model.show_flows(since='datetime', compact=compact)['flows_list']
+    assert flows[0]['since'] == datetime.datetime(2014, 2, 10, 23, 58, 1)
+    assert flows[1]['since'] is flows[5]['since']
+    assert flows[-1]['since'] == parser.PRE_EXISTING_DATETIME
+    assert sorted(flows, key=lambda flow: flow['since'])[0] is flows[-1]
+    with pytest.raises(ValueError):
+        model.show_flows(since='seconds')
+
+
+@pytest.mark.parametrize('text', ['2014/02/10 23:58:01', '2014/2/10 3:8:1'])
+def test_since_forms(text):
+    since = parser.parse_since(text)
+    expected = datetime.datetime(*[int(since[key]) for key in (
+        'year', 'month', 'day', 'hour', 'min', 'secs')])
+    assert parser.since_datetime(text) == expected
+    assert parser.since_epoch(text) == calendar.timegm(expected.timetuple())
+
+
+def test_flow_without_reduction():
+    line = ('PI 10.0.0.1:1024        10.0.0.2:80           '
+            'HTTP        2014/02/01 00:00:01')
+    flow = parser.Flow(parser.FLOW_RE.search(line))
+    assert 'reduction' not in flow
+    assert len(flow) == 7
+    assert flow.reduction is None
+    with pytest.raises(KeyError):
+        flow['reduction']
+    assert flow.get('reduction', 'n/a') == 'n/a'
+    assert flow == parser.make_flow(parser.FLOW_RE.search(line))
+
+
+def test_show_flows_summary(mock_cli):
+    model = CommonFlows(mock.Mock(), cli=mock_cli)
+    mock_cli.exec_command.return_value = SHOW_FLOWS_ALL_OUTPUT
+    assert model.show_flows_summary() == \
+        SHOW_FLOWS_ALL_PARSED_DICT['flows_summary']
+    # Without the column header every line is checked.
+    mock_cli.exec_command.return_value = \
+        SHOW_FLOWS_ALL_OUTPUT.replace('All    V4     V6', '')
+    assert model.show_flows_summary() == \
+        SHOW_FLOWS_ALL_PARSED_DICT['flows_summary']
+
+
+def test_show_flows_frame(mock_cli):
+    pandas = pytest.importorskip('pandas')
+    model = CommonFlows(mock.Mock(), cli=mock_cli)
+    mock_cli.exec_command.return_value = SHOW_FLOWS_ALL_OUTPUT
+    frame = model.show_flows_frame()
+    assert frame.attrs['flows_summary'] == \
+        SHOW_FLOWS_ALL_PARSED_DICT['flows_summary']
+    assert str(frame['app'].dtype) == 'category'
+    assert str(frame['reduction'].dtype) == 'Int8'
+
+    expected = SHOW_FLOWS_ALL_PARSED_DICT['flows_list']
+    assert len(frame) == len(expected)
+    for row, flow in zip(frame.itertuples(index=False), expected):
+        assert (row.type, row.app) == (flow['type'], flow['app'])
+        assert parser.unpack_ip(row[1], row[2]) == flow['source ip']
+        assert row[3] == flow['source port']
+        assert parser.unpack_ip(row[4], row[5]) == flow['destination ip']
+        assert row[6] == flow['destination port']
+        assert row.reduction == flow['reduction']
+        if 'pre_existing' in flow['since']:
+            assert pandas.isna(row.since)
+        else:
+            assert row.since == pandas.Timestamp(
+                '%(year)s-%(month)s-%(day)s %(hour)s:%(min)s:%(secs)s'
+                % flow['since'])
+
+
+@pytest.mark.parametrize('address', ['10.1.2.3', '::1', '2001:db8::1'])
+def test_pack_ip(address):
+    hi, lo = parser.pack_ip(address)
+    assert parser.unpack_ip(hi, lo) == ip_address(address)
+    assert (hi, lo) == parser.pack_ip(ip_address(address))
+
+
+def test_iter_flows(mock_cli):
+    model = CommonFlows(mock.Mock(), cli=mock_cli)
+    mock_cli.iter_command.return_value = \
+        iter(SHOW_FLOWS_ALL_OUTPUT.splitlines())
+    flows = model.iter_flows()
+    mock_cli.iter_command.assert_called_once_with('show flows all')
+    assert flows.summary is None
+    assert next(flows) == SHOW_FLOWS_ALL_PARSED_DICT['flows_list'][0]
+    assert list(flows) == SHOW_FLOWS_ALL_PARSED_DICT['flows_list'][1:]
+    assert flows.summary == SHOW_FLOWS_ALL_PARSED_DICT['flows_summary']
+
+
+def test_iter_flows_plain_cli():
+    # Sessions without iter_command, such as a plain RVBD_CLI.
+    cli = mock.Mock(spec=['exec_command'])
+    cli.exec_command.return_value = SHOW_FLOWS_ALL_OUTPUT
+    model = CommonFlows(mock.Mock(), cli=cli)
+    assert list(model.iter_flows()) == \
+        SHOW_FLOWS_ALL_PARSED_DICT['flows_list']
+
+
+@pytest.mark.parametrize(('endpoint', 'address', 'port'), [
+    ('10.190.0.1:406', IPv4Address('10.190.0.1'), 406),
+    ('[10::190:f0:1]:146', IPv6Address('10::190:f0:1'), 146),
+    ('10::190:f0:1:146', IPv6Address('10::190:f0:1'), 146),
+])
+def test_parse_endpoint(endpoint, address, port):
+    assert parser._split_endpoint(endpoint) == (address, port)
+    assert parser.parse_ip_addr(endpoint) == (address, port)
@@ -0,0 +1,93 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+from unittest import mock
+import pytest
+
+from steelscript.steelhead.features.flows.v8_5 import parser
+from steelscript.steelhead.features.flows.v8_5.model import FlowsModel
+from steelscript.steelhead.features.flows.v8_5.snapshot import FlowSnapshot
+
+
+FIRST_POLL = """\
+T  Source                Destination           App     Rdn Since
+--------------------------------------------------------------------------------
+O  10.0.0.1:1001         10.0.1.1:443          SSL     50% 2014/02/10 23:58:01
+O  10.0.0.2:1002         10.0.1.1:443          SSL     60% 2014/02/10 23:58:02
+PI 10.0.0.3:1003         10.0.1.1:80           HTTP        2014/02/10 23:58:03
+N  10.0.0.4:1004         10.0.1.1:80           UDPv4    0% pre_existing
+"""
+
+SECOND_POLL = """\
+T  Source                Destination           App     Rdn Since
+--------------------------------------------------------------------------------
+O  10.0.0.1:1001         10.0.1.1:443          SSL     50% 2014/02/10 23:58:01
+O  10.0.0.2:1002         10.0.1.1:443          SSL     75% 2014/02/10 23:58:02
+N  10.0.0.4:1004         10.0.1.1:80           UDPv4    0% pre_existing
+O  10.0.0.3:1003         10.0.1.1:80           HTTP    10% 2014/02/10 23:59:30
+"""
+
+
+@pytest.fixture(params=[parser.make_flow, parser.Flow])
+def snapshots(request):
+    return [FlowSnapshot(parser.FlowsParser(request.param).parse(output)
+                         ['flows_list'])
+            for output in (FIRST_POLL, SECOND_POLL)]
+
+
+def source_port(flow):
+    return flow['source port']
+
+
+def test_diff(snapshots):
+    first, second = snapshots
+    added, removed, changed = second.diff(first)
+    # The port was reused by a new connection.
+    assert [source_port(flow) for flow in added] == [1003]
+    assert added[0]['type'] == 'O'
+    assert [source_port(flow) for flow in removed] == [1003]
+    assert removed[0]['type'] == 'PI'
+    assert [(old['reduction'], new['reduction'])
+            for old, new in changed] == [(60, 75)]
+
+
+def test_diff_first_poll(snapshots):
+    first, _ = snapshots
+    delta = first.diff(None)
+    assert len(delta.added) == len(first) == 4
+    assert delta.removed == delta.changed == []
+    assert first.diff(first) == ([], [], [])
+
+
+def test_show_flows_snapshot():
+    cli = mock.Mock()
+    cli.exec_command.return_value = FIRST_POLL
+    with mock.patch('steelscript.common.interaction.model.Model.cli', cli):
+        model = FlowsModel(mock.Mock(), cli=cli)
+        snapshot = model.show_flows_snapshot()
+    assert len(snapshot) == 4
+    assert snapshot.summary == {}
+    assert parser.make_flow(parser.FLOW_RE.search(
+        FIRST_POLL.splitlines()[2])) in snapshot
+
+
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('since', ['epoch', 'datetime'])
+def test_diff_since_forms(compact, since):
+    record = parser.flow_record(compact=compact, since=since)
+    first, second = [FlowSnapshot.from_result(parser.FlowsParser(record)
+                                              .parse(output))
+                     for output in (FIRST_POLL, SECOND_POLL)]
+    added, removed, changed = second.diff(first)
+    assert [source_port(flow) for flow in added] == [1003]
+    assert [source_port(flow) for flow in removed] == [1003]
+    assert [(old['reduction'], new['reduction'])
+            for old, new in changed] == [(60, 75)]
+    assert set(first.flows) == set(FlowSnapshot.from_result(
+        parser.FlowsParser().parse(FIRST_POLL)).flows)
@@ -0,0 +1,56 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+import ipaddress
+import pytest
+
+from steelscript.steelhead.features.flows.v8_5.parser import FlowsParser
+from steelscript.steelhead.features.flows.v8_5.snapshot import FlowSnapshot
+from steelscript.steelhead.features.flows.v8_5.table import FlowTable
+
+
+SHOW_FLOWS_OUTPUT = """\
+T  Source                Destination           App     Rdn Since
+--------------------------------------------------------------------------------
+O  10.0.0.1:1001         10.190.1.1:443        SSL     50% 2014/02/10 23:58:01
+O  10.0.0.2:1002         10.190.200.1:443      SSL     60% 2014/02/10 23:58:02
+O  10.0.0.3:1003         10.191.0.1:443        SSL     60% 2014/02/10 23:58:02
+PI 10.0.0.3:1004         10.190.1.1:443        SSL         2014/02/10 23:58:03
+O  10.0.0.4:1005         10.190.1.1:80         HTTP    10% 2014/02/10 23:58:04
+N  [2001:db8::1]:1006    [2001:db8:1::1]:443   SSL     20% 2014/02/10 23:58:05
+"""
+
+
+@pytest.fixture
+def table():
+    return FlowTable(FlowsParser().parse(SHOW_FLOWS_OUTPUT)['flows_list'])
+
+
+def ports(flows):
+    return [flow['source port'] for flow in flows]
+
+
+def test_query(table):
+    assert ports(table.query(destination='10.190.0.0/16',
+                             destination_port=443, type='O')) == [1001, 1002]
+    assert ports(table.query(destination='10.190.0.0/16',
+                             type=['O', 'PI'], app='SSL')) == \
+        [1001, 1002, 1004]
+    assert ports(table.query(source='10.0.0.3')) == [1003, 1004]
+    assert ports(table.query(destination=ipaddress.ip_network(
+        '2001:db8::/32'))) == [1006]
+    assert table.count(source='0.0.0.0/0') == 5
+    assert table.count(app='CIFS') == 0
+    assert len(table.query()) == len(table) == 6
+
+
+def test_from_snapshot():
+    flows = FlowsParser().parse(SHOW_FLOWS_OUTPUT)['flows_list']
+    table = FlowTable(FlowSnapshot(flows))
+    assert table.count(destination_port=[80, 443]) == 6
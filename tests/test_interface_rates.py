@@ -0,0 +1,97 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+import datetime
+from unittest import mock
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+from steelscript.steelhead.core.timeutils import \
+    epoch_seconds  # noqa: E402
+from steelscript.steelhead.features.networking.v8_5.model import \
+    NetworkingModel  # noqa: E402
+from steelscript.steelhead.features.networking.v8_5.rates import \
+    InterfaceRateTracker  # noqa: E402
+
+
+CLEARED = datetime.datetime(2014, 5, 7, 17, 27, 19)
+START = epoch_seconds(CLEARED) + 1000
+
+SHOW_INTERFACE_OUTPUT = """
+Interface primary state
+   Up:                 yes
+   Counters cleared date:  %s
+
+   RX bytes:           %d
+   RX packets:         %d
+   RX errors:          0
+
+   TX bytes:           516
+   TX packets:         6
+   TX errors:          0
+"""
+
+
+def interface(rx_bytes, rx_packets, cleared=CLEARED):
+    return {'name': 'primary', 'counters cleared date': cleared,
+            'rx bytes': rx_bytes, 'rx packets': rx_packets,
+            'tx bytes': 516, 'tx packets': 6}
+
+
+@pytest.yield_fixture
+def mock_cli():
+    with mock.patch('steelscript.common.interaction.model.Model.cli') as cli:
+        yield cli
+
+
+def test_rates():
+    tracker = InterfaceRateTracker(size=3)
+    tracker.add([interface(1000, 10)], START)
+    assert tracker.latest() == {}
+    tracker.add([interface(2000, 20)], START + 10)
+    tracker.add([interface(5000, 50)], START + 20)
+
+    rates = tracker.rates('primary')
+    assert rates['time'].tolist() == [START + 10, START + 20]
+    assert rates['rx bps'].tolist() == [800, 2400]
+    assert rates['rx pps'].tolist() == [1, 3]
+    assert rates['tx bps'].tolist() == [0, 0]
+    # Not in the output.
+    assert numpy.isnan(rates['rx discards/s']).all()
+
+    tracker.add([interface(6000, 60)], START + 30)
+    assert tracker.rates('primary')['rx bps'].tolist() == [2400, 800]
+    assert tracker.latest()['primary']['rx pps'] == 1
+
+
+def test_rates_counter_reset():
+    tracker = InterfaceRateTracker()
+    tracker.add([interface(100000, 1000)], START)
+    # Cleared 5 seconds before the next poll.
+    cleared = CLEARED + datetime.timedelta(seconds=1005)
+    tracker.add([interface(500, 5, cleared)], START + 10)
+    assert tracker.latest()['primary']['rx bps'] == 800
+    assert tracker.latest()['primary']['rx pps'] == 1
+
+    # Decreasing counters without a new clear date are unknown.
+    tracker.add([interface(100, 1, cleared)], START + 20)
+    assert numpy.isnan(tracker.latest()['primary']['rx bps'])
+
+
+def test_poll(mock_cli):
+    model = NetworkingModel(mock.Mock(), cli=mock_cli)
+    tracker = InterfaceRateTracker(model)
+    for i, timestamp in enumerate([START, START + 60]):
+        mock_cli.exec_command.return_value = SHOW_INTERFACE_OUTPUT % (
+            CLEARED.strftime('%Y/%m/%d %H:%M:%S'), 6000 * i, 60 * i)
+        tracker.poll(timestamp)
+    assert tracker.interfaces() == ['primary']
+    assert tracker.latest()['primary']['rx bps'] == 800
+    assert tracker.samples('primary')['rx bytes'].tolist() == [0, 6000]
@@ -15,6 +15,8 @@ from unittest import mock
 
 from steelscript.steelhead.features.networking.v8_5.model import \
     NetworkingModel
+from steelscript.steelhead.features.networking.v8_5.parser import \
+    InterfaceRecord, merge_interfaces, parse_interfaces
 
 
 SHOW_INTERFACES_BRIEF_OUTPUT = """
@@ -181,3 +183,78 @@ def test_show_interfaces_configured(mock_cli):
     mock_cli.exec_command.return_value = SHOW_INTERFACE_CONFIGURED
     return_dict = model.show_interfaces_configured()
     assert return_dict == SHOW_INTERFACE_CONFIGURED_PARSED
+
+
+@pytest.mark.parametrize(('output', 'parsed'), [
+    (SHOW_INTERFACES_BRIEF_OUTPUT, SHOW_INTERFACES_BRIEF_PARSED),
+    (SHOW_INTERFACE_OUTPUT, SHOW_INTERFACE_PARSED),
+    (SHOW_INTERFACE_CONFIGURED, SHOW_INTERFACE_CONFIGURED_PARSED),
+])
+def test_parse_interfaces_lazy(output, parsed):
+    records = parse_interfaces(output, lazy=True)
+    assert [dict(r) for r in records] == parsed
+    assert records == parsed
+
+
+def test_interface_record_converts_on_access():
+    record = parse_interfaces(SHOW_INTERFACES_BRIEF_OUTPUT, lazy=True)[0]
+    assert record._values['hw address'].arg == '00:0E:B6:5A:CA:99'
+    assert record['hw address'] == netaddr.EUI('00-0E-B6-5A-CA-99')
+    assert record._values['hw address'] is record['hw address']
+    assert 'netmask' not in record
+    assert record['name'] == 'aux'
+
+
+def test_parse_interfaces_duplicate_key():
+    with pytest.raises(KeyError):
+        parse_interfaces('Interface aux state\n   Up: yes\n   Up: no\n')
+
+
+def test_show_interfaces_lazy(mock_cli):
+    model = NetworkingModel(mock.Mock(), cli=mock_cli)
+    mock_cli.exec_command.return_value = SHOW_INTERFACES_BRIEF_OUTPUT
+    records = model.show_interfaces(brief=True, lazy=True)
+    assert all(isinstance(r, InterfaceRecord) for r in records)
+    assert records == SHOW_INTERFACES_BRIEF_PARSED
+
+
+def test_show_interfaces_full(mock_cli):
+    model = NetworkingModel(mock.Mock(), cli=mock_cli)
+    configured = SHOW_INTERFACE_CONFIGURED.replace('aux', 'primary') + \
+        SHOW_INTERFACE_CONFIGURED.replace('1500', '9000')
+    mock_cli.exec_batch.return_value = [SHOW_INTERFACE_OUTPUT, configured]
+    merged = model.show_interfaces_full()
+    mock_cli.exec_batch.assert_called_once_with(
+        ['show interfaces', 'show interfaces configured'],
+        output_expected=True)
+
+    primary, aux = merged
+    assert primary['running'] == SHOW_INTERFACE_PARSED[0]
+    assert primary['configured']['name'] == 'primary'
+    # Speed and duplex were negotiated from 'auto'.
+    assert primary['differences'] == ['ip address']
+    assert primary['differs']
+    assert aux['running'] is None
+    assert aux['configured']['mtu'] == 9000
+    assert aux['differs']
+
+
+def test_merge_interfaces_same():
+    running = [{'name': 'wan0_0', 'speed': '100Mb/s', 'duplex': 'full',
+                'mtu': 1500, 'up': True}]
+    configured = [{'name': 'wan0_0', 'speed': '100', 'duplex': 'full',
+                   'mtu': 1500, 'enabled': True}]
+    merged, = merge_interfaces(running, configured)
+    assert not merged['differs']
+    assert merged['differences'] == []
+
+
+def test_show_interfaces_full_plain_cli():
+    # Sessions without exec_batch, such as a plain RVBD_CLI.
+    cli = mock.Mock(spec=['exec_command'])
+    cli.exec_command.side_effect = [SHOW_INTERFACE_OUTPUT,
+                                    SHOW_INTERFACE_CONFIGURED]
+    model = NetworkingModel(mock.Mock(), cli=cli)
+    primary, aux = model.show_interfaces_full()
+    assert primary['running'] == SHOW_INTERFACE_PARSED[0]
+    assert aux['configured'] == SHOW_INTERFACE_CONFIGURED_PARSED[0]
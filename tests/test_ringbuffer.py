@@ -0,0 +1,45 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+from steelscript.steelhead.core.ringbuffer import RingBuffer  # noqa: E402
+
+
+DTYPE = [('time', 'f8'), ('value', 'i8')]
+
+
+def test_ringbuffer_wraps():
+    buf = RingBuffer(3, DTYPE)
+    assert len(buf) == 0
+    assert buf.last() is None
+    for i in range(5):
+        buf.append((i, i * 10))
+    assert buf.full
+    assert len(buf) == 3
+    assert buf.view()['value'].tolist() == [20, 30, 40]
+    assert buf.view(2)['value'].tolist() == [30, 40]
+    assert buf.last()['time'] == 4
+
+
+def test_ringbuffer_partial():
+    buf = RingBuffer(4, DTYPE)
+    buf.append((1, 10))
+    buf.append((2, 20))
+    assert not buf.full
+    assert buf.view()['time'].tolist() == [1, 2]
+    buf.clear()
+    assert len(buf.view()) == 0
+
+
+def test_ringbuffer_capacity():
+    with pytest.raises(ValueError):
+        RingBuffer(0, DTYPE)
@@ -7,11 +7,14 @@
 from __future__ import (absolute_import, unicode_literals, print_function,
                         division)
 
+import datetime
 from unittest import mock
 import pytest
 
 from steelscript.steelhead.features.stats.v8_5.model import StatsModel\
     as CommonStats
+from steelscript.steelhead.features.stats.v8_5.parser import FieldSpec, \
+    StatsParser
 
 
 SHOW_STATS_ALL_OUTPUT = """\
@@ -44,3 +47,129 @@ def test_show_stats(mock_cli):
     mock_cli.exec_command.return_value = SHOW_STATS_ALL_OUTPUT
     result = model.show_stats_bandwidth('all', 'bi-directional', '5min')
     assert result == SHOW_STATS_ALL_PARSED_DICT
+
+
+SHOW_STATS_ALL_PARSED_TYPED = {
+    'wan data': 4404019,
+    'lan data': 69206016,
+    'data reduction': 93.0,
+    'data reduction peak': 98.0,
+    'data reduction peak time': datetime.datetime(2014, 12, 9, 8, 39, 35),
+    'capacity increase': 15.4
+}
+
+
+def test_show_stats_typed(mock_cli):
+    model = CommonStats(mock.Mock(), cli=mock_cli)
+    mock_cli.exec_command.return_value = SHOW_STATS_ALL_OUTPUT
+    result = model.show_stats_bandwidth('all', 'bi-directional', '5min',
+                                        typed=True)
+    assert result == SHOW_STATS_ALL_PARSED_TYPED
+
+
+def test_show_stats_typed_empty(mock_cli):
+    model = CommonStats(mock.Mock(), cli=mock_cli)
+    mock_cli.exec_command.return_value = (
+        'WAN Data:                 0 Bytes\n'
+        'LAN Data:                 1.5 KB\n'
+        'Data Reduction:           0 %\n'
+        'Data Reduction Peak Time:\n')
+    assert model.show_stats_bandwidth(typed=True) == {
+        'wan data': 0,
+        'lan data': 1536,
+        'data reduction': 0.0,
+        'data reduction peak time': None}
+
+
+def test_show_stats_all_directions(mock_cli):
+    model = CommonStats(mock.Mock(), cli=mock_cli)
+    mock_cli.exec_batch.return_value = [SHOW_STATS_ALL_OUTPUT] * 3
+    result = model.show_stats_bandwidth_all_directions('all', '5min')
+    mock_cli.exec_batch.assert_called_once_with(
+        ['show stats bandwidth all lan-to-wan 5min',
+         'show stats bandwidth all wan-to-lan 5min',
+         'show stats bandwidth all bi-directional 5min'],
+        output_expected=True)
+    assert list(result) == ['lan-to-wan', 'wan-to-lan', 'bi-directional']
+    assert all(r == SHOW_STATS_ALL_PARSED_DICT for r in result.values())
+
+    result = model.show_stats_bandwidth_all_directions(typed=True)
+    assert result['wan-to-lan'] == SHOW_STATS_ALL_PARSED_TYPED
+
+
+SHOW_STATS_THROUGHPUT_OUTPUT = """\
+LAN Average:              1.5 Mbps
+LAN Peak:                 12 Mbps
+LAN Peak Time:            2014/12/09 08:39:35
+LAN 95th Percentile:      980 kbps
+WAN Average:              400 kbps
+WAN Peak:                 2.25 Mbps
+WAN Peak Time:            2014/12/09 08:40:00
+WAN 95th Percentile:
+"""
+
+SHOW_STATS_THROUGHPUT_PARSED = {
+    'lan average': 1500000,
+    'lan peak': 12000000,
+    'lan peak time': datetime.datetime(2014, 12, 9, 8, 39, 35),
+    'lan 95th percentile': 980000,
+    'wan average': 400000,
+    'wan peak': 2250000,
+    'wan peak time': datetime.datetime(2014, 12, 9, 8, 40),
+    'wan 95th percentile': None,
+}
+
+
+def test_show_stats_throughput(mock_cli):
+    model = CommonStats(mock.Mock(), cli=mock_cli)
+    mock_cli.exec_command.return_value = SHOW_STATS_THROUGHPUT_OUTPUT
+    result = model.show_stats_throughput('80', 'lan-to-wan', 'hour')
+    mock_cli.exec_command.assert_called_once_with(
+        'show stats throughput 80 lan-to-wan hour', output_expected=True)
+    assert result == SHOW_STATS_THROUGHPUT_PARSED
+
+
+def test_show_stats_connections(mock_cli):
+    model = CommonStats(mock.Mock(), cli=mock_cli)
+    mock_cli.exec_command.return_value = (
+        'Total Connections:  1,200\n'
+        'Optimized:          800\n'
+        'Peak Time:          2014/12/09 08:39:35\n'
+        'Uptime:             3d 4h\n')
+    assert model.show_stats_connections() == {
+        'total connections': 1200,
+        'optimized': 800,
+        'peak time': datetime.datetime(2014, 12, 9, 8, 39, 35),
+        # Not in the field specs.
+        'uptime': '3d 4h'}
+
+
+def test_stats_parser_unreadable_value():
+    parser = StatsParser([FieldSpec('Used', 'bytes', name='used bytes'),
+                          FieldSpec('Hits', 'count')])
+    assert parser.parse('Used: 10 GB\nHits: n/a\n') == {
+        'used bytes': 10 * 1024 ** 3, 'hits': 'n/a'}
+    with pytest.raises(ValueError):
+        FieldSpec('Used', 'furlongs')
+
+
+def test_show_stats_typed_bare_number(mock_cli):
+    # A capacity increase without its 'X' is read as the untyped parser
+    # reads it.
+    model = CommonStats(mock.Mock(), cli=mock_cli)
+    mock_cli.exec_command.return_value = 'Capacity Increase: 1.1\n'
+    result = model.show_stats_bandwidth(typed=True)
+    assert result == {'capacity increase': 1.1}
+    assert isinstance(result['capacity increase'], float)
+    assert StatsParser([FieldSpec('Hits', 'text', converter=lambda v: None)]
+                       ).parse('Hits: 12') == {'hits': 12}
+
+
+def test_show_stats_all_directions_plain_cli():
+    # Sessions without exec_batch, such as a plain RVBD_CLI.
+    cli = mock.Mock(spec=['exec_command'])
+    cli.exec_command.return_value = SHOW_STATS_ALL_OUTPUT
+    model = CommonStats(mock.Mock(), cli=cli)
+    result = model.show_stats_bandwidth_all_directions('all', '5min')
+    assert cli.exec_command.call_count == 3
+    assert result['bi-directional'] == SHOW_STATS_ALL_PARSED_DICT
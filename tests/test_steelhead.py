@@ -0,0 +1,132 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+import asyncio
+import threading
+from unittest import mock
+import pytest
+
+from steelscript.cmdline import exceptions
+from steelscript.common.interaction.model import Model
+from steelscript.steelhead.core.cache import VersionCache
+from steelscript.steelhead.core.steelhead import AsyncSteelHead, CLIAuth, \
+    SteelHeadFleet
+
+
+SHOW_VERSION_OUTPUT = """
+Product name:      rbt_sh
+Product release:   9.0.0-rc
+Build ID:          #12
+Product model:     2050
+"""
+SHOW_VERSION_PARSED = {
+    'product name': 'rbt_sh',
+    'product release': '9.0.0-rc',
+    'build id': '#12',
+    'product model': '2050',
+}
+
+
+@pytest.fixture
+def pool():
+    pool = mock.Mock()
+    pool.checkout.side_effect = lambda host, port, auth: mock.Mock(host=host)
+    return pool
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_async_exec_command(pool):
+    sh = AsyncSteelHead('sh1', auth=CLIAuth('admin', 'password'), pool=pool)
+
+    async def main():
+        sh.steelhead.cli.exec_command.return_value = 'output'
+        return await sh.exec_command('show version', output_expected=True)
+
+    assert run(main()) == 'output'
+    sh.steelhead.cli.exec_command.assert_called_once_with(
+        'show version', output_expected=True)
+
+
+def test_async_model_method(pool):
+    auth = CLIAuth('admin', 'password')
+    devices = [AsyncSteelHead('sh%d' % i, auth=auth, pool=pool)
+               for i in range(3)]
+
+    async def show_version(sh):
+        async with sh:
+            sh.steelhead.cli.exec_command.return_value = SHOW_VERSION_OUTPUT
+            return await Model.get(sh, feature='common').show_version_async()
+
+    async def main():
+        return await asyncio.gather(*[show_version(sh) for sh in devices])
+
+    assert run(main()) == [SHOW_VERSION_PARSED] * 3
+    assert pool.release.call_count == 3
+
+
+def test_async_show_version_cached(pool):
+    sh = AsyncSteelHead('sh1', auth=CLIAuth('admin', 'password'), pool=pool,
+                        version_cache=VersionCache())
+
+    async def main():
+        sh.steelhead.session.exec_command.return_value = SHOW_VERSION_OUTPUT
+        common = Model.get(sh, feature='common')
+        return [await common.show_version_async(),
+                await common.show_version_async()]
+
+    assert run(main()) == [SHOW_VERSION_PARSED] * 2
+    assert sh.steelhead.session.exec_command.call_count == 1
+    assert sh.version_cache.hits == 1
+
+
+def test_fleet_yields_in_completion_order(pool):
+    fleet = SteelHeadFleet(['slow', 'fast', 'broken'],
+                           auth=CLIAuth('admin', 'password'), pool=pool)
+    fast_seen = threading.Event()
+
+    def func(sh, cmd):
+        if sh.host == 'broken':
+            raise exceptions.ConnectionError(context='unreachable')
+        if sh.host == 'slow':
+            # Only finishes once the fast device's result was yielded.
+            assert fast_seen.wait(5)
+        return '%s: %s' % (sh.host, cmd)
+
+    results = []
+    for host, result in fleet.map(func, 'show version'):
+        results.append((host, result))
+        if host == 'fast':
+            fast_seen.set()
+    hosts = [host for host, _ in results]
+    assert hosts.index('fast') < hosts.index('slow')
+    results = dict(results)
+    assert results['fast'] == 'fast: show version'
+    assert results['slow'] == 'slow: show version'
+    assert isinstance(results['broken'], exceptions.ConnectionError)
+    assert all(sh._cli is None for sh in fleet.devices)
+
+
+def test_fleet_runs_model_method(pool):
+    fleet = SteelHeadFleet({'sh1': CLIAuth('admin', 'password'),
+                            'sh2': CLIAuth('monitor', 'password')},
+                           pool=pool, max_workers=1)
+    pool.checkout.side_effect = None
+    pool.checkout.return_value.exec_command.return_value = \
+        SHOW_VERSION_OUTPUT
+    results = dict(fleet.run(Model, 'common', 'show_version'))
+    assert results == {'sh1': SHOW_VERSION_PARSED,
+                       'sh2': SHOW_VERSION_PARSED}
+    assert pool.release.call_count == 2
@@ -0,0 +1,22 @@
+# Copyright (c) 2019 Riverbed Technology, Inc.
+#
+# This software is licensed under the terms and conditions of the MIT License
+# accompanying the software ("License").  This software is distributed "AS IS"
+# as set forth in the License.
+
+from __future__ import (absolute_import, unicode_literals, print_function,
+                        division)
+
+import datetime
+
+from steelscript.steelhead.core.timeutils import epoch_seconds
+from steelscript.steelhead.features.flows.v8_5.parser import since_to_epoch
+
+
+def test_epoch_seconds_reads_naive_times_as_utc():
+    naive = datetime.datetime(2014, 2, 10, 23, 58, 1)
+    assert epoch_seconds(naive) == since_to_epoch('2014/02/10 23:58:01')
+    aware = datetime.datetime(2014, 2, 11, 0, 58, 1, tzinfo=datetime.timezone(
+        datetime.timedelta(hours=1)))
+    assert epoch_seconds(aware) == epoch_seconds(naive)
+    assert epoch_seconds(1392076681.5) == 1392076681.5